@@ -0,0 +1,153 @@
+"""Time the hot DatabaseManager/BankController paths at several data sizes.
+
+Each size gets a fresh temporary database seeded from a fixed random seed,
+so two runs with the same arguments measure the same data. Results can be
+written as JSON and compared against a stored baseline; any operation whose
+median slows down by more than the tolerance makes the run exit non-zero.
+
+    python benchmarks/backend.py --sizes 10000,100000 --json results.json
+    python benchmarks/backend.py --baseline benchmarks/baseline.json
+    python benchmarks/backend.py --save-baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from securebank import BankController  # noqa: E402
+
+TYPES = ["DEPOSIT", "WITHDRAW", "TRANSFER_IN", "TRANSFER_OUT"]
+PIN = "1234"
+
+
+def account_number(i):
+    return str(1000000000 + i)
+
+
+def seed(db, users, transactions, rng):
+    cur = db.cursor
+    cur.executemany("INSERT INTO users (name, pin, account_number, balance) VALUES (?, ?, ?, ?)",
+                    [(f"User {i}", PIN, account_number(i), 10 ** 9) for i in range(users)])
+    rows = []
+    for n in range(transactions):
+        type_ = rng.choice(TYPES)
+        other = account_number(rng.randrange(users)) if type_.startswith("TRANSFER") else None
+        day = 1 + n * 730 // max(transactions, 1)  # spread over two years, in id order
+        rows.append((rng.randrange(users) + 1, type_, rng.randint(1, 50000), other,
+                     "2024-01-01 00:00:00", day, type_.title()))
+    cur.executemany("""
+        INSERT INTO transactions (user_id, type, amount, recipient_account, timestamp, description)
+        VALUES (?, ?, ?, ?, datetime(?, '+' || ? || ' days'), ?)
+    """, rows)
+    db.conn.commit()
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "min_ms": round(samples[0], 4),
+    }
+
+
+def run_size(transactions, users, repeat, seed_value):
+    rng = random.Random(seed_value)
+    with tempfile.TemporaryDirectory() as tmp:
+        controller = BankController(os.path.join(tmp, "bench.db"))
+        db = controller.db
+        seed(db, users, transactions, rng)
+        user_id = rng.randrange(users) + 1
+        account = account_number(user_id - 1)
+        other = account_number(user_id % users)
+        export_path = os.path.join(tmp, "export.csv")
+
+        controller.sign_in(account, PIN)
+        results = {
+            "sign_in": timed(lambda: controller.sign_in(account, PIN), repeat),
+            "deposit": timed(lambda: controller.deposit(100), repeat),
+            "transfer_money": timed(lambda: db.transfer_money(account, other, 1), repeat),
+            "get_transaction_history": timed(lambda: db.get_transaction_history(user_id, 100), repeat),
+            "get_recent_recipients": timed(lambda: db.get_recent_recipients(user_id), repeat),
+            "get_analytics_data": timed(lambda: db.get_analytics_data(user_id), repeat),
+            "export_history_csv": timed(lambda: controller.export_history_csv(export_path), max(1, repeat // 10)),
+        }
+        db.close()
+    return results
+
+
+def compare(results, baseline, tolerance, floor_ms):
+    regressions = []
+    for size, ops in baseline["results"].items():
+        for op, base in ops.items():
+            current = results["results"].get(size, {}).get(op)
+            if current is None: continue
+            limit = base["median_ms"] * (1 + tolerance)
+            if current["median_ms"] > limit and current["median_ms"] - base["median_ms"] > floor_ms:
+                regressions.append(f"{op} @ {size} rows: {current['median_ms']:.3f} ms "
+                                   f"(baseline {base['median_ms']:.3f} ms, limit {limit:.3f} ms)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma separated transaction counts")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--save-baseline", help="write results here as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown (0.5 = 50%%)")
+    parser.add_argument("--floor-ms", type=float, default=0.1, help="ignore slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "users": args.users,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": {},
+    }
+    for size in [int(s) for s in args.sizes.split(",") if s]:
+        results["results"][str(size)] = ops = run_size(size, args.users, args.repeat, args.seed)
+        print(f"\n{size:,} transactions")
+        for op, stats in ops.items():
+            print(f"  {op:<26} median {stats['median_ms']:9.3f} ms   p95 {stats['p95_ms']:9.3f} ms")
+
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.floor_ms)
+        if regressions:
+            print("\nREGRESSIONS:")
+            for line in regressions:
+                print("  " + line)
+            return 1
+        print("\nNo regressions against", args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,78 @@
+"""Measure how long a fresh interpreter takes to import the backend.
+
+Each sample runs in its own subprocess so module caches never carry over.
+The headless target must not pull in tkinter/customtkinter; the GUI target
+is timed alongside it for comparison when customtkinter is installed.
+
+    python benchmarks/import_time.py --runs 10 --max-ms 150
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+gui = sorted(m for m in sys.modules if m.split(".")[0] in ("tkinter", "_tkinter", "customtkinter"))
+print(elapsed, ",".join(gui))
+"""
+
+
+def sample(module, runs):
+    timings, gui_modules = [], set()
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(module=module)], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout.split()
+        timings.append(float(out[0]))
+        if len(out) > 1: gui_modules.update(out[1].split(","))
+    return {
+        "module": module,
+        "runs": runs,
+        "median_ms": round(statistics.median(timings), 2),
+        "min_ms": round(min(timings), 2),
+        "max_ms": round(max(timings), 2),
+        "gui_modules_loaded": sorted(gui_modules),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, help="fail if the headless median exceeds this")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    results = {"headless": [sample("securebank", args.runs), sample("bankapp", args.runs)]}
+    try:
+        results["gui"] = sample("securebank.gui", args.runs)
+    except subprocess.CalledProcessError:
+        results["gui"] = None  # customtkinter not installed
+
+    for entry in results["headless"] + [results["gui"]]:
+        if entry:
+            print(f"{entry['module']:<16} median {entry['median_ms']:8.2f} ms  "
+                  f"(min {entry['min_ms']:.2f}, max {entry['max_ms']:.2f})")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failed = False
+    for entry in results["headless"]:
+        if entry["gui_modules_loaded"]:
+            print(f"FAIL: importing {entry['module']} loaded {', '.join(entry['gui_modules_loaded'])}")
+            failed = True
+        if args.max_ms is not None and entry["median_ms"] > args.max_ms:
+            print(f"FAIL: {entry['module']} median {entry['median_ms']} ms > {args.max_ms} ms")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
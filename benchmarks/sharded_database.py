@@ -0,0 +1,380 @@
+import itertools
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from securebank.database import DatabaseManager
+
+# Each shard's half of the cross-shard transfers it took part in. The debit
+# row is written in the same local transaction as the debit itself, so it is
+# the durable commit/abort decision; a credit row stays PREPARED until it is
+# settled from that decision.
+SHARD_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS shard_transfers (
+        txid TEXT PRIMARY KEY,
+        user_id INTEGER,
+        side TEXT NOT NULL,
+        amount INTEGER NOT NULL,
+        counterparty TEXT NOT NULL,
+        state TEXT NOT NULL,
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS idx_shard_transfers_open ON shard_transfers(state) WHERE state = 'PREPARED'",
+]
+SETTLE_ATTEMPTS = 3
+SETTLE_BACKOFF = 0.05  # seconds, doubled per attempt
+
+
+# A shard's worker went away; whatever it was asked may or may not have run.
+class ShardUnavailable(RuntimeError):
+    pass
+
+
+SHARD_ERRORS = (sqlite3.Error, ShardUnavailable)
+
+
+# One shard file and the operations the router runs on it; anything else is
+# looked up on its DatabaseManager.
+class Shard:
+    def __init__(self, db):
+        self.db = db
+        with db.write_transaction() as cur:
+            for statement in SHARD_SCHEMA:
+                cur.execute(statement)
+
+    # Phase one on the receiving shard: remember the credit without applying
+    # it. Returns the recipient's name, or None if the account is not here.
+    def prepare_credit(self, txid, to_account, from_account, amount):
+        with self.db.write_transaction() as cur:
+            user = cur.execute("SELECT id, name FROM users WHERE account_number = ?", (to_account,)).fetchone()
+            if user is None: return None
+            cur.execute("""
+                INSERT INTO shard_transfers (txid, user_id, side, amount, counterparty, state)
+                VALUES (?, ?, 'CREDIT', ?, ?, 'PREPARED')
+            """, (txid, user[0], amount, from_account))
+            return user[1]
+
+    # Phase two on the sending shard, and the decision: the debit, its
+    # TRANSFER_OUT row and the COMMITTED record commit together, or an
+    # ABORTED record is written instead. A txid recovery already aborted
+    # stays aborted.
+    def debit(self, txid, from_account, to_account, to_name, amount):
+        with self.db.write_transaction() as cur:
+            decided = cur.execute("SELECT state FROM shard_transfers WHERE txid = ?", (txid,)).fetchone()
+            if decided is not None: return decided[0], "Transfer failed", None
+            user = cur.execute("SELECT id, name FROM users WHERE account_number = ?", (from_account,)).fetchone()
+            if user is None:
+                state, message = "ABORTED", "Account not found"
+            elif cur.execute("UPDATE users SET balance = balance - ? WHERE id = ? AND balance >= ?",
+                             (amount, user[0], amount)).rowcount != 1:
+                state, message = "ABORTED", "Insufficient balance"
+            else:
+                cur.execute("""
+                    INSERT INTO transactions (user_id, type, amount, recipient_account, description)
+                    VALUES (?, 'TRANSFER_OUT', ?, ?, ?)
+                """, (user[0], amount, to_account, f"Transfer to {to_name}"))
+                # The contacts trigger looks the name up locally, and the
+                # recipient lives on another shard.
+                cur.execute("UPDATE contacts SET name = ? WHERE user_id = ? AND account_number = ?",
+                            (to_name, user[0], to_account))
+                state, message = "COMMITTED", "Transfer successful"
+            cur.execute("""
+                INSERT INTO shard_transfers (txid, user_id, side, amount, counterparty, state)
+                VALUES (?, ?, 'DEBIT', ?, ?, ?)
+            """, (txid, user[0] if user else None, amount, to_account, state))
+            return state, message, user[1] if user else None
+
+    def settle_credit(self, txid, commit, from_name):
+        with self.db.write_transaction() as cur:
+            row = cur.execute("SELECT user_id, amount, counterparty, state FROM shard_transfers WHERE txid = ?",
+                              (txid,)).fetchone()
+            if row is None or row[3] != "PREPARED": return row[3] if row else None
+            user_id, amount, from_account, _ = row
+            if commit:
+                cur.execute("UPDATE users SET balance = balance + ? WHERE id = ?", (amount, user_id))
+                cur.execute("""
+                    INSERT INTO transactions (user_id, type, amount, recipient_account, description)
+                    VALUES (?, 'TRANSFER_IN', ?, ?, ?)
+                """, (user_id, amount, from_account, f"Transfer from {from_name or 'Unknown'}"))
+            state = "COMMITTED" if commit else "ABORTED"
+            cur.execute("UPDATE shard_transfers SET state = ? WHERE txid = ?", (state, txid))
+            return state
+
+    # Recovery's question to the sending shard. A txid it never debited is
+    # recorded as aborted first, so a debit still in flight cannot commit it.
+    def decision(self, txid):
+        with self.db.write_transaction() as cur:
+            row = cur.execute("""
+                SELECT t.state, u.name FROM shard_transfers t LEFT JOIN users u ON u.id = t.user_id WHERE t.txid = ?
+            """, (txid,)).fetchone()
+            if row is not None: return row
+            cur.execute("""
+                INSERT INTO shard_transfers (txid, user_id, side, amount, counterparty, state)
+                VALUES (?, NULL, 'DEBIT', 0, '', 'ABORTED')
+            """, (txid,))
+            return "ABORTED", None
+
+    def open_credits(self):
+        return self.db.read_cursor.execute(
+            "SELECT txid, counterparty FROM shard_transfers WHERE state = 'PREPARED'").fetchall()
+
+    def total_balance(self):
+        return self.db.read_cursor.execute("SELECT COALESCE(SUM(balance), 0) FROM users").fetchone()[0]
+
+
+def serve_shard(path, db_options, conn):
+    shard = Shard(DatabaseManager(path, **db_options))
+    try:
+        while True:
+            message = conn.recv()
+            if message is None: break
+            request_id, method, args = message
+            try:
+                target = getattr(shard, method, None) or getattr(shard.db, method)
+                conn.send((request_id, True, target(*args)))
+            except Exception as e:
+                try:
+                    conn.send((request_id, False, e))
+                except Exception:
+                    conn.send((request_id, False, RuntimeError(f"{type(e).__name__}: {e}")))
+    finally:
+        shard.db.close()
+
+
+# A shard owned by a worker process. Requests from any thread are piped to
+# it and answered through futures; the worker runs them one at a time, which
+# is all a sqlite writer can do anyway.
+class ShardProcess:
+    def __init__(self, path, db_options):
+        context = multiprocessing.get_context("spawn")
+        self._conn, child = context.Pipe()
+        self.process = context.Process(target=serve_shard, args=(path, db_options, child), daemon=True,
+                                       name=f"securebank-shard-{os.path.basename(path)}")
+        self.process.start()
+        child.close()
+        self._ids = itertools.count()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._exited = False
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        while True:
+            try:
+                request_id, ok, result = self._conn.recv()
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                future = self._pending.pop(request_id)
+            if ok: future.set_result(result)
+            else: future.set_exception(result)
+        with self._lock:
+            self._exited = True
+            pending, self._pending = list(self._pending.values()), {}
+        for future in pending:
+            future.set_exception(ShardUnavailable("Shard worker exited"))
+
+    def submit(self, method, *args):
+        future = Future()
+        with self._lock:
+            if self._exited:
+                future.set_exception(ShardUnavailable("Shard worker exited"))
+                return future
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            try:
+                self._conn.send((request_id, method, args))
+            except OSError:
+                del self._pending[request_id]
+                future.set_exception(ShardUnavailable("Shard worker exited"))
+        return future
+
+    def call(self, method, *args):
+        return self.submit(method, *args).result()
+
+    def close(self):
+        with self._lock:
+            if not self._exited:
+                try:
+                    self._conn.send(None)
+                except OSError:
+                    pass
+        self.process.join()
+        self._reader.join()
+        self._conn.close()
+
+
+# The same interface on a single thread of this process, for in-memory
+# shards and for callers that do not want worker processes.
+class ShardThread:
+    def __init__(self, path, db_options):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="securebank-shard")
+        self.shard = self._executor.submit(lambda: Shard(DatabaseManager(path, **db_options))).result()
+
+    def _run(self, method, args):
+        return (getattr(self.shard, method, None) or getattr(self.shard.db, method))(*args)
+
+    def submit(self, method, *args):
+        return self._executor.submit(self._run, method, args)
+
+    def call(self, method, *args):
+        return self.submit(method, *args).result()
+
+    def close(self):
+        self._executor.submit(self.shard.db.close).result()
+        self._executor.shutdown()
+
+
+# Spreads accounts over `shards` sqlite files (bank.shard0.db, ...) by a
+# stable hash of the account number, each owned by its own worker process so
+# writes to different shards commit in parallel. User ids handed out are
+# global (local id * shards + shard index) and route back to their shard.
+# Transfers between shards run in two phases: the recipient's shard prepares
+# the credit, the sender's shard debits and records the decision in one
+# local transaction, then the credit is settled from it. A step that fails,
+# on a sqlite error or because a shard's worker died (ShardUnavailable),
+# leaves the credit to be settled from the decision: retried, then kept in
+# `unsettled` and settled again before the next cross-shard transfer and on
+# close; recover() (run on open) settles credits left prepared by a crash.
+# The shard count is fixed once files exist, and only one ShardedDatabase may
+# own a set of shards.
+#
+# A prototype driven by sharding.py, kept out of the securebank package: it
+# covers the posting path only (users, lookups, deposits, withdrawals,
+# history pages, transfers) and is not a storage mode of the application.
+class ShardedDatabase:
+    def __init__(self, db_name="bank.db", shards=4, processes=True, **db_options):
+        self.count = shards
+        if db_name == ":memory:":
+            paths, processes = [":memory:"] * shards, False
+        else:
+            root, ext = os.path.splitext(db_name)
+            paths = [f"{root}.shard{i}{ext or '.db'}" for i in range(shards)]
+        self.paths = paths
+        worker = ShardProcess if processes else ShardThread
+        self.shards = [worker(path, db_options) for path in paths]
+        self.unsettled = {}
+        self._unsettled_lock = threading.Lock()
+        self.recover()
+
+    def shard_index(self, account_number):
+        return zlib.crc32(str(account_number).encode()) % self.count
+
+    def shard_for(self, account_number):
+        return self.shards[self.shard_index(account_number)]
+
+    def _local(self, user_id):
+        return self.shards[user_id % self.count], user_id // self.count
+
+    def _global(self, index, row):
+        if row is None: return None
+        return (row[0] * self.count + index,) + tuple(row[1:])
+
+    def create_user(self, name, pin, account_number, balance=0):
+        return self.shard_for(account_number).call("create_user", name, pin, account_number, balance)
+
+    # All shards insert their part in parallel; a duplicate rolls back only
+    # the shard it belongs to.
+    def create_users(self, users):
+        groups = {}
+        for user in users:
+            groups.setdefault(self.shard_index(user[2]), []).append(user)
+        futures = [self.shards[i].submit("create_users", group) for i, group in groups.items()]
+        return sum(future.result() for future in futures)
+
+    def get_user_by_account(self, account_number):
+        index = self.shard_index(account_number)
+        return self._global(index, self.shards[index].call("get_user_by_account", account_number))
+
+    def get_user_by_id(self, user_id):
+        shard, local_id = self._local(user_id)
+        return self._global(user_id % self.count, shard.call("get_user_by_id", local_id))
+
+    def deposit(self, user_id, amount, description="Deposit"):
+        shard, local_id = self._local(user_id)
+        return shard.call("deposit", local_id, amount, description)
+
+    def withdraw(self, user_id, amount, description="Withdrawal"):
+        shard, local_id = self._local(user_id)
+        return shard.call("withdraw", local_id, amount, description)
+
+    def get_transaction_page(self, user_id, before_id=None, page_size=50):
+        shard, local_id = self._local(user_id)
+        return shard.call("get_transaction_page", local_id, before_id, page_size)
+
+    def transfer_money(self, from_account, to_account, amount):
+        source, target = self.shard_for(from_account), self.shard_for(to_account)
+        if source is target: return source.call("transfer_money", from_account, to_account, amount)
+        if self.unsettled: self.settle_pending()
+        txid = uuid.uuid4().hex
+        try:
+            to_name = target.call("prepare_credit", txid, to_account, from_account, amount)
+        except SHARD_ERRORS as e:
+            # The credit may have been prepared; abort it.
+            self._settle(txid, source, target)
+            return False, str(e)
+        if to_name is None: return False, "Account not found"
+        try:
+            state, message, from_name = source.call("debit", txid, from_account, to_account, to_name, amount)
+        except SHARD_ERRORS as e:
+            # The debit may or may not have committed; ask its shard.
+            state = self._settle(txid, source, target)
+            return state == "COMMITTED", "Transfer successful" if state == "COMMITTED" else str(e)
+        for attempt in range(SETTLE_ATTEMPTS):
+            try:
+                target.call("settle_credit", txid, state == "COMMITTED", from_name)
+                break
+            except SHARD_ERRORS:
+                time.sleep(SETTLE_BACKOFF * 2 ** attempt)
+        else:
+            # The decision is durable, so the outcome stands; only the
+            # credit waits for settle_pending().
+            with self._unsettled_lock:
+                self.unsettled[txid] = (source, target)
+        return state == "COMMITTED", message
+
+    # Returns the decision, or None if a shard failed and the transfer was
+    # left in `unsettled`.
+    def _settle(self, txid, source, target):
+        try:
+            state, from_name = source.call("decision", txid)
+            target.call("settle_credit", txid, state == "COMMITTED", from_name)
+        except SHARD_ERRORS:
+            with self._unsettled_lock:
+                self.unsettled[txid] = (source, target)
+            return None
+        with self._unsettled_lock:
+            self.unsettled.pop(txid, None)
+        return state
+
+    # Settles again every transfer whose settle failed in this process;
+    # returns how many are still unsettled.
+    def settle_pending(self):
+        with self._unsettled_lock:
+            pending = list(self.unsettled.items())
+        for txid, (source, target) in pending:
+            self._settle(txid, source, target)
+        return len(self.unsettled)
+
+    # Settles every credit still prepared, from its sending shard's decision.
+    def recover(self):
+        settled = 0
+        for target, credits in zip(self.shards, [shard.submit("open_credits") for shard in self.shards]):
+            for txid, from_account in credits.result():
+                self._settle(txid, self.shard_for(from_account), target)
+                settled += 1
+        return settled
+
+    def total_balance(self):
+        return sum(future.result() for future in [shard.submit("total_balance") for shard in self.shards])
+
+    def close(self):
+        if self.unsettled: self.settle_pending()
+        for shard in self.shards:
+            shard.close()
@@ -0,0 +1,78 @@
+"""Measure posting throughput of ShardedDatabase at several shard counts.
+
+Each run seeds fresh shard files with the same accounts, then posts a fixed
+mix of deposits, withdrawals and transfers from many client threads and
+reports postings per second, the share of transfers that crossed shards and
+whether the total balance came out where the seeded deposits put it.
+
+    python benchmarks/sharding.py --shards 1,2,4,8 --operations 20000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from securebank.accounts import account_number_for  # noqa: E402
+from sharded_database import ShardedDatabase  # noqa: E402
+
+BALANCE = 10 ** 6
+
+
+def run(shards, users, operations, clients, durability, seed_value):
+    rng = random.Random(seed_value)
+    numbers = [account_number_for(i) for i in range(users)]
+    with tempfile.TemporaryDirectory() as tmp:
+        db = ShardedDatabase(os.path.join(tmp, "bench.db"), shards=shards, durability=durability)
+        db.create_users([(f"User {i}", "1234", number, BALANCE) for i, number in enumerate(numbers)])
+        ids = [db.get_user_by_account(number)[0] for number in numbers]
+        work, deposited, crossing = [], 0, 0
+        for _ in range(operations):
+            kind = rng.random()
+            if kind < 0.2:
+                amount = rng.randint(1, 500)
+                deposited += amount
+                work.append((db.deposit, rng.choice(ids), amount))
+            elif kind < 0.3:
+                work.append((db.withdraw, rng.choice(ids), rng.randint(1, 500)))
+            else:
+                source, target = rng.sample(numbers, 2)
+                crossing += db.shard_index(source) != db.shard_index(target)
+                work.append((db.transfer_money, source, target, rng.randint(1, 500)))
+        start = time.perf_counter()
+        with ThreadPoolExecutor(clients) as pool:
+            results = list(pool.map(lambda job: job[0](*job[1:]), work))
+        elapsed = time.perf_counter() - start
+        withdrawn = sum(job[2] for job, result in zip(work, results) if job[0] == db.withdraw and result is not None)
+        balanced = db.total_balance() == users * BALANCE + deposited - withdrawn
+        db.close()
+    return {"per_second": round(operations / elapsed), "seconds": round(elapsed, 2),
+            "cross_shard": round(crossing / max(1, operations), 3), "balanced": balanced}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shards", default="1,2,4", help="comma separated shard counts")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--operations", type=int, default=10000)
+    parser.add_argument("--clients", type=int, default=32, help="threads issuing postings")
+    parser.add_argument("--durability", default="strict", help="durability profile for every shard")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    print(f"{os.cpu_count()} CPUs, {args.operations:,} postings over {args.users:,} accounts")
+    for shards in [int(s) for s in args.shards.split(",") if s]:
+        result = run(shards, args.users, args.operations, args.clients, args.durability, args.seed)
+        print(f"  {shards:>2} shards  {result['per_second']:>8,} postings/s  ({result['seconds']}s, "
+              f"{result['cross_shard']:.0%} of postings cross shards, "
+              f"{'balanced' if result['balanced'] else 'TOTAL BALANCE MISMATCH'})")
+        if not result["balanced"]: return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
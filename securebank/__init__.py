@@ -0,0 +1,27 @@
+# Headless banking backend. Importing this package never loads Tk; the GUI
+# lives in securebank.gui and is only imported when the app is launched.
+from .accounts import AccountNumberAllocator, luhn_valid
+from .archive import Archiver
+from .batch import BatchPoster
+from .changes import ChangeWatcher
+from .controller import BankController, extract_account_number
+from .database import DURABILITY_PROFILES, SCHEMA_MIGRATIONS, ConnectionPool, DatabaseManager
+from .scheduler import TransferScheduler
+from .sessions import Session, SessionManager
+
+__all__ = [
+    "AccountNumberAllocator",
+    "Archiver",
+    "BankController",
+    "BatchPoster",
+    "ChangeWatcher",
+    "ConnectionPool",
+    "DatabaseManager",
+    "DURABILITY_PROFILES",
+    "SCHEMA_MIGRATIONS",
+    "Session",
+    "SessionManager",
+    "TransferScheduler",
+    "extract_account_number",
+    "luhn_valid",
+]
@@ -0,0 +1,58 @@
+import threading
+
+# Account numbers are a 9 digit body plus a Luhn check digit. The body is a
+# fixed permutation of a counter stored in the account_sequence table, so
+# numbers are unique by construction without looking sequential.
+BODY_SPACE = 900000000
+BODY_MULTIPLIER = 982451653  # coprime with BODY_SPACE, so the mapping is a bijection
+BODY_OFFSET = 123456789
+
+
+def luhn_check_digit(body):
+    total = 0
+    for i, ch in enumerate(reversed(body)):
+        digit = int(ch)
+        if i % 2 == 0:
+            digit *= 2
+            if digit > 9: digit -= 9
+        total += digit
+    return str((10 - total % 10) % 10)
+
+
+def luhn_valid(number):
+    if not number or not number.isdigit() or len(number) < 2: return False
+    return luhn_check_digit(number[:-1]) == number[-1]
+
+
+def account_number_for(sequence):
+    body = str((sequence * BODY_MULTIPLIER + BODY_OFFSET) % BODY_SPACE + 100000000)
+    return body + luhn_check_digit(body)
+
+
+# Hands out account numbers from blocks of the shared counter. A block is
+# claimed in one short write transaction, so several processes can allocate
+# at once and never see the same counter value.
+class AccountNumberAllocator:
+    def __init__(self, db, block_size=1000):
+        self.db = db
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._next = self._end = 0
+
+    def _reserve(self, count):
+        with self.db.write_transaction() as cur:
+            start = cur.execute("SELECT next_value FROM account_sequence WHERE id = 1").fetchone()[0]
+            if start + count > BODY_SPACE: raise RuntimeError("Account number space exhausted")
+            cur.execute("UPDATE account_sequence SET next_value = ? WHERE id = 1", (start + count,))
+        return start, start + count
+
+    def allocate(self, count=1):
+        numbers = []
+        with self._lock:
+            while len(numbers) < count:
+                if self._next == self._end:
+                    self._next, self._end = self._reserve(max(self.block_size, count - len(numbers)))
+                take = min(self._end - self._next, count - len(numbers))
+                numbers.extend(account_number_for(s) for s in range(self._next, self._next + take))
+                self._next += take
+        return numbers
@@ -0,0 +1,178 @@
+import threading
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:  # insights are simply unavailable without numpy
+    np = None
+
+TYPE_CODES = {"DEPOSIT": 0, "WITHDRAW": 1, "TRANSFER_IN": 2, "TRANSFER_OUT": 3}
+TYPE_NAMES = {code: name for name, code in TYPE_CODES.items()}
+INCOME_CODES = (0, 2)
+TRANSFER_CODES = (2, 3)
+
+
+# One user's history as parallel arrays, extended in place as new rows are
+# posted; counterparties are interned to small ints so they can be binned.
+class Series:
+    def __init__(self):
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.kinds = np.zeros(0, dtype=np.int8)
+        self.amounts = np.zeros(0, dtype=np.int64)
+        self.times = np.zeros(0, dtype=np.int64)
+        self.parties = np.zeros(0, dtype=np.int64)
+        self.party_names = []
+        self.party_codes = {}
+        self.last_id = 0
+        self.results = {}
+
+    def extend(self, rows):
+        if not rows: return
+        ids, kinds, amounts, times, parties = zip(*rows)
+        codes = []
+        for party in parties:
+            if party not in self.party_codes:
+                self.party_codes[party] = len(self.party_names)
+                self.party_names.append(party)
+            codes.append(self.party_codes[party])
+        self.ids = np.concatenate([self.ids, np.array(ids, dtype=np.int64)])
+        self.kinds = np.concatenate([self.kinds, np.array([TYPE_CODES.get(k, 1) for k in kinds], dtype=np.int8)])
+        self.amounts = np.concatenate([self.amounts, np.array(amounts, dtype=np.int64)])
+        self.times = np.concatenate([self.times, np.array(times, dtype=np.int64)])
+        self.parties = np.concatenate([self.parties, np.array(codes, dtype=np.int64)])
+        self.last_id = int(self.ids[-1])
+        self.results = {}
+
+    @property
+    def signed(self):
+        income = np.isin(self.kinds, INCOME_CODES)
+        return np.where(income, self.amounts, -self.amounts), income
+
+
+def rolling_mean(values, window):
+    if len(values) == 0: return values.astype(np.float64)
+    sums = np.cumsum(np.concatenate([[0], values]).astype(np.float64))
+    counts = np.minimum(np.arange(1, len(values) + 1), window)
+    return (sums[1:] - sums[np.maximum(np.arange(1, len(values) + 1) - window, 0)]) / counts
+
+
+def to_timestamp(seconds):
+    return str(np.datetime64(int(seconds), "s")).replace("T", " ")
+
+
+# Vectorized insights over a user's full history. Each user's columns are
+# cached (least recently used users are dropped first) and topped up with
+# just the rows past a max-id watermark, so after the first load a page
+# costs one indexed MAX(id) lookup plus array arithmetic.
+class AnalyticsEngine:
+    available = np is not None
+
+    def __init__(self, db, max_users=64):
+        self.db = db
+        self.max_users = max_users
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Reads the hot table and, once attached, the archive (which only holds
+    # ids older than the user's hot rows), so archiving changes nothing here;
+    # rows moved after they were cached stay cached as they were.
+    def series(self, user_id):
+        sources = self.db._history_sources(user_id)[::-1]  # oldest store first
+        with self.db.read_snapshot() as cur:
+            latest = max(cur.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table} WHERE {where}", params).fetchone()[0]
+                         for table, where, params in sources)
+            with self._lock:
+                series = self._cache.pop(user_id, None) or Series()
+                self._cache[user_id] = series
+                while len(self._cache) > self.max_users:
+                    self._cache.popitem(last=False)
+                if latest > series.last_id:
+                    rows = []
+                    for table, where, params in sources:
+                        rows += cur.execute(f"""
+                            SELECT id, type, amount, CAST(strftime('%s', timestamp) AS INTEGER),
+                                   COALESCE(recipient_account, '')
+                            FROM {table} WHERE {where} AND id > ? ORDER BY id
+                        """, params + [series.last_id]).fetchall()
+                    series.extend(rows)
+                return series
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            if user_id is None: self._cache.clear()
+            else: self._cache.pop(user_id, None)
+
+    def _periods(self, series, unit, count):
+        _, income = series.signed
+        if unit == "month":
+            keys = series.times.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64)
+            today = np.datetime64("today", "M").astype(np.int64)
+        else:
+            # numpy weeks start on Thursday; shift so they start on Monday
+            keys = (series.times // 86400 + 3) // 7
+            today = (np.datetime64("today", "D").astype(np.int64) + 3) // 7
+        first = today - count + 1
+        keep = keys >= first
+        slots = (keys[keep] - first).astype(np.int64)
+        incomes = np.bincount(slots, weights=np.where(income[keep], series.amounts[keep], 0), minlength=count)[:count]
+        expenses = np.bincount(slots, weights=np.where(income[keep], 0, series.amounts[keep]), minlength=count)[:count]
+        net = incomes - expenses
+        average = rolling_mean(net, 3)
+        periods = []
+        for i in range(count):
+            if unit == "month": label = str(np.datetime64(int(first + i), "M"))
+            else: label = str(np.datetime64(int((first + i) * 7 - 3), "D"))
+            periods.append({"period": label, "income": int(incomes[i]), "expense": int(expenses[i]),
+                            "net": int(net[i]), "rolling_net": round(float(average[i]), 2)})
+        return periods
+
+    def _balance_curve(self, series, balance, points):
+        if not len(series.ids): return []
+        signed, _ = series.signed
+        # Anchor on the stored balance so opening balances are accounted for.
+        curve = balance - signed.sum() + np.cumsum(signed)
+        picks = np.unique(np.linspace(0, len(curve) - 1, min(points, len(curve))).astype(np.int64))
+        return [(to_timestamp(series.times[i]), int(curve[i])) for i in picks]
+
+    def _counterparties(self, series, limit):
+        transfers = np.isin(series.kinds, TRANSFER_CODES) & (series.parties != series.party_codes.get("", -1))
+        if not transfers.any(): return []
+        parties, kinds, amounts = series.parties[transfers], series.kinds[transfers], series.amounts[transfers]
+        size = len(series.party_names)
+        sent = np.bincount(parties, weights=np.where(kinds == 3, amounts, 0), minlength=size)
+        received = np.bincount(parties, weights=np.where(kinds == 2, amounts, 0), minlength=size)
+        counts = np.bincount(parties, minlength=size)
+        volume = sent + received
+        top = [i for i in np.argsort(-volume, kind="stable")[:limit] if volume[i] > 0]
+        numbers = [series.party_names[i] for i in top]
+        names = dict(self.db.read_cursor.execute(
+            f"SELECT account_number, name FROM users WHERE account_number IN ({','.join('?' * len(numbers))})",
+            numbers).fetchall()) if numbers else {}
+        return [{"account_number": series.party_names[i], "name": names.get(series.party_names[i], "Unknown"),
+                 "sent": int(sent[i]), "received": int(received[i]), "count": int(counts[i])} for i in top]
+
+    def _largest(self, series, limit):
+        if not len(series.ids): return []
+        count = min(limit, len(series.amounts))
+        top = np.argpartition(-series.amounts, count - 1)[:count]
+        top = top[np.lexsort((-series.ids[top], -series.amounts[top]))]
+        return [{"id": int(series.ids[i]), "type": TYPE_NAMES.get(int(series.kinds[i]), "WITHDRAW"),
+                 "amount": int(series.amounts[i]), "counterparty": series.party_names[series.parties[i]] or None,
+                 "timestamp": to_timestamp(series.times[i])} for i in top]
+
+    def insights(self, user_id, balance, months=12, weeks=12, points=120, limit=5):
+        series = self.series(user_id)
+        key = (balance, months, weeks, points, limit, str(np.datetime64("today", "D")))
+        with self._lock:
+            cached = series.results.get(key)
+            if cached is not None: return cached
+            result = {
+                "transactions": int(len(series.ids)),
+                "monthly": self._periods(series, "month", months),
+                "weekly": self._periods(series, "week", weeks),
+                "balance_curve": self._balance_curve(series, balance, points),
+                "top_counterparties": self._counterparties(series, limit),
+                "largest_movements": self._largest(series, limit),
+            }
+            series.results[key] = result
+            return result
@@ -0,0 +1,84 @@
+import time
+
+# Moves transactions older than a cutoff into the attached archive database,
+# leaving per user/month/type totals behind in archived_totals. Only a prefix
+# of the id sequence is moved (everything before the first row that is still
+# young enough), so for any user the archive holds strictly older rows than
+# the hot table and history reads can simply continue there. Each id range is
+# first copied and committed, then deleted from the hot table only where the
+# archive already has the row, so a crash at any point loses nothing and a
+# rerun picks up where it stopped.
+class Archiver:
+    COLUMNS = "id, user_id, type, amount, recipient_account, timestamp, description"
+
+    def __init__(self, db, batch_size=5000):
+        self.db = db
+        self.batch_size = batch_size
+
+    def boundary(self, older_than_days):
+        cur = self.db.read_cursor
+        # Walks the rowid order from the start and stops at the first young
+        # row, so it reads no more than the rows about to be archived.
+        young = cur.execute("""
+            SELECT id FROM transactions WHERE NOT timestamp < datetime('now', ?) ORDER BY id LIMIT 1
+        """, (f"-{int(older_than_days)} days",)).fetchone()
+        if young is not None: return young[0]
+        return cur.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM transactions").fetchone()[0]
+
+    def _copy(self, low, high):
+        with self.db.write_transaction() as cur:
+            cur.execute(f"""
+                INSERT OR IGNORE INTO archive.transactions ({self.COLUMNS})
+                SELECT {self.COLUMNS} FROM main.transactions WHERE id >= ? AND id < ?
+            """, (low, high))
+
+    def _evict(self, low, high):
+        archived = "id >= ? AND id < ? AND id IN (SELECT id FROM archive.transactions WHERE id >= ? AND id < ?)"
+        with self.db.write_transaction() as cur:
+            cur.execute(f"""
+                INSERT INTO archived_totals (user_id, month, type, total, count, first_id, last_id)
+                SELECT user_id, strftime('%Y-%m', timestamp), type, SUM(amount), COUNT(*), MIN(id), MAX(id)
+                FROM main.transactions WHERE {archived}
+                GROUP BY user_id, strftime('%Y-%m', timestamp), type
+                ON CONFLICT (user_id, month, type) DO UPDATE SET
+                    total = total + excluded.total, count = count + excluded.count,
+                    first_id = MIN(first_id, excluded.first_id), last_id = MAX(last_id, excluded.last_id)
+            """, (low, high, low, high))
+            cur.execute(f"DELETE FROM main.transactions WHERE {archived}", (low, high, low, high))
+            return cur.rowcount
+
+    # Hands the pages freed by the move back to the filesystem. A file
+    # created before auto_vacuum was turned on is converted by one full
+    # VACUUM the first time; later runs are incremental.
+    def vacuum(self):
+        cur = self.db.cursor
+        if self.db.pool.in_memory: return "skipped"
+        freed = cur.execute("PRAGMA main.freelist_count").fetchone()[0]
+        if cur.execute("PRAGMA main.auto_vacuum").fetchone()[0] == 2:
+            cur.execute("PRAGMA main.incremental_vacuum").fetchall()
+            mode = "incremental"
+        else:
+            cur.execute("PRAGMA main.auto_vacuum = INCREMENTAL")
+            cur.execute("VACUUM main")
+            mode = "full, auto_vacuum now incremental"
+        # Under WAL the file only shrinks once the change is checkpointed.
+        cur.execute("PRAGMA main.wal_checkpoint(TRUNCATE)").fetchall()
+        return f"{mode} ({freed} pages freed)"
+
+    def run(self, older_than_days=365, vacuum=True):
+        start = time.perf_counter()
+        self.db.open_archive()
+        boundary = self.boundary(older_than_days)
+        low = self.db.read_cursor.execute("SELECT MIN(id) FROM transactions").fetchone()[0]
+        moved = 0
+        if low is not None:
+            for first in range(low, boundary, self.batch_size):
+                last = min(first + self.batch_size, boundary)
+                self._copy(first, last)
+                moved += self._evict(first, last)
+        return {
+            "archived": moved,
+            "boundary_id": boundary,
+            "vacuum": self.vacuum() if vacuum and moved else "skipped",
+            "seconds": round(time.perf_counter() - start, 3),
+        }
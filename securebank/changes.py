@@ -0,0 +1,86 @@
+import itertools
+import threading
+
+
+# Notices commits made by any connection or process and reports, per watched
+# account, the transactions added since the last poll and the new balance.
+# PRAGMA data_version only changes when another connection has committed, so
+# an idle poll is a single pragma; when it does change, the watched accounts'
+# new rows are read off the (user_id, id) index between the last max-id
+# watermark and the current one, so other customers' postings are never read.
+class ChangeWatcher:
+    LOOKUP_BATCH = 500
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._conn = None
+        self._lock = threading.Lock()
+        self._handles = itertools.count(1)
+        self._watched = {}  # user_id -> {"balance": int | None, "callbacks": {handle: callback}}
+        self._version = None
+        self._last_id = None
+
+    def subscribe(self, user_id, callback):
+        with self._lock:
+            handle = next(self._handles)
+            self._watched.setdefault(user_id, {"balance": None, "callbacks": {}})["callbacks"][handle] = callback
+            self._version = None  # make the next poll read the new account's balance
+        return handle
+
+    def unsubscribe(self, handle):
+        with self._lock:
+            for user_id, watch in list(self._watched.items()):
+                if watch["callbacks"].pop(handle, None) is not None and not watch["callbacks"]:
+                    del self._watched[user_id]
+
+    # Returns [(callback, change)] for the caller to deliver on whichever
+    # thread it likes; change is {"user_id", "balance", "delta", "transactions"}
+    # with transactions as (id, type, amount, recipient_account, timestamp,
+    # description) rows, oldest first.
+    def poll(self):
+        with self._lock:
+            if not self._watched: return []
+            if self._conn is None: self._conn = self.pool.dedicated()
+            cur = self._conn.cursor()
+            version = cur.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._version and not self.pool.in_memory: return []
+            self._version = version
+            if self._last_id is None:
+                self._last_id = cur.execute("SELECT COALESCE(MAX(id), 0) FROM transactions").fetchone()[0]
+
+            # Ids are handed out in commit order, so nothing committed after
+            # this read can land at or below the new watermark.
+            last_id = cur.execute("SELECT COALESCE(MAX(id), 0) FROM transactions").fetchone()[0]
+            rows, balances = {}, {}
+            user_ids = list(self._watched)
+            for i in range(0, len(user_ids), self.LOOKUP_BATCH):
+                batch = user_ids[i:i + self.LOOKUP_BATCH]
+                marks = ",".join("?" * len(batch))
+                if last_id > self._last_id:
+                    for row in cur.execute(f"""
+                        SELECT id, user_id, type, amount, recipient_account, timestamp, description
+                        FROM transactions WHERE user_id IN ({marks}) AND id > ? AND id <= ? ORDER BY id
+                    """, batch + [self._last_id, last_id]):
+                        rows.setdefault(row[1], []).append(row[:1] + row[2:])
+                balances.update(cur.execute(f"SELECT id, balance FROM users WHERE id IN ({marks})", batch).fetchall())
+            self._last_id = last_id
+
+            pending = []
+            for user_id, watch in self._watched.items():
+                balance, previous = balances.get(user_id), watch["balance"]
+                watch["balance"] = balance
+                if balance is None: continue
+                if not rows.get(user_id) and (previous is None or balance == previous): continue
+                change = {
+                    "user_id": user_id,
+                    "balance": balance,
+                    "delta": None if previous is None else balance - previous,
+                    "transactions": rows.get(user_id, []),
+                }
+                pending.extend((callback, change) for callback in watch["callbacks"].values())
+            return pending
+
+    @staticmethod
+    def dispatch(pending):
+        for callback, change in pending:
+            callback(change)
@@ -0,0 +1,148 @@
+import argparse
+import csv
+import os
+
+from .archive import Archiver
+from .batch import BatchPoster
+from .controller import BankController
+from .database import DURABILITY_PROFILES, DatabaseManager
+from .metrics import METRICS
+from .scheduler import TransferScheduler, parse_time
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="securebank", description="SecureBank")
+    parser.add_argument("--db", default="bank.db", help="path to the sqlite database")
+    parser.add_argument("--durability", choices=sorted(DURABILITY_PROFILES), default="strict",
+                        help="commit durability profile (default: strict)")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="enable instrumentation and write metrics here (.json, otherwise Prometheus text)")
+    parser.add_argument("--slow-ms", type=float, default=100.0, help="slow call threshold for --metrics (default: 100)")
+    commands = parser.add_subparsers(dest="command")
+    batch = commands.add_parser("post-batch", help="post a CSV/JSONL file of operations without the GUI")
+    batch.add_argument("file")
+    batch.add_argument("--report", help="result report path (default: <file>.report.csv)")
+    batch.add_argument("--chunk-size", type=int, default=5000)
+    onboard = commands.add_parser("onboard", help="create accounts in bulk from a CSV file (name,pin,balance)")
+    onboard.add_argument("file")
+    onboard.add_argument("--report", help="result report path (default: <file>.accounts.csv)")
+    serve = commands.add_parser("serve", help="run the local JSON API server")
+    serve.add_argument("--host", default="127.0.0.1", help="loopback address to bind (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8080)
+    serve.add_argument("--workers", type=int, default=8, help="threads running database calls")
+    reconcile = commands.add_parser("reconcile", help="recompute balances from the journal and report drift")
+    reconcile.add_argument("--snapshot", action="store_true", help="record balance snapshots after a clean run")
+    archive = commands.add_parser("archive", help="move old transactions to the archive database")
+    archive.add_argument("--older-than-days", type=int, default=365)
+    archive.add_argument("--batch-size", type=int, default=5000)
+    archive.add_argument("--no-vacuum", action="store_true", help="skip the vacuum after moving rows")
+    schedules = commands.add_parser("run-schedules", help="execute the standing orders that are due")
+    schedules.add_argument("--batch-size", type=int, default=1000, help="orders per write transaction")
+    schedules.add_argument("--max-attempts", type=int, default=3, help="tries per payment before it is failed")
+    schedules.add_argument("--retry-minutes", type=float, default=60)
+    schedules.add_argument("--now", type=parse_time, help="run as if it were this UTC time (YYYY-MM-DD[ HH:MM[:SS]])")
+    commands.add_parser("snapshot-balances", help="record per-account balance snapshots from the journal")
+    commands.add_parser("rebuild-aggregates", help="recompute analytics totals from the transactions table and its archive")
+    args = parser.parse_args(argv)
+    if not args.metrics: return dispatch(args)
+    METRICS.enable(slow_ms=args.slow_ms)
+    finish = METRICS.export_periodically(args.metrics)
+    try:
+        return dispatch(args)
+    finally:
+        finish()
+
+
+def dispatch(args):
+    if args.command == "post-batch":
+        db = DatabaseManager(args.db, durability=args.durability)
+        try:
+            summary = BatchPoster(db, chunk_size=args.chunk_size).post(args.file, args.report)
+        finally:
+            db.close()
+        print(f"Posted {summary['posted']}, rejected {summary['rejected']}. Report: {summary['report']}")
+        return 0
+
+    if args.command == "onboard":
+        with open(args.file, newline="", encoding="utf-8") as f:
+            records = [(r.get("name"), r.get("pin"), r.get("balance")) for r in csv.DictReader(f)]
+        controller = BankController(args.db, durability=args.durability)
+        try:
+            results = controller.onboard_accounts(records)
+        finally:
+            controller.db.close()
+        report_path = args.report or os.path.splitext(args.file)[0] + ".accounts.csv"
+        with open(report_path, "w", newline="", encoding="utf-8") as report:
+            writer = csv.writer(report)
+            writer.writerow(["line", "name", "account_number", "status", "message"])
+            for line_no, (name, number, error) in enumerate(results, start=2):
+                writer.writerow([line_no, name, number, "REJECTED" if error else "CREATED", error or ""])
+        created = sum(1 for r in results if not r[2])
+        print(f"Created {created}, rejected {len(results) - created}. Report: {report_path}")
+        return 0
+
+    if args.command == "serve":
+        from .server import run as serve_api
+        serve_api(args.db, args.host, args.port, args.workers, durability=args.durability)
+        return 0
+
+    if args.command == "reconcile":
+        from .ledger import Reconciler
+        db = DatabaseManager(args.db, durability=args.durability)
+        try:
+            report = Reconciler(db).run()
+            clean = not report["drift"] and report["imbalance"] == 0
+            if clean and args.snapshot: db.take_balance_snapshots()
+        finally:
+            db.close()
+        print(f"Checked {report['entries']:,} journal entries for {report['accounts']:,} accounts "
+              f"in {report['seconds']}s; imbalance {report['imbalance']}.")
+        for row in report["drift"]:
+            print(f"  {row['account_number']}: balance {row['balance']}, journal {row['journal_balance']} "
+                  f"(drift {row['drift']:+})")
+        return 0 if clean else 1
+
+    if args.command == "archive":
+        db = DatabaseManager(args.db, durability=args.durability)
+        try:
+            report = Archiver(db, batch_size=args.batch_size).run(args.older_than_days, vacuum=not args.no_vacuum)
+        finally:
+            db.close()
+        print(f"Archived {report['archived']:,} transactions to {db.archive_path} in {report['seconds']}s; "
+              f"vacuum: {report['vacuum']}.")
+        return 0
+
+    if args.command == "run-schedules":
+        db = DatabaseManager(args.db, durability=args.durability)
+        try:
+            scheduler = TransferScheduler(db, args.batch_size, args.max_attempts, args.retry_minutes * 60,
+                                          clock=(lambda: args.now) if args.now else None)
+            summary = scheduler.run()
+        finally:
+            db.close()
+        print(f"Standing orders due by {summary['now']}: posted {summary['posted']:,}, retrying {summary['retry']:,}, "
+              f"failed {summary['failed']:,} in {summary['seconds']}s.")
+        return 0
+
+    if args.command == "snapshot-balances":
+        db = DatabaseManager(args.db, durability=args.durability)
+        try:
+            written = db.take_balance_snapshots()
+        finally:
+            db.close()
+        print(f"Recorded {written} balance snapshots.")
+        return 0
+
+    if args.command == "rebuild-aggregates":
+        db = DatabaseManager(args.db, durability=args.durability)
+        try:
+            db.rebuild_aggregates()
+        finally:
+            db.close()
+        print("Analytics totals rebuilt.")
+        return 0
+
+    # Only the GUI needs Tk; importing it here keeps headless commands light.
+    from .gui import run
+    run(args.db, durability=args.durability)
+    return 0
@@ -0,0 +1,388 @@
+import csv
+import functools
+import gzip
+import os
+import re
+import sqlite3
+from datetime import date
+
+from .accounts import AccountNumberAllocator, luhn_valid
+from .changes import ChangeWatcher
+from .database import DatabaseManager
+from .metrics import instrumented
+from .scheduler import FREQUENCIES, TIME_FORMAT, parse_time
+from .search import parse_query
+from .sessions import SessionManager
+
+INCOME_TYPES = ("DEPOSIT", "TRANSFER_IN")
+EXPENSE_TYPES = ("WITHDRAW", "TRANSFER_OUT")
+MISTYPED_ACCOUNT = "Account not found. The check digit does not match - please re-check the number."
+
+
+def extract_account_number(text):
+    if not text:
+        return None
+    matches = re.findall(r"\b\d{10}\b", text)
+    if not matches: return None
+    # Prefer a number whose check digit is right over a stray 10 digit run.
+    return next((m for m in matches if luhn_valid(m)), matches[0])
+
+
+def valid_pin(pin):
+    return len(pin) == 4 and pin.isdigit()
+
+
+# Whole rupees as an int or a digit string (GUI entries); JSON floats, bools
+# and nulls raise ValueError rather than being truncated to an amount.
+def parse_amount(value):
+    if isinstance(value, bool) or not isinstance(value, (int, str)): raise ValueError(value)
+    return int(value)
+
+
+# Controller reads that issue more than one query (a count and then the rows,
+# a balance and then the history behind it) run inside one read snapshot, so
+# a posting that commits halfway through cannot make the parts disagree.
+def snapshot_read(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.db.read_snapshot():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class BankController:
+    # Every customer operation takes an optional session token. Without one
+    # it acts on current_user, the session of the interactive (GUI) login,
+    # which never expires while the window is open.
+    def __init__(self, db_name="bank.db", session_timeout=900, **db_options):
+        self.db = DatabaseManager(db_name, **db_options)
+        self.accounts = AccountNumberAllocator(self.db)
+        self.sessions = SessionManager(session_timeout)
+        self.changes = ChangeWatcher(self.db.pool)
+        self._insights = None
+        self.current_user = None
+
+    def _session(self, token):
+        return self.current_user if token is None else self.sessions.get(token)
+
+    # Allocated numbers never repeat, but accounts created before the
+    # allocator have random numbers that may coincide; those are skipped.
+    def allocate_account_numbers(self, count):
+        numbers = []
+        while len(numbers) < count:
+            batch = self.accounts.allocate(count - len(numbers))
+            taken = self.db.existing_account_numbers(batch)
+            numbers.extend(n for n in batch if n not in taken)
+        return numbers
+
+    @instrumented
+    def sign_up(self, name, pin):
+        if not name or not valid_pin(pin): return "Invalid Input. Pin must be 4 digits."
+        for _ in range(3):
+            account_number = self.allocate_account_numbers(1)[0]
+            if self.db.create_user(name, pin, account_number):
+                return f"Account Created Successfully!\n\nYour Account Number is:\n{account_number}\n\nPLEASE SAVE THIS NUMBER NOW."
+        return "Error creating account. Try again."
+
+    # Bulk onboarding: records are (name, pin, opening_balance). Valid rows
+    # are created together in one transaction; returns one
+    # (name, account_number, error) result per record, in order.
+    @instrumented
+    def onboard_accounts(self, records):
+        results, rows = [], []
+        for name, pin, balance in records:
+            name, pin = (name or "").strip(), str(pin or "").strip()
+            try:
+                balance = int(balance or 0)
+            except (TypeError, ValueError):
+                balance = None
+            if not name: error = "Name is required"
+            elif not valid_pin(pin): error = "Pin must be 4 digits"
+            elif balance is None or balance < 0: error = "Invalid opening balance"
+            else: error = None
+            results.append([name, None, error])
+            if not error: rows.append((len(results) - 1, name, pin, balance))
+        numbers = self.allocate_account_numbers(len(rows))
+        self.db.create_users([(name, pin, number, balance) for (_, name, pin, balance), number in zip(rows, numbers)])
+        for (index, *_), number in zip(rows, numbers):
+            results[index][1] = number
+        return [tuple(r) for r in results]
+
+    def recover_account(self, name, pin):
+        acc_num = self.db.get_user_by_name_and_pin(name, pin)
+        if acc_num:
+            return True, f"Identity Verified!\n\nYour Account Number is:\n{acc_num}"
+        return False, "Verification Failed.\nName or PIN is incorrect."
+
+    # Returns (session, message); session is None when the login failed.
+    # session.token identifies the customer in later calls.
+    @instrumented
+    def open_session(self, account_number, pin):
+        user = self.db.get_user_by_account(account_number)
+        if user:
+            if user[2] == pin: return self.sessions.create(user), f"Welcome {user[1]}"
+            else: return None, "Incorrect PIN"
+        if not luhn_valid(account_number): return None, MISTYPED_ACCOUNT
+        return None, "Account not found"
+
+    def sign_in(self, account_number, pin):
+        session, message = self.open_session(account_number, pin)
+        if session is None: return False, message
+        if self.current_user is not None: self.sessions.end(self.current_user.token)
+        self.current_user = session
+        return True, message
+
+    @instrumented
+    def deposit(self, amount, token=None):
+        session = self._session(token)
+        if not session: return False, "Not logged in"
+        try:
+            amount = parse_amount(amount)
+            if amount <= 0: return False, "Amount must be positive"
+            new_balance = self.db.deposit(session.id, amount)
+            if new_balance is None: return False, "Account not found"
+            session.balance = new_balance
+            return True, f"Deposited ₹{amount}. New Balance: ₹{new_balance}"
+        except ValueError: return False, "Invalid amount"
+        except sqlite3.Error as e: return False, str(e)
+
+    @instrumented
+    def withdraw(self, amount, token=None):
+        session = self._session(token)
+        if not session: return False, "Not logged in"
+        try:
+            amount = parse_amount(amount)
+            if amount <= 0: return False, "Amount must be positive"
+            new_balance = self.db.withdraw(session.id, amount)
+            if new_balance is None: return False, "Insufficient Balance"
+            session.balance = new_balance
+            return True, f"Withdrew ₹{amount}. New Balance: ₹{new_balance}"
+        except ValueError: return False, "Invalid amount"
+        except sqlite3.Error as e: return False, str(e)
+
+    @instrumented
+    def transfer(self, recipient_account, amount, token=None):
+        session = self._session(token)
+        if not session: return False, "Not logged in"
+        try:
+            amount = parse_amount(amount)
+            if amount <= 0: return False, "Amount must be positive"
+            if recipient_account == session.account_number: return False, "Cannot transfer to self"
+            success, message = self.db.transfer_money(session.account_number, recipient_account, amount)
+            if message == "Account not found" and not luhn_valid(recipient_account): message = MISTYPED_ACCOUNT
+            if success:
+                user = self.db.get_user_by_account(session.account_number)
+                session.balance = user[4]
+            return success, message
+        except ValueError: return False, "Invalid amount"
+
+    # Standing orders for the session's account; first_run_at is a datetime
+    # or "YYYY-MM-DD[ HH:MM[:SS]]" in UTC, frequency one of FREQUENCIES (or
+    # None for a one-off) and count the number of payments (None: until
+    # cancelled). TransferScheduler.run() executes them.
+    @instrumented
+    def schedule_transfer(self, recipient_account, amount, first_run_at, frequency=None, count=None,
+                          description=None, token=None):
+        session = self._session(token)
+        if not session: return False, "Not logged in"
+        try:
+            amount = parse_amount(amount)
+        except ValueError: return False, "Invalid amount"
+        try:
+            count = None if count is None else parse_amount(count)
+        except ValueError: return False, "Invalid count"
+        if amount <= 0: return False, "Amount must be positive"
+        if count is not None and count <= 0: return False, "Count must be positive"
+        try:
+            first_run_at = parse_time(first_run_at).strftime(TIME_FORMAT)
+        except ValueError as e: return False, str(e)
+        if frequency is not None and not isinstance(frequency, str): return False, "Unknown frequency"
+        frequency = frequency.strip().upper() or None if frequency else None
+        if frequency is not None and frequency not in FREQUENCIES: return False, "Unknown frequency"
+        if description is not None and not isinstance(description, str): return False, "Invalid description"
+        if recipient_account == session.account_number: return False, "Cannot transfer to self"
+        if self.db.get_user_by_account(recipient_account) is None:
+            return False, "Account not found" if luhn_valid(recipient_account) else MISTYPED_ACCOUNT
+        schedule_id = self.db.create_scheduled_transfer(session.id, recipient_account, amount, first_run_at, frequency,
+                                                        count, description or None)
+        return True, f"Standing order #{schedule_id} scheduled from {first_run_at}"
+
+    def get_scheduled_transfers(self, token=None):
+        session = self._session(token)
+        if not session: return []
+        return self.db.get_scheduled_transfers(session.id)
+
+    def get_schedule_runs(self, schedule_id, limit=20, token=None):
+        session = self._session(token)
+        if not session: return []
+        return self.db.get_schedule_runs(session.id, schedule_id, limit)
+
+    def cancel_scheduled_transfer(self, schedule_id, token=None):
+        session = self._session(token)
+        if not session: return False, "Not logged in"
+        if not self.db.cancel_scheduled_transfer(session.id, schedule_id): return False, "No active standing order with that id"
+        return True, "Standing order cancelled"
+
+    @instrumented
+    @snapshot_read
+    def get_transaction_history(self, limit=100, token=None):
+        session = self._session(token)
+        if not session: return []
+        return self.db.get_transaction_history(session.id, limit)
+
+    @instrumented
+    @snapshot_read
+    def get_transaction_page(self, before_id=None, page_size=50, token=None):
+        session = self._session(token)
+        if not session: return []
+        return self.db.get_transaction_page(session.id, before_id, page_size)
+        
+    # Free-text search with the filters parse_query() understands in the
+    # query ("ravi >500 last march"); explicit arguments take precedence.
+    # Page with before_id like get_transaction_page().
+    @instrumented
+    @snapshot_read
+    def search_transactions(self, query="", types=None, before_id=None, page_size=50, partial=False, token=None,
+                            **filters):
+        session = self._session(token)
+        if not session: return []
+        parsed = parse_query(query)
+        parsed.update((k, v) for k, v in filters.items() if v is not None)
+        return self.db.search_transactions(session.id, types=types, before_id=before_id, page_size=page_size,
+                                           partial=partial, **parsed)
+
+    @instrumented
+    @snapshot_read
+    def get_recent_recipients(self, token=None):
+        session = self._session(token)
+        if not session: return []
+        return self.db.get_recent_recipients(session.id)
+
+    @instrumented
+    @snapshot_read
+    def get_analytics(self, token=None):
+        session = self._session(token)
+        if not session: return {"income": 0, "expense": 0}
+        data = self.db.get_analytics_data(session.id)
+        income = sum(amt for type_, amt in data if type_ in INCOME_TYPES)
+        expense = sum(amt for type_, amt in data if type_ in EXPENSE_TYPES)
+        return {"income": income, "expense": expense}
+
+    @instrumented
+    @snapshot_read
+    def get_monthly_trends(self, months=6, token=None):
+        session = self._session(token)
+        if not session: return []
+        today = date.today()
+        index = today.year * 12 + today.month - 1 - (months - 1)
+        keys = [f"{(index + i) // 12:04d}-{(index + i) % 12 + 1:02d}" for i in range(months)]
+        trends = {key: {"month": key, "income": 0, "expense": 0} for key in keys}
+        for month, type_, total in self.db.get_monthly_totals(session.id, keys[0]):
+            if month in trends:
+                trends[month]["income" if type_ in INCOME_TYPES else "expense"] += total
+        return list(trends.values())
+    
+    # Totals and monthly trends read from the same snapshot, for statements.
+    @instrumented
+    @snapshot_read
+    def get_analytics_report(self, months=6, token=None):
+        report = self.get_analytics(token)
+        report["months"] = self.get_monthly_trends(months, token)
+        return report
+
+    @property
+    def insights(self):
+        if self._insights is None:
+            # Imported on first use so numpy stays out of a plain import.
+            from .analytics import AnalyticsEngine
+            self._insights = AnalyticsEngine(self.db)
+        return self._insights
+
+    # Monthly/weekly series with rolling averages, a running balance curve,
+    # top counterparties and largest movements; None without numpy.
+    @instrumented
+    @snapshot_read
+    def get_insights(self, months=12, weeks=12, token=None):
+        session = self._session(token)
+        if not session or not self.insights.available: return None
+        user = self.db.get_user_by_id(session.id)
+        session.balance = user[4]
+        return self.insights.insights(session.id, user[4], months, weeks)
+
+    @instrumented
+    def change_pin(self, old_pin, new_pin, token=None):
+        session = self._session(token)
+        if not session: return False, "Not logged in"
+        user = self.db.get_user_by_id(session.id)
+        if user[2] != old_pin: return False, "Incorrect old PIN"
+        if len(new_pin) != 4 or not new_pin.isdigit(): return False, "New PIN must be 4 digits"
+        self.db.update_pin(session.id, new_pin)
+        return True, "PIN updated successfully"
+
+    # Runs happily on a worker thread: rows are streamed from the database,
+    # progress(done, total) is called after every batch and setting `cancel`
+    # (a threading.Event) stops the export and removes the partial file.
+    @instrumented
+    @snapshot_read
+    def export_history_csv(self, file_path, start_date=None, end_date=None, types=None, compress=None,
+                           progress=None, cancel=None, token=None):
+        session = self._session(token)
+        if not session: return False, "Not logged in"
+        user_id = session.id
+        if compress is None: compress = file_path.lower().endswith(".gz")
+        try:
+            total = self.db.count_transactions(user_id, start_date, end_date, types)
+            done = 0
+            with (gzip.open(file_path, "wt", newline="") if compress else open(file_path, "w", newline="")) as f:
+                writer = csv.writer(f)
+                writer.writerow(["Type", "Amount", "Recipient/Sender", "Date", "Description"])
+                for rows in self.db.iter_transaction_batches(user_id, start_date, end_date, types):
+                    if cancel is not None and cancel.is_set(): break
+                    writer.writerows(rows)
+                    done += len(rows)
+                    if progress: progress(done, total)
+            if cancel is not None and cancel.is_set():
+                os.remove(file_path)
+                return False, "Export cancelled"
+            return True, f"Exported {done:,} transactions"
+        except Exception as e: return False, str(e)
+
+    def get_account_info(self, token=None):
+        session = self._session(token)
+        if not session: return None
+        return {
+            "name": session.name, "account_number": session.account_number,
+            "balance": session.balance, "created_at": session.created_at or "N/A"
+        }
+
+    @instrumented
+    @snapshot_read
+    def get_balance_as_of(self, when, token=None):
+        session = self._session(token)
+        if not session: return None
+        return self.db.balance_as_of(session.id, when)
+
+    # Subscribes callback(change) to the session's account; the session's
+    # cached balance is updated before the callback runs. Changes are only
+    # delivered by ChangeWatcher.dispatch(self.changes.poll()).
+    def watch_account(self, callback, token=None):
+        session = self._session(token)
+        if not session: return None
+
+        def deliver(change):
+            session.balance = change["balance"]
+            callback(change)
+        return self.changes.subscribe(session.id, deliver)
+
+    def unwatch_account(self, handle):
+        if handle is not None: self.changes.unsubscribe(handle)
+
+    def get_balance(self, token=None):
+        session = self._session(token)
+        return session.balance if session else 0
+
+    def logout(self, token=None):
+        if token is not None: return self.sessions.end(token)
+        if self.current_user is not None: self.sessions.end(self.current_user.token)
+        self.current_user = None
+        return True
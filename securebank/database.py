@@ -0,0 +1,984 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+
+from .metrics import METRICS, instrumented
+from .search import WORD, has_word
+
+# Recomputes the aggregate tables from {source}: the transactions table in the
+# migration that introduces them, and in DatabaseManager.rebuild_aggregates()
+# that table together with the archived rows once an archive is attached.
+AGGREGATE_REBUILD = [
+    "DELETE FROM user_totals",
+    "DELETE FROM user_daily_totals",
+    "DELETE FROM user_monthly_totals",
+    """INSERT INTO user_totals (user_id, type, total, count)
+       SELECT user_id, type, SUM(amount), COUNT(*) FROM {source} GROUP BY user_id, type""",
+    """INSERT INTO user_daily_totals (user_id, day, type, total, count)
+       SELECT user_id, date(timestamp), type, SUM(amount), COUNT(*) FROM {source}
+       GROUP BY user_id, date(timestamp), type""",
+    """INSERT INTO user_monthly_totals (user_id, month, type, total, count)
+       SELECT user_id, strftime('%Y-%m', timestamp), type, SUM(amount), COUNT(*) FROM {source}
+       GROUP BY user_id, strftime('%Y-%m', timestamp), type""",
+]
+# A row copied by an interrupted archival run is in both tables until the
+# rerun evicts it, and is counted once.
+ARCHIVED_SOURCE = """(SELECT user_id, type, amount, timestamp FROM main.transactions
+    UNION ALL SELECT user_id, type, amount, timestamp FROM archive.transactions
+    WHERE id NOT IN (SELECT id FROM main.transactions))"""
+
+# Double-entry journal accounts. Customer accounts use users.id; the bank's
+# own side of each movement is booked to one of these system accounts.
+CASH_ACCOUNT, CLEARING_ACCOUNT, EQUITY_ACCOUNT = -1, -2, -3
+# Signed amount booked to the customer, and the contra account, for a
+# transactions row; {row} is "" in a SELECT and "NEW." inside a trigger.
+JOURNAL_USER_AMOUNT = "CASE WHEN {row}type IN ('DEPOSIT', 'TRANSFER_IN') THEN {row}amount ELSE -{row}amount END"
+JOURNAL_CONTRA_ACCOUNT = (f"CASE WHEN {{row}}type IN ('DEPOSIT', 'WITHDRAW') THEN {CASH_ACCOUNT} "
+                          f"ELSE {CLEARING_ACCOUNT} END")
+
+# Full-text index over transaction descriptions and counterparties, kept in
+# step with transactions by triggers. Each row also carries an owner token
+# ("u<user_id>"), so a search intersects the words with that one customer's
+# postings inside the index instead of filtering every customer's matches.
+# Contentless (the text is read back from transactions) and detail=column
+# (no phrase positions) to keep the index and each posting's write small.
+SEARCH_OWNER = "'u' || {row}user_id"
+SEARCH_INDEX = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_insert AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts (rowid, owner, description, recipient_account)
+        VALUES (NEW.id, {SEARCH_OWNER.format(row="NEW.")}, NEW.description, NEW.recipient_account);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_delete AFTER DELETE ON transactions BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, owner, description, recipient_account)
+        VALUES ('delete', OLD.id, {SEARCH_OWNER.format(row="OLD.")}, OLD.description, OLD.recipient_account);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_update
+        AFTER UPDATE OF user_id, description, recipient_account ON transactions BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, owner, description, recipient_account)
+        VALUES ('delete', OLD.id, {SEARCH_OWNER.format(row="OLD.")}, OLD.description, OLD.recipient_account);
+        INSERT INTO transactions_fts (rowid, owner, description, recipient_account)
+        VALUES (NEW.id, {SEARCH_OWNER.format(row="NEW.")}, NEW.description, NEW.recipient_account);
+    END""",
+    f"""INSERT INTO transactions_fts (rowid, owner, description, recipient_account)
+       SELECT id, {SEARCH_OWNER.format(row="")}, description, recipient_account FROM transactions""",
+]
+
+
+# FTS5 is an optional sqlite module; without it the index is left out and
+# search_transactions() falls back to LIKE.
+def create_search_index(cur):
+    try:
+        cur.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+            owner, description, recipient_account, content='', detail=column)""")
+    except sqlite3.OperationalError:
+        return
+    for statement in SEARCH_INDEX:
+        cur.execute(statement)
+
+
+# "Recent People" ranking: transfers per contact, discounted by days since
+# the last one, so a contact paid often last month can outrank one paid once
+# today but not one paid often years ago. Computed at read time over the
+# user's contacts, which is one short primary-key range.
+CONTACT_RANK_DAYS = 30
+CONTACT_RANK = f"frequency / (1.0 + (julianday('now') - julianday(last_used)) / {CONTACT_RANK_DAYS})"
+
+
+# Each entry upgrades the schema by one version; PRAGMA user_version records
+# how many have been applied so existing bank.db files are upgraded in place.
+# Entries are SQL statements or callables that take the cursor.
+SCHEMA_MIGRATIONS = [
+    # 1: indexes for login/recovery, history paging, recipients and analytics
+    [
+        "CREATE INDEX IF NOT EXISTS idx_users_name_pin ON users(name, pin)",
+        "CREATE INDEX IF NOT EXISTS idx_transactions_user_id ON transactions(user_id, id)",
+        "CREATE INDEX IF NOT EXISTS idx_transactions_user_type_ts ON transactions(user_id, type, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_transactions_user_type_amount ON transactions(user_id, type, amount)",
+    ],
+    # 2: per-user lifetime/daily/monthly totals kept current by a trigger
+    [
+        """CREATE TABLE IF NOT EXISTS user_totals (
+            user_id INTEGER NOT NULL, type TEXT NOT NULL,
+            total INTEGER NOT NULL, count INTEGER NOT NULL,
+            PRIMARY KEY (user_id, type)
+        ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS user_daily_totals (
+            user_id INTEGER NOT NULL, day TEXT NOT NULL, type TEXT NOT NULL,
+            total INTEGER NOT NULL, count INTEGER NOT NULL,
+            PRIMARY KEY (user_id, day, type)
+        ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS user_monthly_totals (
+            user_id INTEGER NOT NULL, month TEXT NOT NULL, type TEXT NOT NULL,
+            total INTEGER NOT NULL, count INTEGER NOT NULL,
+            PRIMARY KEY (user_id, month, type)
+        ) WITHOUT ROWID""",
+        """CREATE TRIGGER IF NOT EXISTS trg_transactions_totals AFTER INSERT ON transactions BEGIN
+            INSERT INTO user_totals VALUES (NEW.user_id, NEW.type, NEW.amount, 1)
+                ON CONFLICT (user_id, type) DO UPDATE SET total = total + excluded.total, count = count + 1;
+            INSERT INTO user_daily_totals VALUES (NEW.user_id, date(NEW.timestamp), NEW.type, NEW.amount, 1)
+                ON CONFLICT (user_id, day, type) DO UPDATE SET total = total + excluded.total, count = count + 1;
+            INSERT INTO user_monthly_totals VALUES (NEW.user_id, strftime('%Y-%m', NEW.timestamp), NEW.type, NEW.amount, 1)
+                ON CONFLICT (user_id, month, type) DO UPDATE SET total = total + excluded.total, count = count + 1;
+        END""",
+        *[statement.format(source="transactions") for statement in AGGREGATE_REBUILD],
+    ],
+    # 3: counter behind the checksummed account number allocator
+    [
+        """CREATE TABLE IF NOT EXISTS account_sequence (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            next_value INTEGER NOT NULL
+        )""",
+        "INSERT OR IGNORE INTO account_sequence (id, next_value) VALUES (1, 0)",
+    ],
+    # 4: append-only double-entry journal, backfilled from transactions plus
+    # one opening entry per account for whatever the log does not explain
+    # (dated at the epoch: older files have no users.created_at to go by)
+    [
+        """CREATE TABLE IF NOT EXISTS journal (
+            id INTEGER PRIMARY KEY,
+            txn_id INTEGER,
+            account_id INTEGER NOT NULL,
+            amount INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )""",
+        """CREATE TABLE IF NOT EXISTS balance_snapshots (
+            account_id INTEGER NOT NULL, journal_id INTEGER NOT NULL,
+            taken_at TIMESTAMP NOT NULL, balance INTEGER NOT NULL,
+            PRIMARY KEY (account_id, journal_id)
+        ) WITHOUT ROWID""",
+        f"""INSERT INTO journal (txn_id, account_id, amount, kind, created_at)
+           SELECT id, account_id, amount, type, timestamp FROM (
+               SELECT id, 0 AS leg, user_id AS account_id, {JOURNAL_USER_AMOUNT.format(row="")} AS amount, type, timestamp
+               FROM transactions
+               UNION ALL
+               SELECT id, 1, {JOURNAL_CONTRA_ACCOUNT.format(row="")}, -({JOURNAL_USER_AMOUNT.format(row="")}), type, timestamp
+               FROM transactions
+           ) ORDER BY id, leg""",
+        """INSERT INTO journal (txn_id, account_id, amount, kind, created_at)
+           SELECT NULL, u.id, u.balance - COALESCE(j.total, 0), 'OPENING', '1970-01-01 00:00:00'
+           FROM users u LEFT JOIN (SELECT account_id, SUM(amount) AS total FROM journal GROUP BY account_id) j
+                ON j.account_id = u.id
+           WHERE u.balance <> COALESCE(j.total, 0)""",
+        f"""INSERT INTO journal (txn_id, account_id, amount, kind, created_at)
+           SELECT NULL, {EQUITY_ACCOUNT}, -amount, kind, created_at FROM journal WHERE kind = 'OPENING' ORDER BY id""",
+        "CREATE INDEX IF NOT EXISTS idx_journal_account ON journal(account_id, id, created_at, amount)",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_transactions_journal AFTER INSERT ON transactions BEGIN
+            INSERT INTO journal (txn_id, account_id, amount, kind, created_at) VALUES
+                (NEW.id, NEW.user_id, {JOURNAL_USER_AMOUNT.format(row="NEW.")},
+                 NEW.type, COALESCE(NEW.timestamp, CURRENT_TIMESTAMP)),
+                (NEW.id, {JOURNAL_CONTRA_ACCOUNT.format(row="NEW.")}, -({JOURNAL_USER_AMOUNT.format(row="NEW.")}),
+                 NEW.type, COALESCE(NEW.timestamp, CURRENT_TIMESTAMP));
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_users_opening AFTER INSERT ON users WHEN NEW.balance <> 0 BEGIN
+            INSERT INTO journal (txn_id, account_id, amount, kind) VALUES
+                (NULL, NEW.id, NEW.balance, 'OPENING'), (NULL, {EQUITY_ACCOUNT}, -NEW.balance, 'OPENING');
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_journal_no_update BEFORE UPDATE ON journal BEGIN
+            SELECT RAISE(ABORT, 'journal is append-only');
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_journal_no_delete BEFORE DELETE ON journal BEGIN
+            SELECT RAISE(ABORT, 'journal is append-only');
+        END""",
+    ],
+    # 5: what the archival job moved out of transactions, per user, month and
+    # type (the analytics totals and the journal are left untouched)
+    [
+        """CREATE TABLE IF NOT EXISTS archived_totals (
+            user_id INTEGER NOT NULL, month TEXT NOT NULL, type TEXT NOT NULL,
+            total INTEGER NOT NULL, count INTEGER NOT NULL,
+            first_id INTEGER NOT NULL, last_id INTEGER NOT NULL,
+            PRIMARY KEY (user_id, month, type)
+        ) WITHOUT ROWID""",
+    ],
+    # 6: full-text search over description and recipient_account
+    [create_search_index],
+    # 7: one row per (user, recipient) kept current by a trigger on outgoing
+    # transfers; the archival job leaves it alone, so counts include
+    # archived transfers made after this migration
+    [
+        """CREATE TABLE IF NOT EXISTS contacts (
+            user_id INTEGER NOT NULL, account_number TEXT NOT NULL, name TEXT NOT NULL,
+            frequency INTEGER NOT NULL, last_used TIMESTAMP NOT NULL, last_id INTEGER NOT NULL,
+            PRIMARY KEY (user_id, account_number)
+        ) WITHOUT ROWID""",
+        """CREATE TRIGGER IF NOT EXISTS trg_transactions_contacts AFTER INSERT ON transactions
+            WHEN NEW.type = 'TRANSFER_OUT' AND NEW.recipient_account IS NOT NULL BEGIN
+            INSERT INTO contacts (user_id, account_number, name, frequency, last_used, last_id)
+            VALUES (NEW.user_id, NEW.recipient_account,
+                    COALESCE((SELECT name FROM users WHERE account_number = NEW.recipient_account), 'Unknown'),
+                    1, COALESCE(NEW.timestamp, CURRENT_TIMESTAMP), NEW.id)
+            ON CONFLICT (user_id, account_number) DO UPDATE SET
+                name = excluded.name, frequency = frequency + 1,
+                last_used = excluded.last_used, last_id = excluded.last_id;
+        END""",
+        """INSERT INTO contacts (user_id, account_number, name, frequency, last_used, last_id)
+           SELECT t.user_id, t.recipient_account, COALESCE(u.name, 'Unknown'), COUNT(*), MAX(t.timestamp), MAX(t.id)
+           FROM transactions t LEFT JOIN users u ON u.account_number = t.recipient_account
+           WHERE t.type = 'TRANSFER_OUT' AND t.recipient_account IS NOT NULL
+           GROUP BY t.user_id, t.recipient_account""",
+    ],
+    # 8: standing orders (frequency NULL for a one-off) and one row per
+    # execution attempt; the scheduler scans (status, next_run_at)
+    [
+        """CREATE TABLE IF NOT EXISTS scheduled_transfers (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            recipient_account TEXT NOT NULL,
+            amount INTEGER NOT NULL,
+            description TEXT,
+            frequency TEXT,
+            start_at TIMESTAMP NOT NULL,
+            occurrence INTEGER NOT NULL DEFAULT 0,
+            remaining INTEGER,
+            next_run_at TIMESTAMP NOT NULL,
+            status TEXT NOT NULL DEFAULT 'ACTIVE',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_scheduled_due ON scheduled_transfers(status, next_run_at)",
+        "CREATE INDEX IF NOT EXISTS idx_scheduled_user ON scheduled_transfers(user_id, id)",
+        """CREATE TABLE IF NOT EXISTS scheduled_runs (
+            id INTEGER PRIMARY KEY,
+            schedule_id INTEGER NOT NULL,
+            due_at TIMESTAMP NOT NULL,
+            run_at TIMESTAMP NOT NULL,
+            status TEXT NOT NULL,
+            message TEXT
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_scheduled_runs_schedule ON scheduled_runs(schedule_id, id)",
+    ],
+    # 9: (user_id, type, amount) has been unused since the totals tables and
+    # search took over; every posting was still paying to maintain it.
+    # (user_id, type, timestamp) stays: count_transactions() and
+    # iter_transaction_batches() (export) seek it for type and date filters.
+    [
+        "DROP INDEX IF EXISTS idx_transactions_user_type_amount",
+    ],
+]
+
+# Schema of the archive database the archival job moves old transactions to.
+ARCHIVE_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS transactions (
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        amount INTEGER NOT NULL,
+        recipient_account TEXT,
+        timestamp TIMESTAMP,
+        description TEXT,
+        archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_archive_user_id ON transactions(user_id, id)",
+]
+
+# Hands every thread its own writer connection and its own read-only
+# connection. WAL lets the readers run alongside a writer; busy_timeout makes
+# competing writers wait instead of failing with "database is locked".
+# Databases registered with attach() are ATTACHed to every connection (to a
+# thread's existing ones the next time it asks for them outside a transaction).
+class ConnectionPool:
+    def __init__(self, db_name, busy_timeout=5000, synchronous="FULL", cache_size=-16000, journal_mode="WAL"):
+        self.db_name = db_name
+        self.busy_timeout = int(busy_timeout)
+        self.synchronous = synchronous
+        self.cache_size = int(cache_size)
+        self.in_memory = db_name == ":memory:" or db_name.startswith("file::memory:")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._trace = None
+        self._attached = {}  # alias -> path
+        if self.in_memory:
+            # Every new connection to :memory: would be a separate database.
+            self._shared = self._connect()
+        else:
+            # Only takes effect on a new file; lets the archival job hand
+            # freed pages back with PRAGMA incremental_vacuum.
+            self.connection().execute("PRAGMA auto_vacuum = INCREMENTAL")
+            if journal_mode: self.connection().execute(f"PRAGMA journal_mode = {journal_mode}")
+
+    def _connect(self, readonly=False, owner=None):
+        if readonly:
+            uri = Path(os.path.abspath(self.db_name)).as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=self.busy_timeout / 1000, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_name, timeout=self.busy_timeout / 1000, check_same_thread=False)
+        conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout}")
+        conn.execute(f"PRAGMA cache_size = {self.cache_size}")
+        conn.create_function("search_word", 3, has_word, deterministic=True)
+        if not readonly:
+            conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        if self._trace is not None: conn.set_trace_callback(self._trace)
+        with self._lock:
+            # Drop connections left behind by threads that have exited.
+            alive = []
+            for thread, other in self._connections:
+                if thread is None or thread.is_alive(): alive.append((thread, other))
+                else: other.close()
+            alive.append((owner, conn))
+            self._connections = alive
+        return conn
+
+    def _attach(self, conn, readonly, done):
+        for alias, path in list(self._attached.items())[done:]:
+            if readonly and not self.in_memory: path = Path(os.path.abspath(path)).as_uri() + "?mode=ro"
+            conn.execute(f"ATTACH DATABASE ? AS {alias}", (path,))
+        return len(self._attached)
+
+    def attach(self, alias, path):
+        with self._lock:
+            if alias in self._attached: return
+            self._attached[alias] = path
+            if self.in_memory: self._attach(self._shared, False, len(self._attached) - 1)
+
+    def attached(self, alias):
+        return alias in self._attached
+
+    def connection(self, readonly=False):
+        if self.in_memory: return self._shared
+        key = "reader" if readonly else "writer"
+        conn = getattr(self._local, key, None)
+        if conn is None:
+            conn = self._connect(readonly, threading.current_thread())
+            setattr(self._local, key, conn)
+            setattr(self._local, key + "_cursor", conn.cursor())
+            setattr(self._local, key + "_attached", 0)
+        done = getattr(self._local, key + "_attached")
+        if done != len(self._attached) and not conn.in_transaction:
+            setattr(self._local, key + "_attached", self._attach(conn, readonly, done))
+        return conn
+
+    def set_trace(self, callback):
+        with self._lock:
+            self._trace = callback
+            for _, conn in self._connections:
+                conn.set_trace_callback(callback)
+
+    # A connection that is not tied to the calling thread, for long-lived
+    # helpers that are used from several threads under their own lock.
+    def dedicated(self, readonly=True):
+        if self.in_memory: return self._shared
+        conn = self._connect(readonly)
+        self._attach(conn, readonly, 0)
+        return conn
+
+    def cursor(self, readonly=False):
+        if self.in_memory:
+            if not hasattr(self, "_shared_cursor"): self._shared_cursor = self._shared.cursor()
+            return self._shared_cursor
+        self.connection(readonly)
+        return getattr(self._local, ("reader" if readonly else "writer") + "_cursor")
+
+    def close(self):
+        with self._lock:
+            for _, conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+# Durability profiles map onto PRAGMA synchronous. "batched" additionally
+# routes writes through a GroupCommitter so many postings share one fsync.
+DURABILITY_PROFILES = {
+    "strict": {"synchronous": "FULL", "group_commit": False},
+    "normal": {"synchronous": "NORMAL", "group_commit": False},
+    "batched": {"synchronous": "NORMAL", "group_commit": True},
+}
+
+
+class CommitMetrics:
+    def __init__(self, window=2048):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.commits = 0
+        self.operations = 0
+
+    def record(self, operations, seconds):
+        with self._lock:
+            self.commits += 1
+            self.operations += operations
+            self._latencies.append(seconds * 1000)
+
+    def snapshot(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            commits, operations = self.commits, self.operations
+        pick = lambda q: round(latencies[min(len(latencies) - 1, int(len(latencies) * q))], 3) if latencies else 0.0
+        return {
+            "commits": commits,
+            "operations": operations,
+            "ops_per_commit": round(operations / commits, 2) if commits else 0.0,
+            "latency_ms": {"p50": pick(0.5), "p99": pick(0.99), "max": latencies[-1] if latencies else 0.0},
+        }
+
+
+# One background thread owns a writer connection and applies queued write
+# operations in shared transactions: it waits up to flush_interval after the
+# first queued operation (or until batch_size are queued), runs each one in
+# its own SAVEPOINT so a failure only undoes that operation, then commits
+# once and wakes every caller.
+class GroupCommitter:
+    def __init__(self, pool, metrics, flush_interval=0.005, batch_size=64):
+        self.pool = pool
+        self.metrics = metrics
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="securebank-group-commit", daemon=True)
+        self._thread.start()
+
+    def submit(self, operation, *args):
+        future = Future()
+        self._queue.put((operation, args, future))
+        return future.result()
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None: return None
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0: break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # finish this batch, then stop
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        conn, cur = self.pool.connection(), self.pool.cursor()
+        while True:
+            batch = self._collect()
+            if batch is None: return
+            start = time.perf_counter()
+            outcomes = []
+            try:
+                cur.execute("BEGIN IMMEDIATE")
+                for operation, args, future in batch:
+                    cur.execute("SAVEPOINT grouped_op")
+                    try:
+                        outcomes.append((future, operation(cur, *args), None))
+                        cur.execute("RELEASE grouped_op")
+                    except Exception as e:
+                        cur.execute("ROLLBACK TO grouped_op")
+                        cur.execute("RELEASE grouped_op")
+                        outcomes.append((future, None, e))
+                conn.commit()
+            except Exception as e:
+                if conn.in_transaction: conn.rollback()
+                outcomes = [(future, None, e) for _, _, future in batch]
+            self.metrics.record(len(batch), time.perf_counter() - start)
+            for future, result, error in outcomes:
+                if error is None: future.set_result(result)
+                else: future.set_exception(error)
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join()
+
+
+class DatabaseManager:
+    def __init__(self, db_name="bank.db", busy_timeout=5000, synchronous=None, cache_size=-16000,
+                 durability="strict", flush_interval=0.005, group_size=64, archive_path=None):
+        if durability not in DURABILITY_PROFILES:
+            raise ValueError(f"Unknown durability profile '{durability}'")
+        profile = DURABILITY_PROFILES[durability]
+        self.durability = durability
+        self.pool = ConnectionPool(db_name, busy_timeout=busy_timeout, synchronous=synchronous or profile["synchronous"],
+                                   cache_size=cache_size)
+        METRICS.register_pool(self.pool)
+        self.commit_metrics = CommitMetrics()
+        METRICS.register_commits(db_name, self.commit_metrics)
+        self.create_tables()
+        if archive_path is None and not self.pool.in_memory:
+            root, ext = os.path.splitext(db_name)
+            archive_path = f"{root}.archive{ext or '.db'}"
+        self.archive_path = archive_path
+        if archive_path and (archive_path == ":memory:" or os.path.exists(archive_path)): self.open_archive()
+        self.committer = None
+        if profile["group_commit"] and not self.pool.in_memory:
+            self.committer = GroupCommitter(self.pool, self.commit_metrics, flush_interval, group_size)
+
+    # Writes go through the calling thread's writer connection; plain reads
+    # use its read-only connection so they never queue behind a writer.
+    @property
+    def conn(self): return self.pool.connection()
+
+    @property
+    def cursor(self): return self.pool.cursor()
+
+    @property
+    def read_cursor(self): return self.pool.cursor(readonly=True)
+
+    def create_tables(self):
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                pin TEXT NOT NULL,
+                account_number TEXT UNIQUE NOT NULL,
+                balance INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS transactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                type TEXT NOT NULL,
+                amount INTEGER NOT NULL,
+                recipient_account TEXT,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                description TEXT,
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            )
+        """)
+        self.conn.commit()
+        self.migrate()
+        self.full_text = self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transactions_fts'").fetchone() is not None
+
+    # Creates the archive database on first use and attaches it as "archive".
+    def open_archive(self):
+        if self.pool.attached("archive"): return
+        if not self.archive_path: raise ValueError("No archive path configured")
+        if self.pool.in_memory:
+            self.pool.attach("archive", self.archive_path)
+            for statement in ARCHIVE_SCHEMA:
+                self.cursor.execute(statement.replace("EXISTS ", "EXISTS archive.", 1))
+            return
+        conn = sqlite3.connect(self.archive_path)
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            for statement in ARCHIVE_SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+        finally:
+            conn.close()
+        self.pool.attach("archive", self.archive_path)
+
+    @property
+    def archived(self): return self.pool.attached("archive")
+
+    def schema_version(self):
+        self.cursor.execute("PRAGMA user_version")
+        return self.cursor.fetchone()[0]
+
+    @instrumented
+    def migrate(self):
+        version = self.schema_version()
+        for target in range(version + 1, len(SCHEMA_MIGRATIONS) + 1):
+            with self.write_transaction() as cur:
+                for statement in SCHEMA_MIGRATIONS[target - 1]:
+                    if callable(statement): statement(cur)
+                    else: cur.execute(statement)
+                cur.execute(f"PRAGMA user_version = {target}")
+        self.cursor.execute("PRAGMA optimize")
+
+    @instrumented
+    def create_user(self, name, pin, account_number, balance=0):
+        try:
+            return self._write(self._insert_user, name, pin, account_number, balance)
+        except sqlite3.IntegrityError:
+            return False
+
+    def _insert_user(self, cur, name, pin, account_number, balance):
+        cur.execute("INSERT INTO users (name, pin, account_number, balance) VALUES (?, ?, ?, ?)",
+                    (name, pin, account_number, balance))
+        return True
+
+    # Inserts many (name, pin, account_number, balance) rows in one
+    # transaction; a duplicate account number rolls the whole batch back.
+    @instrumented
+    def create_users(self, users):
+        with self.write_transaction() as cur:
+            cur.executemany("INSERT INTO users (name, pin, account_number, balance) VALUES (?, ?, ?, ?)", users)
+        return len(users)
+
+    @instrumented
+    def existing_account_numbers(self, numbers):
+        found = set()
+        numbers = list(numbers)
+        for i in range(0, len(numbers), 500):
+            batch = numbers[i:i + 500]
+            found.update(row[0] for row in self.read_cursor.execute(
+                f"SELECT account_number FROM users WHERE account_number IN ({','.join('?' * len(batch))})", batch))
+        return found
+
+    @instrumented
+    def get_user_by_account(self, account_number):
+        return self.read_cursor.execute("SELECT * FROM users WHERE account_number = ?", (account_number,)).fetchone()
+    
+    @instrumented
+    def get_user_by_id(self, user_id):
+        return self.read_cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
+        
+    @instrumented
+    def get_user_by_name_and_pin(self, name, pin):
+        result = self.read_cursor.execute("SELECT account_number FROM users WHERE name = ? AND pin = ?", (name, pin)).fetchone()
+        return result[0] if result else None
+
+    @instrumented
+    def update_pin(self, user_id, new_pin):
+        return self._write(self._set_pin, user_id, new_pin)
+
+    def _set_pin(self, cur, user_id, new_pin):
+        cur.execute("UPDATE users SET pin = ? WHERE id = ?", (new_pin, user_id))
+        return True
+
+    @instrumented
+    def get_transaction_history(self, user_id, limit=100):
+        return [row[1:] for row in self.get_transaction_page(user_id, None, limit)]
+
+    # Keyset pagination: pass the smallest id of the previous page as before_id
+    # to get the next (older) page. Each page is one index range scan, however
+    # deep into the history it is. The archive only ever holds a user's oldest
+    # rows, so it is read only once the hot table runs out.
+    @instrumented
+    def get_transaction_page(self, user_id, before_id=None, page_size=50):
+        before_id = before_id if before_id is not None else 2 ** 63 - 1
+        rows = []
+        for table in ("main.transactions", "archive.transactions") if self.archived else ("main.transactions",):
+            rows += self.read_cursor.execute(f"""
+                SELECT id, type, amount, recipient_account, timestamp, description
+                FROM {table}
+                WHERE user_id = ? AND id < ?
+                ORDER BY id DESC
+                LIMIT ?
+            """, (user_id, rows[-1][0] if rows else before_id, page_size - len(rows))).fetchall()
+            if len(rows) == page_size: break
+        return rows
+    
+    def _transaction_filter(self, user_id, start_date=None, end_date=None, types=None, min_amount=None,
+                            max_amount=None):
+        where, params = ["user_id = ?"], [user_id]
+        if min_amount is not None:
+            where.append("amount >= ?")
+            params.append(min_amount)
+        if max_amount is not None:
+            where.append("amount <= ?")
+            params.append(max_amount)
+        if start_date:
+            where.append("timestamp >= ?")
+            params.append(start_date)
+        if end_date:
+            where.append("timestamp < date(?, '+1 day')")
+            params.append(end_date)
+        if types:
+            where.append(f"type IN ({','.join('?' * len(types))})")
+            params.extend(types)
+        return " AND ".join(where), params
+
+    # (table, where, params) for each store holding the user's rows, newest
+    # first. Archived rows still in the hot table (a batch that was copied
+    # but not yet deleted) are skipped on the archive side.
+    def _history_sources(self, user_id, start_date=None, end_date=None, types=None):
+        where, params = self._transaction_filter(user_id, start_date, end_date, types)
+        sources = [("main.transactions", where, params)]
+        if self.archived:
+            sources.append(("archive.transactions",
+                            f"{where} AND id < (SELECT COALESCE(MIN(id), 9223372036854775807) "
+                            f"FROM main.transactions WHERE user_id = ?)", params + [user_id]))
+        return sources
+
+    # Keyset-paged search, newest first, in get_transaction_page()'s row
+    # shape. Every word of `text` must appear as a whole word in the
+    # description or the counterparty account; with partial=True (search as
+    # you type) the last word may be the start of one. Whole words are looked
+    # up in the FTS5 index; a partial word is checked with search_word() on
+    # the rows that leaves, which is much cheaper than expanding a short
+    # prefix in the index. Archived rows, and all rows if sqlite lacks FTS5,
+    # are checked with search_word() alone (archived ones once the hot
+    # matches run out), so a row matches the same words wherever it lives.
+    @instrumented
+    def search_transactions(self, user_id, text=None, types=None, min_amount=None, max_amount=None,
+                            start_date=None, end_date=None, before_id=None, page_size=50, partial=False):
+        words = WORD.findall(text or "")
+        where, params = self._transaction_filter(user_id, start_date, end_date, types, min_amount, max_amount)
+        like, like_params = [where], list(params)
+        for i, word in enumerate(words):
+            prefix = int(partial and i == len(words) - 1)
+            like.append("(search_word(t.description, ?, ?) OR search_word(t.recipient_account, ?, ?))")
+            like_params += [word, prefix, word, prefix]
+        whole = words[:-1] if partial else words
+        if whole and self.full_text:
+            match = (f'owner:"u{int(user_id)}" AND {{description recipient_account}}: ('
+                     + " ".join(f'"{word}"' for word in whole) + ")")
+            condition = " AND ".join([f"transactions_fts MATCH ? AND {where}"] + like[1 + len(whole):])
+            hot = ("transactions_fts JOIN main.transactions t ON t.id = transactions_fts.rowid",
+                   condition + " AND transactions_fts.rowid < ?",
+                   [match] + params + like_params[len(params) + 4 * len(whole):], "transactions_fts.rowid")
+        else:
+            hot = ("main.transactions t", " AND ".join(like) + " AND t.id < ?", like_params, "t.id")
+        sources = [hot]
+        if self.archived:
+            sources.append(("archive.transactions t", " AND ".join(like) + " AND t.id < (SELECT COALESCE(MIN(id), "
+                            "9223372036854775807) FROM main.transactions WHERE user_id = ?) AND t.id < ?",
+                            like_params + [user_id], "t.id"))
+        before_id = before_id if before_id is not None else 2 ** 63 - 1
+        rows = []
+        for table, condition, values, order in sources:
+            rows += self.read_cursor.execute(f"""
+                SELECT t.id, t.type, t.amount, t.recipient_account, t.timestamp, t.description
+                FROM {table}
+                WHERE {condition}
+                ORDER BY {order} DESC
+                LIMIT ?
+            """, values + [rows[-1][0] if rows else before_id, page_size - len(rows)]).fetchall()
+            if len(rows) == page_size: break
+        return rows
+
+    @instrumented
+    def count_transactions(self, user_id, start_date=None, end_date=None, types=None):
+        return sum(self.read_cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}", params).fetchone()[0]
+                   for table, where, params in self._history_sources(user_id, start_date, end_date, types))
+
+    # Streams matching rows in fetchmany batches on a cursor of its own, so a
+    # full-history export never holds more than batch_size rows in memory.
+    def iter_transaction_batches(self, user_id, start_date=None, end_date=None, types=None, batch_size=1000):
+        cursor = self.pool.connection(readonly=True).cursor()
+        try:
+            for table, where, params in self._history_sources(user_id, start_date, end_date, types):
+                cursor.execute(f"""
+                    SELECT type, amount, recipient_account, timestamp, description
+                    FROM {table}
+                    WHERE {where}
+                    ORDER BY id DESC
+                """, params)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows: break
+                    yield rows
+        finally:
+            cursor.close()
+
+    @instrumented
+    def get_recent_recipients(self, user_id, limit=5):
+        return self.read_cursor.execute(f"""
+            SELECT account_number, name
+            FROM contacts
+            WHERE user_id = ?
+            ORDER BY {CONTACT_RANK} DESC, last_id DESC
+            LIMIT ?
+        """, (user_id, limit)).fetchall()
+    
+    @instrumented
+    def create_scheduled_transfer(self, user_id, recipient_account, amount, first_run_at, frequency=None,
+                                  count=None, description=None):
+        return self._write(self._insert_schedule, user_id, recipient_account, amount, first_run_at, frequency,
+                           count, description)
+
+    def _insert_schedule(self, cur, user_id, recipient_account, amount, first_run_at, frequency, count, description):
+        cur.execute("""
+            INSERT INTO scheduled_transfers
+                (user_id, recipient_account, amount, description, frequency, start_at, remaining, next_run_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (user_id, recipient_account, amount, description, frequency, first_run_at, count, first_run_at))
+        return cur.lastrowid
+
+    @instrumented
+    def get_scheduled_transfers(self, user_id):
+        return self.read_cursor.execute("""
+            SELECT id, recipient_account, amount, description, frequency, next_run_at, remaining, status, attempts
+            FROM scheduled_transfers
+            WHERE user_id = ?
+            ORDER BY id DESC
+        """, (user_id,)).fetchall()
+
+    @instrumented
+    def get_schedule_runs(self, user_id, schedule_id, limit=20):
+        return self.read_cursor.execute("""
+            SELECT r.due_at, r.run_at, r.status, r.message
+            FROM scheduled_runs r JOIN scheduled_transfers s ON s.id = r.schedule_id
+            WHERE r.schedule_id = ? AND s.user_id = ?
+            ORDER BY r.id DESC
+            LIMIT ?
+        """, (schedule_id, user_id, limit)).fetchall()
+
+    @instrumented
+    def cancel_scheduled_transfer(self, user_id, schedule_id):
+        return self._write(self._cancel_schedule, user_id, schedule_id)
+
+    def _cancel_schedule(self, cur, user_id, schedule_id):
+        cur.execute("UPDATE scheduled_transfers SET status = 'CANCELLED' WHERE id = ? AND user_id = ? AND status = 'ACTIVE'",
+                    (schedule_id, user_id))
+        return cur.rowcount == 1
+
+    @instrumented
+    def get_analytics_data(self, user_id):
+        return self.read_cursor.execute("SELECT type, total FROM user_totals WHERE user_id = ?", (user_id,)).fetchall()
+
+    @instrumented
+    def get_monthly_totals(self, user_id, since_month):
+        return self.read_cursor.execute("""
+            SELECT month, type, total
+            FROM user_monthly_totals
+            WHERE user_id = ? AND month >= ?
+            ORDER BY month
+        """, (user_id, since_month)).fetchall()
+
+    @instrumented
+    def get_daily_totals(self, user_id, since_day):
+        return self.read_cursor.execute("""
+            SELECT day, type, total
+            FROM user_daily_totals
+            WHERE user_id = ? AND day >= ?
+            ORDER BY day
+        """, (user_id, since_day)).fetchall()
+
+    # Records the balance of every account touched since the previous
+    # snapshot, as of the newest journal entry. Returns the number written.
+    @instrumented
+    def take_balance_snapshots(self):
+        with self.write_transaction() as cur:
+            last = cur.execute("SELECT COALESCE(MAX(journal_id), 0) FROM balance_snapshots").fetchone()[0]
+            top = cur.execute("SELECT COALESCE(MAX(id), 0) FROM journal").fetchone()[0]
+            if top == last: return 0
+            cur.execute("""
+                INSERT INTO balance_snapshots (account_id, journal_id, taken_at, balance)
+                SELECT j.account_id, ?, CURRENT_TIMESTAMP, SUM(j.amount) + COALESCE((
+                    SELECT s.balance FROM balance_snapshots s
+                    WHERE s.account_id = j.account_id ORDER BY s.journal_id DESC LIMIT 1), 0)
+                FROM journal j
+                WHERE j.id > ? AND j.id <= ?
+                GROUP BY j.account_id
+            """, (top, last, top))
+            return cur.rowcount
+
+    # Balance at the end of `when` (a date or timestamp): the latest snapshot
+    # taken by then plus the journal entries booked after it.
+    @instrumented
+    def balance_as_of(self, account_id, when):
+        if len(when) == 10: when += " 23:59:59"
+        cur = self.read_cursor
+        snapshot = cur.execute("""
+            SELECT journal_id, balance FROM balance_snapshots
+            WHERE account_id = ? AND taken_at <= ?
+            ORDER BY journal_id DESC LIMIT 1
+        """, (account_id, when)).fetchone() or (0, 0)
+        delta = cur.execute("""
+            SELECT COALESCE(SUM(amount), 0) FROM journal
+            WHERE account_id = ? AND id > ? AND created_at <= ?
+        """, (account_id, snapshot[0], when)).fetchone()[0]
+        return snapshot[1] + delta
+
+    @instrumented
+    def rebuild_aggregates(self):
+        with self.write_transaction() as cur:
+            source = ARCHIVED_SOURCE if self.archived else "transactions"
+            for statement in AGGREGATE_REBUILD:
+                cur.execute(statement.format(source=source))
+
+    # Runs the block against one consistent snapshot on this thread's
+    # read-only connection: a deferred BEGIN pins the WAL state at the first
+    # read, so every query inside sees the same commits while writers carry
+    # on. Nested blocks share the outer snapshot. Keep blocks short-lived;
+    # the WAL cannot be checkpointed past an open snapshot.
+    @contextmanager
+    def read_snapshot(self):
+        conn = self.pool.connection(readonly=True)
+        if conn.in_transaction or self.pool.in_memory:
+            yield self.read_cursor
+            return
+        self.read_cursor.execute("BEGIN")
+        try:
+            yield self.read_cursor
+        finally:
+            conn.rollback()
+
+    @contextmanager
+    def write_transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front so the reads and
+        # conditional updates inside the block cannot race another writer.
+        self.cursor.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.cursor
+        except BaseException:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+
+    # Every single-row mutator goes through here: inline in its own
+    # transaction, or queued to the GroupCommitter under the "batched" profile.
+    def _write(self, operation, *args):
+        if self.committer is not None:
+            return self.committer.submit(operation, *args)
+        start = time.perf_counter()
+        with self.write_transaction() as cur:
+            result = operation(cur, *args)
+        self.commit_metrics.record(1, time.perf_counter() - start)
+        return result
+
+    def _credit(self, cursor, user_id, amount):
+        cursor.execute("UPDATE users SET balance = balance + ? WHERE id = ?", (amount, user_id))
+        return cursor.rowcount == 1
+
+    def _debit(self, cursor, user_id, amount):
+        cursor.execute("UPDATE users SET balance = balance - ? WHERE id = ? AND balance >= ?",
+                       (amount, user_id, amount))
+        return cursor.rowcount == 1
+
+    def _balance(self, cursor, user_id):
+        cursor.execute("SELECT balance FROM users WHERE id = ?", (user_id,))
+        return cursor.fetchone()[0]
+
+    @instrumented
+    def deposit(self, user_id, amount, description="Deposit"):
+        return self._write(self._deposit, user_id, amount, description)
+
+    def _deposit(self, cur, user_id, amount, description):
+        if not self._credit(cur, user_id, amount): return None
+        cur.execute("INSERT INTO transactions (user_id, type, amount, description) VALUES (?, 'DEPOSIT', ?, ?)",
+                    (user_id, amount, description))
+        return self._balance(cur, user_id)
+
+    @instrumented
+    def withdraw(self, user_id, amount, description="Withdrawal"):
+        return self._write(self._withdraw, user_id, amount, description)
+
+    def _withdraw(self, cur, user_id, amount, description):
+        if not self._debit(cur, user_id, amount): return None
+        cur.execute("INSERT INTO transactions (user_id, type, amount, description) VALUES (?, 'WITHDRAW', ?, ?)",
+                    (user_id, amount, description))
+        return self._balance(cur, user_id)
+
+    @instrumented
+    def transfer_money(self, from_account, to_account, amount):
+        try:
+            return self._write(self._transfer, from_account, to_account, amount)
+        except sqlite3.Error as e:
+            return False, str(e)
+
+    def _transfer(self, cur, from_account, to_account, amount):
+        cur.execute("SELECT id, name FROM users WHERE account_number = ?", (from_account,))
+        sender = cur.fetchone()
+        cur.execute("SELECT id, name FROM users WHERE account_number = ?", (to_account,))
+        recipient = cur.fetchone()
+
+        if not sender or not recipient: return False, "Account not found"
+        if not self._debit(cur, sender[0], amount): return False, "Insufficient balance"
+        self._credit(cur, recipient[0], amount)
+
+        cur.executemany("""
+            INSERT INTO transactions (user_id, type, amount, recipient_account, description)
+            VALUES (?, ?, ?, ?, ?)
+        """, [(sender[0], "TRANSFER_OUT", amount, to_account, f"Transfer to {recipient[1]}"),
+              (recipient[0], "TRANSFER_IN", amount, from_account, f"Transfer from {sender[1]}")])
+        return True, "Transfer successful"
+
+    def close(self):
+        if self.committer is not None:
+            self.committer.stop()
+            self.committer = None
+        self.pool.close()
@@ -0,0 +1,1333 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from tkinter import messagebox, filedialog
+import customtkinter as ctk
+
+from .controller import BankController, extract_account_number
+from .tasks import TaskRunner
+
+# Seconds a posting may take before the UI gives up waiting on it.
+POST_TIMEOUT = 30
+CHANGE_POLL_MS = 1000  # how often open views check for commits from other processes
+FRAME_CACHE_SIZE = 3  # screens kept alive after use; the least recently shown is destroyed first
+
+UI_COLORS = {
+    "app_bg": ("#eef2ff", "#0b1220"),
+    "surface": ("#ffffff", "#111827"),
+    "surface_2": ("#f8fafc", "#0f172a"),
+    "border": ("#e5e7eb", "#1f2937"),
+    "text": ("#0f172a", "#e5e7eb"),
+    "muted": ("#64748b", "#94a3b8"),
+    "primary": ("#4f46e5", "#818cf8"),
+    "primary_hover": ("#4338ca", "#6366f1"),
+    "success": "#10b981",
+    "success_hover": "#059669",
+    "danger": "#ef4444",
+    "danger_hover": "#dc2626",
+    "warning": "#f59e0b",
+    "warning_hover": "#d97706",
+}
+
+UI_FONTS = None
+
+
+def init_ui_fonts():
+    global UI_FONTS
+    if UI_FONTS is not None:
+        return UI_FONTS
+    UI_FONTS = {
+        "h1": ctk.CTkFont(size=32, weight="bold"),
+        "h2": ctk.CTkFont(size=28, weight="bold"),
+        "h3": ctk.CTkFont(size=24, weight="bold"),
+        "h4": ctk.CTkFont(size=18, weight="bold"),
+        "body": ctk.CTkFont(size=14),
+        "body_b": ctk.CTkFont(size=14, weight="bold"),
+        "small": ctk.CTkFont(size=12),
+        "small_b": ctk.CTkFont(size=12, weight="bold"),
+        "amount": ctk.CTkFont(size=16, weight="bold"),
+    }
+    return UI_FONTS
+
+
+class ToastNotification(ctk.CTkToplevel):
+    def __init__(self, master, message, type="info"):
+        super().__init__(master)
+        self.overrideredirect(True)
+        self.withdraw()
+        self.update_idletasks()
+        try:
+            master.update_idletasks()
+            width = 360
+            height = 60
+            x = master.winfo_x() + master.winfo_width() - width - 24
+            y = master.winfo_y() + master.winfo_height() - height - 24
+            self.geometry(f"{width}x{height}+{max(x, 10)}+{max(y, 10)}")
+        except:
+            self.geometry("360x60+100+100")
+        self.deiconify()
+            
+        self.attributes("-topmost", True)
+        
+        colors = {"success": "#10b981", "error": "#ef4444", "info": "#3b82f6"}
+        bg_color = colors.get(type, "#3b82f6")
+        
+        self.frame = ctk.CTkFrame(self, fg_color=bg_color, corner_radius=10)
+        self.frame.pack(fill="both", expand=True)
+        
+        ctk.CTkLabel(self.frame, text=message, text_color="white", font=UI_FONTS["body_b"], wraplength=320).pack(pady=14, padx=16)
+        
+        self.after(3000, self.destroy)
+
+
+class AccountInfoDialog(ctk.CTkToplevel):
+    def __init__(self, master, title, subtitle, account_number, primary_action_text="Go to Login", primary_action=None):
+        super().__init__(master)
+        self.title(title)
+        self.geometry("520x320")
+        self.resizable(False, False)
+
+        try:
+            master.update_idletasks()
+            x = master.winfo_x() + (master.winfo_width() // 2) - 260
+            y = master.winfo_y() + (master.winfo_height() // 2) - 160
+            self.geometry(f"520x320+{max(x, 10)}+{max(y, 10)}")
+        except Exception:
+            pass
+
+        self.transient(master)
+        self.grab_set()
+        self.attributes("-topmost", True)
+
+        surface = ctk.CTkFrame(self, fg_color=UI_COLORS["surface"], corner_radius=22)
+        surface.pack(fill="both", expand=True, padx=18, pady=18)
+
+        ctk.CTkLabel(surface, text=title, font=UI_FONTS["h3"], text_color=UI_COLORS["text"]).pack(pady=(26, 6))
+        ctk.CTkLabel(surface, text=subtitle, font=UI_FONTS["small"], text_color=UI_COLORS["muted"], wraplength=460).pack(pady=(0, 18))
+
+        card = ctk.CTkFrame(surface, fg_color=UI_COLORS["surface_2"], corner_radius=16)
+        card.pack(fill="x", padx=22, pady=(0, 16))
+
+        ctk.CTkLabel(card, text="Account Number", font=UI_FONTS["small_b"], text_color=UI_COLORS["muted"]).pack(anchor="w", padx=18, pady=(16, 6))
+
+        row = ctk.CTkFrame(card, fg_color="transparent")
+        row.pack(fill="x", padx=18, pady=(0, 16))
+        row.grid_columnconfigure(0, weight=1)
+        row.grid_columnconfigure(1, weight=0)
+
+        self._account = str(account_number)
+
+        entry = ctk.CTkEntry(
+            row,
+            height=44,
+            font=UI_FONTS["body_b"],
+            corner_radius=12,
+            border_width=1,
+            fg_color=UI_COLORS["surface"],
+            border_color=UI_COLORS["border"],
+            text_color=UI_COLORS["text"],
+        )
+        entry.grid(row=0, column=0, sticky="ew", padx=(0, 10))
+        entry.insert(0, self._account)
+        entry.configure(state="readonly")
+
+        AnimatedButton(
+            row,
+            text="Copy",
+            width=90,
+            height=44,
+            fg_color=UI_COLORS["primary"],
+            hover_color=UI_COLORS["primary_hover"],
+            command=self.copy_account,
+        ).grid(row=0, column=1, sticky="e")
+
+        btn_row = ctk.CTkFrame(surface, fg_color="transparent")
+        btn_row.pack(fill="x", padx=22, pady=(0, 8))
+        btn_row.grid_columnconfigure(0, weight=1)
+        btn_row.grid_columnconfigure(1, weight=0)
+
+        AnimatedButton(
+            btn_row,
+            text="Close",
+            width=120,
+            height=40,
+            fg_color=UI_COLORS["surface_2"],
+            hover_color=("#e2e8f0", "#334155"),
+            text_color=UI_COLORS["text"],
+            font=UI_FONTS["small_b"],
+            command=self.destroy,
+        ).grid(row=0, column=0, sticky="w")
+
+        if primary_action is not None:
+            AnimatedButton(
+                btn_row,
+                text=primary_action_text,
+                width=160,
+                height=40,
+                fg_color=UI_COLORS["success"],
+                hover_color=UI_COLORS["success_hover"],
+                command=lambda: self._do_primary(primary_action),
+            ).grid(row=0, column=1, sticky="e")
+
+    def _do_primary(self, action):
+        try:
+            action()
+        finally:
+            self.destroy()
+
+    def copy_account(self):
+        try:
+            self.clipboard_clear()
+            self.clipboard_append(self._account)
+            self.update()
+            if hasattr(self.master, "show_toast"):
+                self.master.show_toast("Account number copied", "success")
+        except Exception:
+            pass
+
+class RecoveryDialog(ctk.CTkToplevel):
+    def __init__(self, master):
+        super().__init__(master)
+        self.title("Recover Account")
+        self.geometry("400x350")
+        self.resizable(False, False)
+        
+        # Center the window
+        try:
+            x = master.winfo_x() + (master.winfo_width() // 2) - 200
+            y = master.winfo_y() + (master.winfo_height() // 2) - 175
+            self.geometry(f"400x350+{x}+{y}")
+        except: pass
+
+        self.attributes("-topmost", True)
+        
+        ctk.CTkLabel(self, text="Recover Account Number", font=UI_FONTS["h4"], text_color=UI_COLORS["text"]).pack(pady=(22, 6))
+        ctk.CTkLabel(self, text="Enter your details to verify identity", text_color=UI_COLORS["muted"], font=UI_FONTS["small"]).pack(pady=(0, 18))
+        
+        self.name = create_styled_entry(self, "Full Name", width=300)
+        self.name.pack(pady=10)
+        
+        self.pin = create_styled_entry(self, "4-Digit PIN", show="●", width=300)
+        self.pin.pack(pady=10)
+
+        pin_row = ctk.CTkFrame(self, fg_color="transparent")
+        pin_row.pack(fill="x", padx=50, pady=(2, 0))
+        self.show_pin = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            pin_row,
+            text="Show PIN",
+            variable=self.show_pin,
+            command=self.toggle_pin,
+            fg_color=UI_COLORS["primary"],
+            hover_color=UI_COLORS["primary_hover"],
+            text_color=UI_COLORS["muted"],
+            font=UI_FONTS["small"],
+        ).pack(side="left")
+        
+        AnimatedButton(self, text="Recover Account", command=self.recover, width=300, height=44, fg_color=UI_COLORS["primary"], hover_color=UI_COLORS["primary_hover"]).pack(pady=20)
+
+    def toggle_pin(self):
+        self.pin.configure(show="" if self.show_pin.get() else "●")
+        
+    def recover(self):
+        name = self.name.get()
+        pin = self.pin.get()
+        success, msg = self.master.master.controller.recover_account(name, pin)
+        if success:
+            acc = extract_account_number(msg)
+            if acc:
+                try:
+                    self.grab_release()
+                except Exception:
+                    pass
+                try:
+                    self.withdraw()
+                except Exception:
+                    pass
+                AccountInfoDialog(
+                    self.master.master,
+                    title="Account Recovered",
+                    subtitle="We verified your identity. Copy your account number and keep it safe.",
+                    account_number=acc,
+                )
+            else:
+                messagebox.showinfo("Identity Verified", msg)
+            try:
+                self.after(120, self.destroy)
+            except Exception:
+                self.destroy()
+        else:
+            messagebox.showerror("Failed", msg)
+
+class ExportDialog(ctk.CTkToplevel):
+    TYPES = ["DEPOSIT", "WITHDRAW", "TRANSFER_IN", "TRANSFER_OUT"]
+
+    def __init__(self, master, on_submit):
+        super().__init__(master)
+        self.on_submit = on_submit
+        self.title("Export History")
+        self.geometry("420x470")
+        self.resizable(False, False)
+
+        try:
+            x = master.winfo_x() + (master.winfo_width() // 2) - 210
+            y = master.winfo_y() + (master.winfo_height() // 2) - 235
+            self.geometry(f"420x470+{x}+{y}")
+        except: pass
+
+        self.attributes("-topmost", True)
+
+        ctk.CTkLabel(self, text="Export History", font=UI_FONTS["h4"], text_color=UI_COLORS["text"]).pack(pady=(22, 6))
+        ctk.CTkLabel(self, text="Leave dates empty to export everything", text_color=UI_COLORS["muted"], font=UI_FONTS["small"]).pack(pady=(0, 14))
+
+        self.start = create_styled_entry(self, "From (YYYY-MM-DD)", width=320)
+        self.start.pack(pady=6)
+        self.end = create_styled_entry(self, "To (YYYY-MM-DD)", width=320)
+        self.end.pack(pady=6)
+
+        types_frame = ctk.CTkFrame(self, fg_color="transparent")
+        types_frame.pack(fill="x", padx=50, pady=(10, 0))
+        self.type_vars = {}
+        for i, type_ in enumerate(self.TYPES):
+            var = ctk.BooleanVar(value=True)
+            ctk.CTkCheckBox(types_frame, text=type_.replace("_", " ").title(), variable=var,
+                            fg_color=UI_COLORS["primary"], hover_color=UI_COLORS["primary_hover"],
+                            text_color=UI_COLORS["muted"], font=UI_FONTS["small"]).grid(row=i // 2, column=i % 2, sticky="w", pady=4, padx=(0, 12))
+            self.type_vars[type_] = var
+
+        self.compress = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(self, text="Compress (gzip)", variable=self.compress,
+                        fg_color=UI_COLORS["primary"], hover_color=UI_COLORS["primary_hover"],
+                        text_color=UI_COLORS["muted"], font=UI_FONTS["small"]).pack(anchor="w", padx=50, pady=(10, 0))
+
+        AnimatedButton(self, text="Choose File & Export", command=self.submit, width=320, height=44, fg_color=UI_COLORS["primary"], hover_color=UI_COLORS["primary_hover"]).pack(pady=20)
+
+    def submit(self):
+        start, end = self.start.get().strip() or None, self.end.get().strip() or None
+        try:
+            for value in (start, end):
+                if value: datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            messagebox.showerror("Export", "Dates must look like 2026-03-31", parent=self)
+            return
+        types = [t for t, var in self.type_vars.items() if var.get()]
+        if not types:
+            messagebox.showerror("Export", "Select at least one transaction type", parent=self)
+            return
+        compress = self.compress.get()
+        filename = filedialog.asksaveasfilename(
+            parent=self,
+            defaultextension=".csv.gz" if compress else ".csv",
+            filetypes=[("Gzipped CSV", "*.csv.gz")] if compress else [("CSV Files", "*.csv")],
+        )
+        if not filename: return
+        self.destroy()
+        self.on_submit(filename, start, end, None if len(types) == len(self.TYPES) else types, compress)
+
+# Removed MobileEntry to fix layout issues. Using standard styled CTkEntry via helper.
+def create_styled_entry(master, placeholder, show=None, width=300):
+    return ctk.CTkEntry(
+        master,
+        placeholder_text=placeholder,
+        show=show,
+        width=width,
+        height=44,
+        font=UI_FONTS["body"],
+        corner_radius=12,
+        border_width=1,
+        fg_color=UI_COLORS["surface"],
+        border_color=UI_COLORS["border"],
+        text_color=UI_COLORS["text"],
+        placeholder_text_color=UI_COLORS["muted"],
+    )
+
+class AnimatedButton(ctk.CTkButton):
+    def __init__(self, master, **kwargs):
+        if "corner_radius" not in kwargs:
+            kwargs["corner_radius"] = 12
+        if "font" not in kwargs:
+            kwargs["font"] = UI_FONTS["body_b"]
+        super().__init__(master, **kwargs)
+        self.bind("<Enter>", self.on_enter)
+        self.bind("<Leave>", self.on_leave)
+    def on_enter(self, event): self.configure(cursor="hand2")
+    def on_leave(self, event): self.configure(cursor="")
+
+class VirtualCard(ctk.CTkFrame):
+    def __init__(self, master, name, account_num, **kwargs):
+        super().__init__(master, fg_color="transparent", **kwargs)
+        self.card = ctk.CTkFrame(self, fg_color=("#4f46e5", "#3730a3"), corner_radius=20, height=220, width=380)
+        self.card.pack(fill="both", expand=True)
+        self.card.pack_propagate(False)
+        
+        gradient = ctk.CTkFrame(self.card, fg_color=("#6366f1", "#4338ca"), corner_radius=20, height=220, width=150)
+        gradient.place(relx=0, rely=0)
+        
+        ctk.CTkFrame(self.card, fg_color="#fbbf24", width=50, height=35, corner_radius=5).place(relx=0.1, rely=0.25)
+        ctk.CTkLabel(self.card, text=")))", font=("Arial", 20, "bold"), text_color="white").place(relx=0.85, rely=0.25, anchor="center")
+        ctk.CTkLabel(self.card, text="SECURE BANK", font=("Arial", 14, "bold"), text_color="#e0e7ff").place(relx=0.9, rely=0.1, anchor="ne")
+        
+        masked_num = f"**** **** **** {account_num[-4:]}"
+        ctk.CTkLabel(self.card, text=masked_num, font=("Courier New", 22, "bold"), text_color="white").place(relx=0.1, rely=0.55)
+        ctk.CTkLabel(self.card, text=name.upper(), font=("Arial", 16, "bold"), text_color="white").place(relx=0.1, rely=0.82)
+        ctk.CTkLabel(self.card, text="12/29", font=("Arial", 14, "bold"), text_color="white").place(relx=0.7, rely=0.82)
+
+        AnimatedButton(
+            self.card,
+            text="Copy",
+            width=70,
+            height=30,
+            fg_color=("#ffffff", "#111827"),
+            hover_color=("#e5e7eb", "#0f172a"),
+            text_color=("#0f172a", "#e5e7eb"),
+            font=UI_FONTS["small_b"],
+            command=lambda n=account_num: self.copy_account(n),
+        ).place(relx=0.9, rely=0.88, anchor="se")
+
+    def copy_account(self, account_num):
+        try:
+            self.winfo_toplevel().clipboard_clear()
+            self.winfo_toplevel().clipboard_append(account_num)
+            self.winfo_toplevel().update()
+            if hasattr(self.winfo_toplevel(), "show_toast"):
+                self.winfo_toplevel().show_toast("Account number copied", "success")
+        except Exception:
+            pass
+
+class BankApp(ctk.CTk):
+    def __init__(self, db_name="bank.db", **db_options):
+        super().__init__()
+        init_ui_fonts()
+        self.controller = BankController(db_name, **db_options)
+        self.tasks = TaskRunner(self)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.title("Secure Bank")
+        self.geometry("1200x820")
+        self.minsize(980, 680)
+        
+        self.grid_columnconfigure(1, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        
+        self.sidebar_frame = None
+        self.content_frame = None
+        self.frames = OrderedDict()  # screen class -> live frame, least recently shown first
+        self.active_nav = None
+        self._active_toast = None
+        self._change_poll = None
+        
+        self.show_login_frame()
+        self.after(CHANGE_POLL_MS, self.poll_changes)
+
+    # The watcher costs one PRAGMA per tick while nothing changes; results
+    # are dispatched here on the Tk thread.
+    def poll_changes(self):
+        self.check_changes()
+        self.after(CHANGE_POLL_MS, self.poll_changes)
+
+    # Also called when a cached screen is shown, so it catches up at once.
+    def check_changes(self):
+        if self._change_poll is None or self._change_poll.finished:
+            self._change_poll = self.tasks.submit(self.controller.changes.poll, on_success=self.controller.changes.dispatch)
+
+    def on_close(self):
+        self.tasks.shutdown(wait=True)
+        self.controller.db.close()
+        self.destroy()
+
+    def show_toast(self, message, type="info"):
+        try:
+            if self._active_toast and self._active_toast.winfo_exists():
+                self._active_toast.destroy()
+        except Exception:
+            pass
+        self._active_toast = ToastNotification(self, message, type)
+
+    def create_sidebar(self):
+        if self.sidebar_frame: self.sidebar_frame.destroy()
+        
+        self.sidebar_frame = ctk.CTkFrame(self, width=250, corner_radius=0, fg_color=UI_COLORS["surface_2"])
+        self.sidebar_frame.grid(row=0, column=0, sticky="nsew")
+        
+        ctk.CTkLabel(self.sidebar_frame, text="🏦 SecureBank", font=UI_FONTS["h3"], text_color=UI_COLORS["primary"]).pack(pady=(36, 4))
+        ctk.CTkLabel(self.sidebar_frame, text="PREMIUM", font=UI_FONTS["small_b"], text_color=UI_COLORS["muted"]).pack(pady=(0, 36))
+        
+        self.nav_buttons = {}
+        self.active_nav = None
+        buttons = [
+            ("📊 Dashboard", self.show_dashboard_frame),
+            ("💸 Transfer", self.show_transfer_frame),
+            ("📜 History", self.show_history_frame),
+            ("📈 Analytics", self.show_analytics_frame),
+            ("⚙️ Settings", self.show_settings_frame),
+        ]
+        
+        for text, cmd in buttons:
+            btn = AnimatedButton(self.sidebar_frame, text=text, command=cmd, 
+                          fg_color="transparent", text_color=("#1e293b", "#e2e8f0"),
+                          hover_color=("#e2e8f0", "#334155"), anchor="w", 
+                          width=220, height=44, font=ctk.CTkFont(size=15, weight="bold"))
+            btn.pack(pady=5)
+            self.nav_buttons[text] = btn
+            
+        AnimatedButton(self.sidebar_frame, text="🚪 Logout", command=self.logout_event,
+                      fg_color=("#fee2e2", "#7f1d1d"), hover_color=("#fecaca", "#991b1b"),
+                      text_color=("#dc2626", "#fca5a5"), width=200, height=40).pack(side="bottom", pady=26)
+
+    # Only the previously highlighted button and the new one are touched.
+    def highlight_nav(self, text):
+        if text == self.active_nav: return
+        previous = self.nav_buttons.get(self.active_nav)
+        if previous is not None: previous.configure(fg_color="transparent", text_color=("#1e293b", "#e2e8f0"))
+        self.nav_buttons[text].configure(fg_color=("#e0e7ff", "#312e81"), text_color=("#4338ca", "#818cf8"))
+        self.active_nav = text
+
+    # Screens are built once and then hidden with grid_remove() instead of
+    # destroyed; showing one again calls its on_show() hook (if any) so it
+    # can catch up on what changed while it was hidden. At most
+    # FRAME_CACHE_SIZE screens stay alive.
+    def switch_frame(self, frame_class):
+        frame = self.frames.pop(frame_class, None)
+        current = self.content_frame
+        if current is not None and current is not frame:
+            if current in self.frames.values(): current.grid_remove()
+            else: current.destroy()
+        if frame is None:
+            frame = frame_class(self)
+        elif frame is not current and hasattr(frame, "on_show"):
+            frame.on_show()
+        self.frames[frame_class] = frame
+        while len(self.frames) > FRAME_CACHE_SIZE:
+            self.frames.popitem(last=False)[1].destroy()
+        self.content_frame = frame
+        frame.grid(row=0, column=1, sticky="nsew", padx=20, pady=20)
+
+    def clear_frames(self):
+        if self.content_frame is not None and self.content_frame not in self.frames.values():
+            self.content_frame.destroy()
+        for frame in self.frames.values():
+            frame.destroy()
+        self.frames.clear()
+        self.content_frame = None
+
+    def show_login_frame(self):
+        if self.sidebar_frame: 
+            self.sidebar_frame.destroy()
+            self.sidebar_frame = None
+        
+        # Ensure cleanup; cached screens belong to the user who is leaving
+        self.clear_frames()
+        
+        self.content_frame = LoginFrame(self)
+        self.content_frame.grid(row=0, column=0, columnspan=2, sticky="nsew") # Span both to ensure full width
+        
+        # Reset weights
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_columnconfigure(1, weight=0)
+
+    def show_dashboard_frame(self): self.setup_main_view(); self.switch_frame(DashboardFrame); self.highlight_nav("📊 Dashboard")
+    def show_transfer_frame(self): self.setup_main_view(); self.switch_frame(TransferFrame); self.highlight_nav("💸 Transfer")
+    def show_history_frame(self): self.setup_main_view(); self.switch_frame(HistoryFrame); self.highlight_nav("📜 History")
+    def show_analytics_frame(self): self.setup_main_view(); self.switch_frame(AnalyticsFrame); self.highlight_nav("📈 Analytics")
+    def show_settings_frame(self): self.setup_main_view(); self.switch_frame(SettingsFrame); self.highlight_nav("⚙️ Settings")
+
+    def setup_main_view(self):
+        if not self.sidebar_frame: self.create_sidebar()
+        self.grid_columnconfigure(0, weight=0, minsize=250)
+        self.grid_columnconfigure(1, weight=1)
+
+    def logout_event(self):
+        if messagebox.askyesno("Logout", "Are you sure?"):
+            self.controller.logout()
+            self.show_login_frame()
+
+class LoginFrame(ctk.CTkFrame):
+    def __init__(self, master):
+        super().__init__(master, fg_color=UI_COLORS["app_bg"])
+        container = ctk.CTkFrame(self, fg_color=UI_COLORS["surface"], corner_radius=26, width=420, height=590)
+        container.place(relx=0.5, rely=0.5, anchor="center")
+        
+        ctk.CTkLabel(container, text="🏦 SecureBank", font=UI_FONTS["h1"], text_color=UI_COLORS["text"]).pack(pady=(44, 18))
+        
+        self.acc_entry = create_styled_entry(container, "Account Number", width=300)
+        self.acc_entry.pack(pady=10)
+        
+        self.pin_entry = create_styled_entry(container, "PIN", show="●", width=300)
+        self.pin_entry.pack(pady=10)
+
+        pin_row = ctk.CTkFrame(container, fg_color="transparent")
+        pin_row.pack(fill="x", padx=58, pady=(2, 0))
+        self.show_pin = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            pin_row,
+            text="Show PIN",
+            variable=self.show_pin,
+            command=self.toggle_pin,
+            fg_color=UI_COLORS["primary"],
+            hover_color=UI_COLORS["primary_hover"],
+            text_color=UI_COLORS["muted"],
+            font=UI_FONTS["small"],
+        ).pack(side="left")
+        
+        self.sign_in_button = AnimatedButton(container, text="Sign In", command=self.login_event, width=300, height=46, fg_color=UI_COLORS["primary"], hover_color=UI_COLORS["primary_hover"])
+        self.sign_in_button.pack(pady=(20, 14))
+        
+        AnimatedButton(container, text="Forgot Account Number?", command=self.show_recovery, fg_color="transparent", text_color=UI_COLORS["muted"], height=24, font=UI_FONTS["small"]).pack(pady=(0, 18))
+        
+        AnimatedButton(container, text="Create Account", command=self.show_register, fg_color="transparent", text_color=UI_COLORS["primary"], height=28).pack()
+
+    def toggle_pin(self):
+        self.pin_entry.configure(show="" if self.show_pin.get() else "●")
+
+    def login_event(self):
+        acc = self.acc_entry.get()
+        pin = self.pin_entry.get()
+        self.master.tasks.submit(self.master.controller.sign_in, acc, pin, on_success=self.on_signed_in,
+                                 on_error=lambda e: self.master.show_toast(str(e), "error"),
+                                 timeout=POST_TIMEOUT, busy=(self.sign_in_button,))
+
+    def on_signed_in(self, result):
+        success, msg = result
+        if success: 
+            self.master.show_toast(msg, "success")
+            self.master.show_dashboard_frame()
+        else: 
+            self.master.show_toast(msg, "error")
+
+    def show_register(self):
+        RegisterFrame(self.master).grid(row=0, column=0, columnspan=2, sticky="nsew")
+        
+    def show_recovery(self):
+        RecoveryDialog(self)
+
+class RegisterFrame(ctk.CTkFrame):
+    def __init__(self, master):
+        super().__init__(master, fg_color=UI_COLORS["app_bg"])
+        container = ctk.CTkFrame(self, fg_color=UI_COLORS["surface"], corner_radius=26, width=420, height=590)
+        container.place(relx=0.5, rely=0.5, anchor="center")
+        
+        ctk.CTkLabel(container, text="Create Account", font=UI_FONTS["h1"], text_color=UI_COLORS["text"]).pack(pady=(42, 22))
+        self.name = create_styled_entry(container, "Full Name", width=300)
+        self.name.pack(pady=10)
+        self.pin = create_styled_entry(container, "4-Digit PIN", show="●", width=300)
+        self.pin.pack(pady=10)
+
+        pin_row = ctk.CTkFrame(container, fg_color="transparent")
+        pin_row.pack(fill="x", padx=58, pady=(2, 0))
+        self.show_pin = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            pin_row,
+            text="Show PIN",
+            variable=self.show_pin,
+            command=self.toggle_pin,
+            fg_color=UI_COLORS["primary"],
+            hover_color=UI_COLORS["primary_hover"],
+            text_color=UI_COLORS["muted"],
+            font=UI_FONTS["small"],
+        ).pack(side="left")
+
+        self.register_button = AnimatedButton(container, text="Register", command=self.register, width=300, height=46, fg_color=UI_COLORS["success"], hover_color=UI_COLORS["success_hover"])
+        self.register_button.pack(pady=(26, 18))
+        AnimatedButton(container, text="Back to Login", command=master.show_login_frame, fg_color="transparent", text_color=UI_COLORS["success"], height=28).pack()
+
+    def toggle_pin(self):
+        self.pin.configure(show="" if self.show_pin.get() else "●")
+
+    def register(self):
+        name = self.name.get()
+        pin = self.pin.get()
+        self.master.tasks.submit(self.master.controller.sign_up, name, pin, on_success=self.on_registered,
+                                 on_error=lambda e: self.master.show_toast(str(e), "error"),
+                                 timeout=POST_TIMEOUT, busy=(self.register_button,))
+
+    def on_registered(self, msg):
+        if "Created" in msg:
+            acc = extract_account_number(msg)
+            if acc:
+                AccountInfoDialog(
+                    self.master,
+                    title="Account Created",
+                    subtitle="Your account is ready. Copy your account number and keep it safe.",
+                    account_number=acc,
+                    primary_action_text="Go to Login",
+                    primary_action=self.master.show_login_frame,
+                )
+            else:
+                messagebox.showinfo("Success - Save This!", msg)
+                self.master.show_login_frame()
+        else:
+            self.master.show_toast(msg, "error")
+
+class DashboardFrame(ctk.CTkScrollableFrame):
+    def __init__(self, master):
+        super().__init__(master, fg_color="transparent")
+        # CTkScrollableFrame re-parents itself onto a canvas, so self.master is
+        # not the app window; keep an explicit reference instead.
+        self.app = master
+        self.controller = master.controller
+        self.tasks = master.tasks
+        user = self.controller.current_user
+
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.pack(fill="x", pady=(0, 16))
+        ctk.CTkLabel(header, text=f"Hello, {user['name']} 👋", font=UI_FONTS["h1"], text_color=UI_COLORS["text"]).pack(side="left")
+        self.refresh_buttons = []
+        self.refresh_buttons.append(AnimatedButton(
+            header,
+            text="⟳ Refresh",
+            command=self.refresh_data,
+            width=120,
+            height=38,
+            fg_color=UI_COLORS["surface_2"],
+            hover_color=("#e2e8f0", "#334155"),
+            text_color=UI_COLORS["text"],
+            font=UI_FONTS["small_b"],
+        ))
+        self.refresh_buttons[-1].pack(side="right")
+        
+        row1 = ctk.CTkFrame(self, fg_color="transparent")
+        row1.pack(fill="x", pady=10)
+        row1.grid_columnconfigure(0, weight=0)
+        row1.grid_columnconfigure(1, weight=1)
+        row1.grid_rowconfigure(0, weight=1)
+
+        VirtualCard(row1, user['name'], user['account_number']).grid(row=0, column=0, sticky="nw", padx=(0, 18), pady=0)
+
+        bal_frame = ctk.CTkFrame(row1, fg_color=UI_COLORS["surface"], corner_radius=20, height=220)
+        bal_frame.grid(row=0, column=1, sticky="nsew")
+        ctk.CTkLabel(bal_frame, text="Current Balance", font=UI_FONTS["small_b"], text_color=UI_COLORS["muted"]).pack(pady=(44, 8))
+        self.balance_value = ctk.CTkLabel(bal_frame, text=f"₹{self.controller.get_balance():,}", font=ctk.CTkFont(size=46, weight="bold"), text_color=UI_COLORS["success"])
+        self.balance_value.pack()
+
+        self.refresh_buttons.append(AnimatedButton(
+            bal_frame,
+            text="Refresh Balance",
+            command=self.refresh_data,
+            width=160,
+            height=34,
+            fg_color=UI_COLORS["surface_2"],
+            hover_color=("#e2e8f0", "#334155"),
+            text_color=UI_COLORS["text"],
+            font=UI_FONTS["small_b"],
+        ))
+        self.refresh_buttons[-1].pack(pady=(14, 0))
+        
+        ctk.CTkLabel(self, text="Recent People", font=UI_FONTS["h4"], text_color=UI_COLORS["text"]).pack(anchor="w", pady=(28, 10))
+        self.people_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.people_frame.pack(fill="x", anchor="w")
+        self.people_stale = False
+        self.load_people()
+
+        lower_row = ctk.CTkFrame(self, fg_color="transparent")
+        lower_row.pack(fill="x", pady=28)
+        lower_row.grid_columnconfigure(0, weight=1)
+        lower_row.grid_columnconfigure(1, weight=0)
+
+        activity_frame = ctk.CTkFrame(lower_row, fg_color=UI_COLORS["surface"], corner_radius=20)
+        activity_frame.grid(row=0, column=0, sticky="nsew", padx=(0, 18))
+        ctk.CTkLabel(activity_frame, text="Recent Activity", font=UI_FONTS["h4"], text_color=UI_COLORS["text"]).pack(anchor="w", padx=20, pady=20)
+
+        self.activity_list = ctk.CTkFrame(activity_frame, fg_color="transparent")
+        self.activity_list.pack(fill="x")
+        self.recent = []
+            
+        actions_frame = ctk.CTkFrame(lower_row, fg_color=UI_COLORS["surface"], corner_radius=20, width=320)
+        actions_frame.grid(row=0, column=1, sticky="nsew")
+        actions_frame.grid_propagate(False)
+        ctk.CTkLabel(actions_frame, text="Quick Transaction", font=UI_FONTS["h4"], text_color=UI_COLORS["text"]).pack(anchor="w", padx=20, pady=20)
+        
+        self.amount_entry = create_styled_entry(actions_frame, "Amount", width=250)
+        self.amount_entry.pack(pady=10, padx=20)
+        
+        btns = ctk.CTkFrame(actions_frame, fg_color="transparent")
+        btns.pack(pady=10)
+        self.deposit_button = AnimatedButton(btns, text="Deposit", command=self.deposit, fg_color=UI_COLORS["success"], hover_color=UI_COLORS["success_hover"], width=120)
+        self.deposit_button.pack(side="left", padx=5)
+        self.withdraw_button = AnimatedButton(btns, text="Withdraw", command=self.withdraw, fg_color=UI_COLORS["danger"], hover_color=UI_COLORS["danger_hover"], width=120)
+        self.withdraw_button.pack(side="left", padx=5)
+
+        self.refresh_data()
+        self.watch = self.controller.watch_account(self.on_account_changed)
+
+    def destroy(self):
+        self.controller.unwatch_account(self.watch)
+        super().destroy()
+
+    # Pushed by the change watcher when this account is touched by any
+    # process: only the new rows and the new balance, no reload.
+    # This also runs while the screen is cached but hidden; only the recent
+    # people need a query, so that waits until the screen is shown again.
+    def on_account_changed(self, change):
+        if not self.winfo_exists(): return
+        self.balance_value.configure(text=f"₹{change['balance']:,}")
+        if change["transactions"]: self.render_activity(change["transactions"])
+        if any(t[1] == "TRANSFER_OUT" for t in change["transactions"]):
+            if self.winfo_ismapped(): self.load_people()
+            else: self.people_stale = True
+
+    def on_show(self):
+        if self.people_stale: self.load_people()
+        self.app.check_changes()
+
+    def load_people(self):
+        self.people_stale = False
+        self.tasks.submit(self.controller.get_recent_recipients, on_success=self.render_people)
+
+    def render_people(self, recipients):
+        if not self.winfo_exists(): return
+        people_frame = self.people_frame
+        for child in people_frame.winfo_children():
+            child.destroy()
+        if recipients:
+            for r_acc, name in recipients:
+                initials = "".join([n[0] for n in name.split()[:2]]).upper()
+                
+                person = ctk.CTkFrame(people_frame, fg_color="transparent")
+                person.pack(side="left", padx=10)
+                
+                avatar = AnimatedButton(person, text=initials, width=50, height=50, corner_radius=25, 
+                                       fg_color="#6366f1", hover_color="#4f46e5", 
+                                       command=lambda a=r_acc: self.quick_transfer(a))
+                avatar.pack()
+                ctk.CTkLabel(person, text=name, font=("Arial", 10)).pack()
+        else:
+            ctk.CTkLabel(people_frame, text="No recent transfers", text_color="gray").pack(anchor="w")
+        
+    def create_mini_trans(self, master, t):
+        _, type_, amt, _, time, _ = t
+        row = ctk.CTkFrame(master, fg_color="transparent")
+        row.pack(fill="x", padx=20, pady=5)
+        color = "#10b981" if type_ in ["DEPOSIT", "TRANSFER_IN"] else "#ef4444"
+        ctk.CTkLabel(row, text=type_.replace("_", " "), font=("Arial", 12, "bold")).pack(side="left")
+        ctk.CTkLabel(row, text=f"₹{amt:,}", font=("Arial", 12, "bold"), text_color=color).pack(side="right")
+
+    def refresh_data(self):
+        try:
+            if self.balance_value and self.balance_value.winfo_exists():
+                self.balance_value.configure(text=f"₹{self.controller.get_balance():,}")
+        except Exception:
+            pass
+
+        self.tasks.submit(self.controller.get_transaction_page, None, 3, on_success=self.render_activity,
+                          on_error=self.show_error, busy=self.refresh_buttons)
+
+    # Merges rows (with ids) into the three most recent, so a refresh and a
+    # pushed change that carry the same transaction show it once.
+    def render_activity(self, trans):
+        if not self.winfo_exists(): return
+        merged = {t[0]: t for t in self.recent + list(trans)}
+        self.recent = sorted(merged.values(), key=lambda t: t[0], reverse=True)[:3]
+        for child in self.activity_list.winfo_children():
+            child.destroy()
+        if self.recent:
+            for t in self.recent:
+                self.create_mini_trans(self.activity_list, t)
+        else:
+            ctk.CTkLabel(self.activity_list, text="No recent activity", text_color=UI_COLORS["muted"], font=UI_FONTS["small"]).pack(pady=(0, 20))
+
+    def post(self, operation):
+        self.tasks.submit(operation, self.amount_entry.get(), on_success=self.on_posted, on_error=self.show_error,
+                          timeout=POST_TIMEOUT, busy=(self.deposit_button, self.withdraw_button))
+
+    def on_posted(self, result):
+        success, msg = result
+        self.app.show_toast(msg, "success" if success else "error")
+        if success and self.winfo_exists():
+            self.amount_entry.delete(0, "end")
+            self.refresh_data()
+
+    def show_error(self, error):
+        self.app.show_toast(str(error), "error")
+
+    def deposit(self): self.post(self.controller.deposit)
+    def withdraw(self): self.post(self.controller.withdraw)
+
+    def quick_transfer(self, acc):
+        self.app.show_transfer_frame()
+        self.app.content_frame.set_recipient(acc)
+
+class TransferFrame(ctk.CTkFrame):
+    def __init__(self, master):
+        super().__init__(master, fg_color="transparent")
+        container = ctk.CTkFrame(self, fg_color=UI_COLORS["surface"], corner_radius=20)
+        container.pack(fill="both", expand=True, padx=50, pady=50)
+        
+        ctk.CTkLabel(container, text="Transfer Money", font=UI_FONTS["h2"], text_color=UI_COLORS["text"]).pack(pady=(42, 22))
+        self.recip = create_styled_entry(container, "Recipient Account Number", width=400)
+        self.recip.pack(pady=12)
+        self.amt = create_styled_entry(container, "Amount (₹)", width=400)
+        self.amt.pack(pady=12)
+        self.send_button = AnimatedButton(container, text="Send Money", command=self.send, width=400, height=48, fg_color=UI_COLORS["primary"], hover_color=UI_COLORS["primary_hover"])
+        self.send_button.pack(pady=(22, 0))
+        
+    def send(self):
+        self.master.tasks.submit(self.master.controller.transfer, self.recip.get(), self.amt.get(),
+                                 on_success=self.on_sent, on_error=lambda e: self.master.show_toast(str(e), "error"),
+                                 timeout=POST_TIMEOUT, busy=(self.send_button,))
+
+    def on_sent(self, result):
+        success, msg = result
+        self.master.show_toast(msg, "success" if success else "error")
+        if success:
+            self.recip.delete(0, 'end')
+            self.amt.delete(0, 'end')
+            self.master.show_dashboard_frame()
+        
+    def set_recipient(self, acc):
+        self.recip.delete(0, 'end')
+        self.recip.insert(0, acc)
+
+# Renders history through a fixed pool of row widgets: scrolling only moves an
+# offset into the loaded rows and re-labels the pool, and older pages are
+# fetched by keyset (before_id) as the offset approaches the end.
+class HistoryFrame(ctk.CTkFrame):
+    ROW_POOL = 12
+    ROW_HEIGHT = 74
+    PAGE_SIZE = 100
+    PREFETCH = 20
+    SEARCH_DELAY_MS = 250  # wait for a pause in typing before querying
+    TYPE_FILTERS = {"All types": None, "Deposits": ["DEPOSIT"], "Withdrawals": ["WITHDRAW"],
+                    "Received": ["TRANSFER_IN"], "Sent": ["TRANSFER_OUT"]}
+
+    def __init__(self, master):
+        super().__init__(master, fg_color="transparent")
+        self.app = master
+        self.controller = master.controller
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.pack(fill="x", pady=20)
+        ctk.CTkLabel(header, text="Transaction History", font=UI_FONTS["h2"], text_color=UI_COLORS["text"]).pack(side="left")
+        self.export_button = AnimatedButton(
+            header,
+            text="📥 Export CSV",
+            command=self.export_csv,
+            width=140,
+            height=38,
+            fg_color=UI_COLORS["surface_2"],
+            hover_color=("#e2e8f0", "#334155"),
+            text_color=UI_COLORS["text"],
+            font=UI_FONTS["small_b"],
+        )
+        self.export_button.pack(side="right")
+        self.export_progress = ctk.CTkProgressBar(header, width=160, progress_color=UI_COLORS["primary"])
+        self.export_cancel = None
+
+        search_bar = ctk.CTkFrame(self, fg_color="transparent")
+        search_bar.pack(fill="x", pady=(0, 12))
+        self.search_entry = create_styled_entry(search_bar, "Search: ravi, >500, last march, 2025-03-14")
+        self.search_entry.pack(side="left", fill="x", expand=True)
+        self.search_entry.bind("<KeyRelease>", self.on_search_changed)
+        self.type_menu = ctk.CTkOptionMenu(search_bar, values=list(self.TYPE_FILTERS), width=140, height=44,
+                                           command=self.on_search_changed)
+        self.type_menu.pack(side="right", padx=(12, 0))
+        self.search_job = None
+        self.search_generation = 0
+        self.query, self.types = "", None
+
+        self.rows = []
+        self.offset = 0
+        self.visible = self.ROW_POOL
+        self.exhausted = False
+        self.loading = True
+        self.stale = False
+
+        self.empty = ctk.CTkFrame(self, fg_color=UI_COLORS["surface"], corner_radius=16)
+        self.empty_title = ctk.CTkLabel(self.empty, text="", font=UI_FONTS["body_b"], text_color=UI_COLORS["text"])
+        self.empty_title.pack(pady=(18, 2))
+        self.empty_hint = ctk.CTkLabel(self.empty, text="", font=UI_FONTS["small"], text_color=UI_COLORS["muted"])
+        self.empty_hint.pack(pady=(0, 18))
+
+        body = ctk.CTkFrame(self, fg_color="transparent")
+        body.pack(fill="both", expand=True)
+        self.list_frame = ctk.CTkFrame(body, fg_color="transparent")
+        self.list_frame.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(body, command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.pool = [self.create_trans_row() for _ in range(self.ROW_POOL)]
+        self.list_frame.bind("<Configure>", self.on_resize)
+        self.bind_wheel(self.list_frame)
+        self.render()
+        self.run_search(force=True)
+        self.watch = self.controller.watch_account(self.on_account_changed)
+
+    # Unfiltered history just gains the new rows on top (the offset moves
+    # with them so the rows in view stay put); search results are rerun the
+    # next time the screen is shown.
+    def on_account_changed(self, change):
+        if not self.winfo_exists() or not change["transactions"]: return
+        if self.query or self.types is not None:
+            self.stale = True
+            return
+        newest = self.rows[0][0] if self.rows else 0
+        fresh = sorted((t for t in change["transactions"] if t[0] > newest), key=lambda t: t[0], reverse=True)
+        if not fresh: return
+        self.rows[:0] = fresh
+        if self.offset: self.offset += len(fresh)
+        self.render()
+
+    def on_show(self):
+        if self.stale: self.run_search(force=True)
+        self.app.check_changes()
+
+    def create_trans_row(self):
+        row = ctk.CTkFrame(self.list_frame, fg_color=UI_COLORS["surface"], corner_radius=14, height=64)
+        icon = ctk.CTkLabel(row, text="", font=("Arial", 20))
+        icon.pack(side="left", padx=20)
+        info = ctk.CTkFrame(row, fg_color="transparent")
+        info.pack(side="left", fill="x", expand=True)
+        desc = ctk.CTkLabel(info, text="", font=UI_FONTS["body_b"], text_color=UI_COLORS["text"])
+        desc.pack(anchor="w")
+        time = ctk.CTkLabel(info, text="", font=UI_FONTS["small"], text_color=UI_COLORS["muted"])
+        time.pack(anchor="w")
+        amount = ctk.CTkLabel(row, text="", font=UI_FONTS["amount"])
+        amount.pack(side="right", padx=20)
+        for widget in (row, icon, info, desc, time, amount):
+            self.bind_wheel(widget)
+        return row, icon, desc, time, amount
+
+    def fill_trans_row(self, widgets, t):
+        _, type_, amt, recip, time, desc = t
+        row, icon, desc_label, time_label, amount = widgets
+        color = UI_COLORS["success"] if type_ in ["DEPOSIT", "TRANSFER_IN"] else UI_COLORS["danger"]
+        icon.configure(text="⬇" if "IN" in type_ or "DEPOSIT" in type_ else "⬆", text_color=color)
+        desc_label.configure(text=desc if desc else type_)
+        time_label.configure(text=time)
+        amount.configure(text=f"₹{amt:,}", text_color=color)
+
+    def bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", lambda e: self.scroll_by(-1 if e.delta > 0 else 1), add="+")
+        widget.bind("<Button-4>", lambda e: self.scroll_by(-1), add="+")
+        widget.bind("<Button-5>", lambda e: self.scroll_by(1), add="+")
+
+    def fetch(self, before_id, query, types):
+        if not query and types is None: return self.controller.get_transaction_page(before_id, self.PAGE_SIZE)
+        # A query that does not end in a space may still be mid-word.
+        return self.controller.search_transactions(query, types, before_id, self.PAGE_SIZE,
+                                                   partial=not query.endswith(" "))
+
+    # Pages are fetched on the task pool, one at a time; a page that arrives
+    # after a new search was started belongs to the old results and is dropped.
+    def load_more(self):
+        if self.exhausted or self.loading: return
+        self.loading = True
+        generation = self.search_generation
+        self.app.tasks.submit(self.fetch, self.rows[-1][0] if self.rows else None, self.query, self.types,
+                              on_success=lambda page: self.append_page(generation, page),
+                              on_error=lambda e: self.page_failed(generation, e))
+
+    def append_page(self, generation, page):
+        if generation != self.search_generation or not self.winfo_exists(): return
+        self.loading = False
+        self.rows.extend(page)
+        if len(page) < self.PAGE_SIZE: self.exhausted = True
+        self.render()
+
+    def page_failed(self, generation, error):
+        if generation != self.search_generation or not self.winfo_exists(): return
+        self.loading = False
+        self.app.show_toast(f"Could not load transactions: {error}", "error")
+
+    # Typing restarts the timer, so only the pause after the last key
+    # queries. Results run on the task pool and are dropped if a newer
+    # search was started in the meantime.
+    def on_search_changed(self, *_):
+        if self.search_job is not None: self.after_cancel(self.search_job)
+        self.search_job = self.after(self.SEARCH_DELAY_MS, self.run_search)
+
+    def run_search(self, force=False):
+        self.search_job = None
+        self.stale = False
+        query, types = self.search_entry.get().lstrip(), self.TYPE_FILTERS[self.type_menu.get()]
+        if (query, types) == (self.query, self.types) and not force: return
+        self.search_generation += 1
+        self.loading = True
+        generation = self.search_generation
+        self.app.tasks.submit(self.fetch, None, query, types,
+                              on_success=lambda page: self.show_results(generation, query, types, page),
+                              on_error=lambda e: self.search_failed(generation, e))
+
+    def search_failed(self, generation, error):
+        if generation != self.search_generation or not self.winfo_exists(): return
+        self.loading = False
+        self.render()
+        self.app.show_toast(f"Search failed: {error}", "error")
+
+    def show_results(self, generation, query, types, page):
+        if generation != self.search_generation or not self.winfo_exists(): return
+        self.query, self.types = query, types
+        self.rows, self.offset = list(page), 0
+        self.exhausted = len(page) < self.PAGE_SIZE
+        self.loading = False
+        self.render()
+
+    def destroy(self):
+        if self.search_job is not None: self.after_cancel(self.search_job)
+        self.controller.unwatch_account(self.watch)
+        super().destroy()
+
+    def on_resize(self, event):
+        visible = max(1, min(self.ROW_POOL, event.height // self.ROW_HEIGHT))
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
+
+    def on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.rows)))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self.visible if args[2] == "pages" else 1)
+            self.scroll_by(step)
+
+    def scroll_by(self, step):
+        self.scroll_to(self.offset + step)
+
+    def scroll_to(self, offset):
+        if offset + self.visible >= len(self.rows) - self.PREFETCH:
+            self.load_more()
+        offset = max(0, min(offset, len(self.rows) - self.visible))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def render(self):
+        if self.rows:
+            self.empty.pack_forget()
+        else:
+            searching = self.query.strip() or self.types is not None
+            if self.loading:
+                title, hint = "Loading transactions…", ""
+            elif searching:
+                title, hint = "No matching transactions", "Try fewer words or another type."
+            else:
+                title, hint = "No transactions yet", "Your deposits, withdrawals and transfers will appear here."
+            self.empty_title.configure(text=title)
+            self.empty_hint.configure(text=hint)
+            self.empty.pack(fill="x", pady=10, before=self.list_frame.master)
+        for i, widgets in enumerate(self.pool):
+            index = self.offset + i
+            if i < self.visible and index < len(self.rows):
+                self.fill_trans_row(widgets, self.rows[index])
+                widgets[0].grid(row=i, column=0, sticky="ew", pady=5)
+            else:
+                widgets[0].grid_remove()
+        self.list_frame.grid_columnconfigure(0, weight=1)
+        total = max(len(self.rows), 1)
+        self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible) / total))
+
+    def export_csv(self):
+        if self.export_cancel is not None:
+            self.export_cancel.set()
+            return
+        ExportDialog(self.app, self.start_export)
+
+    def start_export(self, filename, start_date, end_date, types, compress):
+        self.export_cancel = threading.Event()
+        state = {"done": 0, "total": 0}
+        task = self.app.tasks.submit(self.controller.export_history_csv, filename, start_date, end_date, types, compress,
+                                progress=lambda done, total: state.update(done=done, total=total),
+                                cancel=self.export_cancel, on_success=self.finish_export,
+                                on_error=lambda e: self.finish_export((False, str(e))))
+        self.export_button.configure(text="✖ Cancel Export")
+        self.export_progress.set(0)
+        self.export_progress.pack(side="right", padx=12)
+
+        # The worker only writes into `state`; the bar is updated from Tk.
+        def poll():
+            if task.finished or not self.winfo_exists(): return
+            if state["total"]:
+                self.export_progress.set(state["done"] / state["total"])
+            self.after(100, poll)
+
+        self.after(100, poll)
+
+    def finish_export(self, result):
+        success, msg = result
+        if self.winfo_exists():
+            self.export_cancel = None
+            self.export_progress.pack_forget()
+            self.export_button.configure(text="📥 Export CSV")
+        self.app.show_toast(msg, "success" if success else "error")
+
+# Built once and cached like the other screens; the report and insights are
+# only queried again when the watcher has seen new transactions since the
+# last visit.
+class AnalyticsFrame(ctk.CTkScrollableFrame):
+    def __init__(self, master):
+        super().__init__(master, fg_color="transparent")
+        self.app = master
+        self.controller = master.controller
+        ctk.CTkLabel(self, text="Financial Insights", font=UI_FONTS["h1"], text_color=UI_COLORS["text"]).pack(anchor="w", pady=(0, 16))
+        self.report_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.report_frame.pack(fill="x")
+        ctk.CTkLabel(self.report_frame, text="Loading report…", font=UI_FONTS["small"], text_color=UI_COLORS["muted"]).pack(anchor="w", padx=20)
+        self.insights_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.insights_frame.pack(fill="x", padx=20)
+        if self.controller.insights.available:
+            ctk.CTkLabel(self.insights_frame, text="Loading insights…", font=UI_FONTS["small"], text_color=UI_COLORS["muted"]).pack(anchor="w")
+        self.stale = False
+        self.load()
+        self.watch = self.controller.watch_account(self.on_account_changed)
+
+    def destroy(self):
+        self.controller.unwatch_account(self.watch)
+        super().destroy()
+
+    def on_account_changed(self, change):
+        if not change["transactions"]: return
+        if self.winfo_exists() and self.winfo_ismapped(): self.load()
+        else: self.stale = True
+
+    def on_show(self):
+        if self.stale: self.load()
+        self.app.check_changes()
+
+    def load(self):
+        self.stale = False
+        self.app.tasks.submit(self.controller.get_analytics_report, on_success=self.render_report,
+                              on_error=lambda e: self.app.show_toast(str(e), "error"))
+        if self.controller.insights.available:
+            self.app.tasks.submit(self.controller.get_insights, on_success=self.render_insights,
+                                  on_error=lambda e: self.app.show_toast(str(e), "error"))
+
+    def render_report(self, data):
+        if not self.winfo_exists(): return
+        for child in self.report_frame.winfo_children():
+            child.destroy()
+        income, expense = data['income'], abs(data['expense'])
+        total = income + expense if (income + expense) > 0 else 1
+        
+        container = ctk.CTkFrame(self.report_frame, fg_color=UI_COLORS["surface"], corner_radius=20)
+        container.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        for label, val, col in [("Total Income", income, "#10b981"), ("Total Expenses", expense, "#ef4444")]:
+            ctk.CTkLabel(container, text=label, text_color=col, font=UI_FONTS["small_b"]).pack(anchor="w", padx=20, pady=(20, 6))
+            bar = ctk.CTkProgressBar(container, progress_color=col, height=20)
+            bar.pack(fill="x", padx=20)
+            bar.set(val / total)
+            ctk.CTkLabel(container, text=f"₹{val:,}", font=ctk.CTkFont(size=16, weight="bold"), text_color=UI_COLORS["text"]).pack(anchor="w", padx=20, pady=(8, 0))
+
+        trends = data["months"]
+        trend_frame = ctk.CTkFrame(self.report_frame, fg_color=UI_COLORS["surface"], corner_radius=20)
+        trend_frame.pack(fill="x", padx=20, pady=(0, 20))
+        ctk.CTkLabel(trend_frame, text="Monthly Trend", font=UI_FONTS["h4"], text_color=UI_COLORS["text"]).pack(anchor="w", padx=20, pady=(18, 8))
+        peak = max([max(m["income"], m["expense"]) for m in trends] + [1])
+        for month in trends:
+            row = ctk.CTkFrame(trend_frame, fg_color="transparent")
+            row.pack(fill="x", padx=20, pady=4)
+            row.grid_columnconfigure((1, 2), weight=1)
+            ctk.CTkLabel(row, text=month["month"], width=70, anchor="w", font=UI_FONTS["small_b"], text_color=UI_COLORS["muted"]).grid(row=0, column=0, rowspan=2)
+            for column, key, col in [(1, "income", "#10b981"), (2, "expense", "#ef4444")]:
+                bar = ctk.CTkProgressBar(row, progress_color=col, height=10)
+                bar.grid(row=0, column=column, sticky="ew", padx=8)
+                bar.set(month[key] / peak)
+                ctk.CTkLabel(row, text=f"₹{month[key]:,}", font=UI_FONTS["small"], text_color=UI_COLORS["muted"]).grid(row=1, column=column, sticky="w", padx=8)
+
+    def section(self, title):
+        frame = ctk.CTkFrame(self.insights_frame, fg_color=UI_COLORS["surface"], corner_radius=20)
+        frame.pack(fill="x", pady=(0, 20))
+        ctk.CTkLabel(frame, text=title, font=UI_FONTS["h4"], text_color=UI_COLORS["text"]).pack(anchor="w", padx=20, pady=(18, 8))
+        return frame
+
+    def render_insights(self, insights):
+        if not self.winfo_exists() or insights is None: return
+        for child in self.insights_frame.winfo_children():
+            child.destroy()
+
+        curve = insights["balance_curve"]
+        frame = self.section("Balance Over Time")
+        if len(curve) > 1:
+            canvas = ctk.CTkCanvas(frame, height=140, highlightthickness=0, bg=frame._apply_appearance_mode(UI_COLORS["surface"]))
+            canvas.pack(fill="x", padx=20, pady=(0, 8))
+            low, high = min(b for _, b in curve), max(b for _, b in curve)
+
+            def draw(event):
+                canvas.delete("all")
+                span = (high - low) or 1
+                points = []
+                for i, (_, balance) in enumerate(curve):
+                    points += [4 + i * (event.width - 8) / (len(curve) - 1), 132 - (balance - low) * 124 / span]
+                canvas.create_line(*points, fill=UI_COLORS["success"], width=2, smooth=True)
+            canvas.bind("<Configure>", draw)
+            ctk.CTkLabel(frame, text=f"{curve[0][0][:10]} → {curve[-1][0][:10]}   low ₹{low:,}   high ₹{high:,}",
+                         font=UI_FONTS["small"], text_color=UI_COLORS["muted"]).pack(anchor="w", padx=20, pady=(0, 16))
+        else:
+            ctk.CTkLabel(frame, text="Not enough activity yet", font=UI_FONTS["small"], text_color=UI_COLORS["muted"]).pack(anchor="w", padx=20, pady=(0, 16))
+
+        frame = self.section("Weekly Net (3-week average)")
+        for week in insights["weekly"][-8:]:
+            color = UI_COLORS["success"] if week["net"] >= 0 else UI_COLORS["danger"]
+            row = ctk.CTkFrame(frame, fg_color="transparent")
+            row.pack(fill="x", padx=20, pady=2)
+            ctk.CTkLabel(row, text=week["period"], width=90, anchor="w", font=UI_FONTS["small_b"], text_color=UI_COLORS["muted"]).pack(side="left")
+            ctk.CTkLabel(row, text=f"₹{week['net']:+,}", font=UI_FONTS["small_b"], text_color=color).pack(side="left", padx=8)
+            ctk.CTkLabel(row, text=f"avg ₹{week['rolling_net']:+,.0f}", font=UI_FONTS["small"], text_color=UI_COLORS["muted"]).pack(side="right")
+        ctk.CTkFrame(frame, fg_color="transparent", height=12).pack()
+
+        frame = self.section("Top Counterparties")
+        for party in insights["top_counterparties"] or [None]:
+            row = ctk.CTkFrame(frame, fg_color="transparent")
+            row.pack(fill="x", padx=20, pady=3)
+            if party is None:
+                ctk.CTkLabel(row, text="No transfers yet", font=UI_FONTS["small"], text_color=UI_COLORS["muted"]).pack(anchor="w")
+                continue
+            ctk.CTkLabel(row, text=f"{party['name']}  ·  {party['account_number']}", font=UI_FONTS["small_b"], text_color=UI_COLORS["text"]).pack(side="left")
+            ctk.CTkLabel(row, text=f"sent ₹{party['sent']:,}  received ₹{party['received']:,}  ({party['count']})",
+                         font=UI_FONTS["small"], text_color=UI_COLORS["muted"]).pack(side="right")
+        ctk.CTkFrame(frame, fg_color="transparent", height=12).pack()
+
+        frame = self.section("Largest Movements")
+        for move in insights["largest_movements"]:
+            color = "#10b981" if move["type"] in ["DEPOSIT", "TRANSFER_IN"] else "#ef4444"
+            row = ctk.CTkFrame(frame, fg_color="transparent")
+            row.pack(fill="x", padx=20, pady=3)
+            ctk.CTkLabel(row, text=move["type"].replace("_", " "), font=UI_FONTS["small_b"], text_color=UI_COLORS["text"]).pack(side="left")
+            ctk.CTkLabel(row, text=move["timestamp"][:10], font=UI_FONTS["small"], text_color=UI_COLORS["muted"]).pack(side="left", padx=12)
+            ctk.CTkLabel(row, text=f"₹{move['amount']:,}", font=UI_FONTS["small_b"], text_color=color).pack(side="right")
+        ctk.CTkFrame(frame, fg_color="transparent", height=12).pack()
+
+
+class SettingsFrame(ctk.CTkFrame):
+    def __init__(self, master):
+        super().__init__(master, fg_color="transparent")
+        ctk.CTkLabel(self, text="Settings", font=UI_FONTS["h1"], text_color=UI_COLORS["text"]).pack(anchor="w", pady=(0, 16))
+        
+        theme_frame = ctk.CTkFrame(self, fg_color=UI_COLORS["surface"], corner_radius=16)
+        theme_frame.pack(fill="x", pady=10, ipady=10)
+        ctk.CTkLabel(theme_frame, text="Dark Mode", font=UI_FONTS["body_b"], text_color=UI_COLORS["text"]).pack(side="left", padx=20)
+        self.switch = ctk.CTkSwitch(theme_frame, text="", command=self.toggle_theme)
+        if ctk.get_appearance_mode() == "Dark": self.switch.select()
+        self.switch.pack(side="right", padx=20)
+        
+        pin_frame = ctk.CTkFrame(self, fg_color=UI_COLORS["surface"], corner_radius=16)
+        pin_frame.pack(fill="x", pady=10, ipady=20)
+        ctk.CTkLabel(pin_frame, text="Change PIN", font=UI_FONTS["body_b"], text_color=UI_COLORS["text"]).pack(anchor="w", padx=20, pady=(14, 10))
+        
+        self.old = create_styled_entry(pin_frame, "Old PIN", show="●", width=300)
+        self.old.pack(pady=5)
+        self.new = create_styled_entry(pin_frame, "New PIN", show="●", width=300)
+        self.new.pack(pady=5)
+        self.update_button = AnimatedButton(pin_frame, text="Update", command=self.update_pin, fg_color=UI_COLORS["warning"], hover_color=UI_COLORS["warning_hover"], height=40)
+        self.update_button.pack(pady=(12, 0))
+
+    # A cached screen must not keep a typed PIN around between visits.
+    def on_show(self):
+        self.old.delete(0, "end")
+        self.new.delete(0, "end")
+
+    def toggle_theme(self): ctk.set_appearance_mode("Dark" if self.switch.get() else "Light")
+    def update_pin(self):
+        self.master.tasks.submit(self.master.controller.change_pin, self.old.get(), self.new.get(),
+                                 on_success=self.on_pin_changed,
+                                 on_error=lambda e: self.master.show_toast(str(e), "error"),
+                                 timeout=POST_TIMEOUT, busy=(self.update_button,))
+
+    def on_pin_changed(self, result):
+        success, msg = result
+        self.master.show_toast(msg, "success" if success else "error")
+        if success and self.winfo_exists(): self.on_show()
+
+
+def run(db_name="bank.db", **db_options):
+    ctk.set_appearance_mode("Dark")
+    ctk.set_default_color_theme("blue")
+    app = BankApp(db_name, **db_options)
+    app.mainloop()
@@ -0,0 +1,204 @@
+import functools
+import json
+import os
+import re
+import threading
+import time
+import weakref
+from collections import deque
+
+# Upper bounds (ms) of the latency histogram buckets; the last is +Inf.
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+MAX_TRACED_STATEMENTS = 20
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")  # traced SQL has parameters inlined; hide PINs, names
+
+
+class MethodStats:
+    __slots__ = ("count", "errors", "rows", "total_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.count = self.errors = self.rows = 0
+        self.total_ms = self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def quantile(self, q):
+        if not self.count: return 0.0
+        rank, seen = q * self.count, 0
+        for bound, n in zip(BUCKETS_MS + (self.max_ms,), self.buckets):
+            seen += n
+            if seen >= rank: return min(bound, self.max_ms)
+        return self.max_ms
+
+
+# Per-method latency histograms, call counts, rows returned and a log of slow
+# calls with the SQL they ran. Methods opt in with @instrumented. While
+# disabled the wrapper is one attribute check; statement tracing is only
+# installed on connections while enabled. Each open database's commit
+# counters (CommitMetrics, always on) are reported alongside.
+class Metrics:
+    def __init__(self, slow_ms=100.0, slow_log_size=200):
+        self.enabled = False
+        self.slow_ms = slow_ms
+        self.thresholds = {}  # per-method slow thresholds overriding slow_ms
+        self.slow_log = deque(maxlen=slow_log_size)
+        self.slow_count = 0
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pools = weakref.WeakSet()
+        self._commits = weakref.WeakKeyDictionary()  # CommitMetrics -> database name
+
+    def enable(self, slow_ms=None, thresholds=None):
+        if slow_ms is not None: self.slow_ms = slow_ms
+        if thresholds: self.thresholds.update(thresholds)
+        self.enabled = True
+        for pool in list(self._pools):
+            pool.set_trace(self.trace)
+
+    def disable(self):
+        self.enabled = False
+        for pool in list(self._pools):
+            pool.set_trace(None)
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+            self.slow_log.clear()
+            self.slow_count = 0
+
+    def register_pool(self, pool):
+        self._pools.add(pool)
+        if self.enabled: pool.set_trace(self.trace)
+
+    def register_commits(self, name, commit_metrics):
+        self._commits[commit_metrics] = name
+
+    def commit_snapshots(self):
+        return {name: commit_metrics.snapshot() for commit_metrics, name in sorted(
+            list(self._commits.items()), key=lambda item: item[1])}
+
+    # sqlite3 trace callback: remembers statements run inside instrumented calls.
+    def trace(self, statement):
+        for buffer in getattr(self._local, "active", ()):
+            if len(buffer) < MAX_TRACED_STATEMENTS: buffer.append(STRING_LITERAL.sub("'?'", " ".join(statement.split())))
+
+    def record(self, name, elapsed_ms, rows, failed, statements):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None: stats = self._stats[name] = MethodStats()
+            stats.count += 1
+            stats.errors += failed
+            stats.rows += rows
+            stats.total_ms += elapsed_ms
+            if elapsed_ms > stats.max_ms: stats.max_ms = elapsed_ms
+            i = 0
+            while i < len(BUCKETS_MS) and elapsed_ms > BUCKETS_MS[i]: i += 1
+            stats.buckets[i] += 1
+            if elapsed_ms >= self.thresholds.get(name, self.slow_ms):
+                self.slow_count += 1
+                self.slow_log.append({"method": name, "ms": round(elapsed_ms, 3),
+                                      "at": time.strftime("%Y-%m-%d %H:%M:%S"), "statements": statements})
+
+    def call(self, name, fn, args, kwargs):
+        active = getattr(self._local, "active", None)
+        if active is None: active = self._local.active = []
+        statements = []
+        active.append(statements)
+        failed, result = 1, None
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+            failed = 0
+            return result
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            active.pop()
+            self.record(name, elapsed_ms, len(result) if isinstance(result, list) else 0, failed, statements)
+
+    def snapshot(self):
+        with self._lock:
+            methods = {}
+            for name, s in sorted(self._stats.items()):
+                methods[name] = {
+                    "count": s.count, "errors": s.errors, "rows": s.rows,
+                    "total_ms": round(s.total_ms, 3), "mean_ms": round(s.total_ms / s.count, 3) if s.count else 0,
+                    "p50_ms": round(s.quantile(0.5), 3), "p95_ms": round(s.quantile(0.95), 3),
+                    "p99_ms": round(s.quantile(0.99), 3),
+                    "max_ms": round(s.max_ms, 3),
+                    "buckets": dict(zip([str(b) for b in BUCKETS_MS] + ["+Inf"], s.buckets)),
+                }
+            return {"enabled": self.enabled, "slow_ms": self.slow_ms, "slow_count": self.slow_count,
+                    "methods": methods, "slow_log": list(self.slow_log), "commits": self.commit_snapshots()}
+
+    def prometheus(self):
+        lines = [
+            "# HELP securebank_method_duration_seconds Latency of instrumented backend methods.",
+            "# TYPE securebank_method_duration_seconds histogram",
+        ]
+        with self._lock:
+            stats = sorted(self._stats.items())
+            for name, s in stats:
+                cumulative = 0
+                for bound, n in zip([str(b / 1000) for b in BUCKETS_MS] + ["+Inf"], s.buckets):
+                    cumulative += n
+                    lines.append(f'securebank_method_duration_seconds_bucket{{method="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'securebank_method_duration_seconds_sum{{method="{name}"}} {s.total_ms / 1000:.6f}')
+                lines.append(f'securebank_method_duration_seconds_count{{method="{name}"}} {s.count}')
+            for metric, help_text, attr in (("errors", "Calls that raised.", "errors"),
+                                            ("rows", "Rows returned by list-returning methods.", "rows")):
+                lines.append(f"# HELP securebank_method_{metric}_total {help_text}")
+                lines.append(f"# TYPE securebank_method_{metric}_total counter")
+                lines.extend(f'securebank_method_{metric}_total{{method="{name}"}} {getattr(s, attr)}' for name, s in stats)
+            lines += ["# HELP securebank_slow_calls_total Calls slower than their threshold.",
+                      "# TYPE securebank_slow_calls_total counter", f"securebank_slow_calls_total {self.slow_count}"]
+        commits = [(name.replace("\\", "\\\\").replace('"', '\\"'), snapshot)
+                   for name, snapshot in self.commit_snapshots().items()]
+        for metric, help_text, key in (("commits", "Write transactions committed.", "commits"),
+                                       ("commit_operations", "Write operations in those transactions.", "operations")):
+            lines.append(f"# HELP securebank_{metric}_total {help_text}")
+            lines.append(f"# TYPE securebank_{metric}_total counter")
+            lines.extend(f'securebank_{metric}_total{{db="{name}"}} {snapshot[key]}' for name, snapshot in commits)
+        lines += ["# HELP securebank_commit_latency_seconds Commit latency over the recent commits.",
+                  "# TYPE securebank_commit_latency_seconds gauge"]
+        for name, snapshot in commits:
+            for quantile, key in (("0.5", "p50"), ("0.99", "p99"), ("1", "max")):
+                lines.append(f'securebank_commit_latency_seconds{{db="{name}",quantile="{quantile}"}} '
+                             f'{snapshot["latency_ms"][key] / 1000:.6f}')
+        return "\n".join(lines) + "\n"
+
+    # Written to a temporary file and renamed, so a scraper never reads half a file.
+    def write(self, path):
+        text = json.dumps(self.snapshot(), indent=2) if path.lower().endswith(".json") else self.prometheus()
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    # Rewrites path every `interval` seconds on a daemon thread; call the
+    # returned function to stop (it writes one last time).
+    def export_periodically(self, path, interval=15):
+        stop = threading.Event()
+
+        def loop():
+            while not stop.wait(interval):
+                self.write(path)
+        threading.Thread(target=loop, name="securebank-metrics", daemon=True).start()
+
+        def finish():
+            stop.set()
+            self.write(path)
+        return finish
+
+
+METRICS = Metrics()
+if os.environ.get("SECUREBANK_METRICS", "") not in ("", "0"): METRICS.enabled = True
+
+
+def instrumented(fn):
+    name = fn.__qualname__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not METRICS.enabled: return fn(*args, **kwargs)
+        return METRICS.call(name, fn, args, kwargs)
+    return wrapper
@@ -0,0 +1,155 @@
+import calendar
+import time
+from datetime import datetime, timedelta, timezone
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY")
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"  # as CURRENT_TIMESTAMP writes it, in UTC
+LOOKUP_BATCH = 500  # stay under SQLITE_MAX_VARIABLE_NUMBER on old builds
+
+
+def utc_now():
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+# Accepts a datetime or "YYYY-MM-DD[ HH:MM[:SS]]" (UTC); raises ValueError.
+def parse_time(value):
+    if isinstance(value, datetime): return value.replace(microsecond=0)
+    value = str(value or "").strip().replace("T", " ")
+    for fmt in (TIME_FORMAT, "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid date '{value}'")
+
+
+# The n-th run of a standing order, counted from its first run so monthly
+# orders keep their day (clamped to short months) instead of drifting.
+def occurrence(start, frequency, n):
+    if frequency == "DAILY": return start + timedelta(days=n)
+    if frequency == "WEEKLY": return start + timedelta(weeks=n)
+    month = start.month - 1 + n
+    year, month = start.year + month // 12, month % 12 + 1
+    return start.replace(year=year, month=month, day=min(start.day, calendar.monthrange(year, month)[1]))
+
+
+# Executes due scheduled_transfers rows. Due rows come off the
+# (status, next_run_at) index a batch at a time and each batch is posted in
+# one write transaction, simulating balances in memory the way BatchPoster
+# does. Every attempt leaves a scheduled_runs row stamped with the due time
+# of its occurrence. A payment that finds too little money is retried after
+# retry_delay seconds, up to max_attempts times per occurrence, but never
+# past the next occurrence's due time; a missing account ends the order.
+# Paid or failed, an occurrence counts against `remaining`. Occurrences that
+# fell due before `now` while one was pending are logged FAILED as missed
+# rather than paid twice over. The clock is read once per run and every
+# processed row moves to a later occurrence or past it, which bounds the
+# run; pass clock= to simulate time.
+class TransferScheduler:
+    COLUMNS = ("id, user_id, recipient_account, amount, description, frequency, start_at, occurrence, "
+               "remaining, next_run_at, attempts")
+
+    def __init__(self, db, batch_size=1000, max_attempts=3, retry_delay=3600, clock=None):
+        self.db = db
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.clock = clock or utc_now
+
+    def _load_accounts(self, cur, column, keys):
+        keys = list(keys)
+        for i in range(0, len(keys), LOOKUP_BATCH):
+            batch = keys[i:i + LOOKUP_BATCH]
+            yield from cur.execute(f"SELECT id, account_number, name, balance FROM users WHERE {column} IN "
+                                   f"({','.join('?' * len(batch))})", batch)
+
+    # Returns (schedule_id, status, message) for each row processed; empty
+    # once nothing is due at `now`.
+    def apply_batch(self, now):
+        stamp = now.strftime(TIME_FORMAT)
+        results = []
+        with self.db.write_transaction() as cur:
+            due = cur.execute(f"""
+                SELECT {self.COLUMNS} FROM scheduled_transfers
+                WHERE status = 'ACTIVE' AND next_run_at <= ?
+                ORDER BY next_run_at, id LIMIT ?
+            """, (stamp, self.batch_size)).fetchall()
+            if not due: return results
+            accounts, by_number = {}, {}
+            for user_id, number, name, balance in [*self._load_accounts(cur, "id", {r[1] for r in due}),
+                                                   *self._load_accounts(cur, "account_number", {r[2] for r in due})]:
+                accounts[user_id] = [number, name, balance]
+                by_number[number] = user_id
+            deltas, ledger, updates, runs = {}, [], [], []
+            for (schedule_id, user_id, to_account, amount, description, frequency, start_at, n, remaining,
+                 next_run_at, attempts) in due:
+                sender, recipient_id = accounts.get(user_id), by_number.get(to_account)
+                if sender is None or recipient_id is None or recipient_id == user_id:
+                    status, message, paid = "FAILED", "Account not found", False
+                elif sender[2] < amount:
+                    status, message, paid = "FAILED", "Insufficient balance", False
+                else:
+                    recipient = accounts[recipient_id]
+                    sender[2] -= amount
+                    recipient[2] += amount
+                    deltas[user_id] = deltas.get(user_id, 0) - amount
+                    deltas[recipient_id] = deltas.get(recipient_id, 0) + amount
+                    ledger.append((user_id, "TRANSFER_OUT", amount, to_account, description or f"Transfer to {recipient[1]}"))
+                    ledger.append((recipient_id, "TRANSFER_IN", amount, sender[0], description or f"Transfer from {sender[1]}"))
+                    status, message, paid = "POSTED", f"New balance: {sender[2]}", True
+
+                start = datetime.strptime(start_at, TIME_FORMAT)
+                next_due = occurrence(start, frequency, n + 1) if frequency else None
+                retry_at = now + timedelta(seconds=self.retry_delay)
+                if next_due is not None: retry_at = min(retry_at, next_due)
+                if message == "Insufficient balance" and attempts + 1 < self.max_attempts and retry_at > now:
+                    status = "RETRY"
+                    updates.append(("ACTIVE", n, remaining, retry_at.strftime(TIME_FORMAT), attempts + 1, schedule_id))
+                elif message == "Account not found":
+                    updates.append(("FAILED", n, remaining, next_run_at, attempts, schedule_id))
+                due_at = occurrence(start, frequency, n) if frequency else start
+                runs.append((schedule_id, due_at.strftime(TIME_FORMAT), stamp, status, message))
+                results.append((schedule_id, status, message))
+                if status == "RETRY" or message == "Account not found": continue
+
+                # The occurrence is settled either way; occurrences that fell
+                # due before `now` meanwhile are recorded as missed.
+                if remaining is not None: remaining -= 1
+                while frequency and remaining != 0 and next_due < now:
+                    runs.append((schedule_id, next_due.strftime(TIME_FORMAT), stamp, "FAILED", "Missed occurrence"))
+                    results.append((schedule_id, "FAILED", "Missed occurrence"))
+                    if remaining is not None: remaining -= 1
+                    n, paid = n + 1, False
+                    next_due = occurrence(start, frequency, n + 1)
+                if frequency is None or remaining == 0:
+                    updates.append(("DONE" if paid else "FAILED", n, remaining, next_run_at, 0, schedule_id))
+                else:
+                    updates.append(("ACTIVE", n + 1, remaining, next_due.strftime(TIME_FORMAT), 0, schedule_id))
+            cur.executemany("UPDATE users SET balance = balance + ? WHERE id = ?",
+                            [(delta, user_id) for user_id, delta in deltas.items() if delta])
+            cur.executemany("""
+                INSERT INTO transactions (user_id, type, amount, recipient_account, description)
+                VALUES (?, ?, ?, ?, ?)
+            """, ledger)
+            cur.executemany("""
+                UPDATE scheduled_transfers SET status = ?, occurrence = ?, remaining = ?, next_run_at = ?, attempts = ?
+                WHERE id = ?
+            """, updates)
+            cur.executemany("""
+                INSERT INTO scheduled_runs (schedule_id, due_at, run_at, status, message) VALUES (?, ?, ?, ?, ?)
+            """, runs)
+        return results
+
+    def run(self):
+        start = time.perf_counter()
+        now = self.clock()
+        summary = {"posted": 0, "retry": 0, "failed": 0, "batches": 0}
+        while True:
+            results = self.apply_batch(now)
+            if not results: break
+            summary["batches"] += 1
+            for _, status, _ in results:
+                summary[status.lower()] += 1
+        summary["now"] = now.strftime(TIME_FORMAT)
+        summary["seconds"] = round(time.perf_counter() - start, 3)
+        return summary
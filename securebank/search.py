@@ -0,0 +1,78 @@
+import re
+import unicodedata
+from datetime import date, timedelta
+
+MONTHS = {name: i for i, names in enumerate((
+    ("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"), ("may",), ("jun", "june"),
+    ("jul", "july"), ("aug", "august"), ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"),
+    ("dec", "december")), start=1) for name in names}
+AMOUNT = r"₹?(\d[\d,]*)"
+WORD = re.compile(r"[^\W_]+")
+
+
+def fold(text):
+    if text.isascii(): return text.lower()
+    return "".join(c for c in unicodedata.normalize("NFKD", text.casefold()) if not unicodedata.combining(c))
+
+
+# The FTS5 index's notion of a match (unicode61: words are runs of letters
+# and digits, compared without case or accents), for the rows searched
+# without it; registered on every connection as search_word(). With prefix,
+# `word` may be the start of a word, as the search box's last word is.
+def has_word(text, word, prefix=False):
+    if text is None or not word: return 0
+    word, text = fold(word), fold(str(text))
+    if word not in text: return 0
+    return int(any(w == word or prefix and w.startswith(word) for w in WORD.findall(text)))
+
+
+def month_range(year, month):
+    last = (date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)).day
+    return f"{year:04d}-{month:02d}-01", f"{year:04d}-{month:02d}-{last:02d}"
+
+
+# Splits a search box query into free text and filters, so "Transfer to Ravi
+# last March" becomes text "Transfer to Ravi" in March's date range.
+# Understood: >500, >=500, <2,000, <=2000, 500-2000 (amounts); 2025-03-14,
+# 2025-03 (dates); month names with an optional year ("last" picks the
+# previous occurrence); today and yesterday. Everything else is text.
+def parse_query(query, today=None):
+    today = today or date.today()
+    filters = {"text": None, "min_amount": None, "max_amount": None, "start_date": None, "end_date": None}
+    words, text = (query or "").split(), []
+    i = 0
+    while i < len(words):
+        word, lower = words[i], words[i].lower().rstrip(",.")
+        nxt = words[i + 1].lower().rstrip(",.") if i + 1 < len(words) else ""
+        if lower in ("last", "in") and nxt in MONTHS:
+            i += 1
+            word, lower = words[i], nxt
+        if lower in MONTHS:
+            month = MONTHS[lower]
+            if re.fullmatch(r"\d{4}", words[i + 1] if i + 1 < len(words) else ""):
+                i += 1
+                year = int(words[i])
+            else:
+                previous = i > 0 and words[i - 1].lower() == "last"
+                year = today.year if month < today.month or (month == today.month and not previous) else today.year - 1
+            filters["start_date"], filters["end_date"] = month_range(year, month)
+        elif lower in ("today", "yesterday"):
+            day = (today if lower == "today" else today - timedelta(days=1)).isoformat()
+            filters["start_date"] = filters["end_date"] = day
+        elif re.fullmatch(r"\d{4}-\d{2}-\d{2}", lower):
+            filters["start_date"] = filters["end_date"] = lower
+        elif re.fullmatch(r"\d{4}-\d{2}", lower) and 1 <= int(lower[5:]) <= 12:
+            filters["start_date"], filters["end_date"] = month_range(int(lower[:4]), int(lower[5:]))
+        elif m := re.fullmatch(f"(>=?|<=?){AMOUNT}", lower):
+            amount = int(m.group(2).replace(",", ""))
+            if m.group(1) == ">": filters["min_amount"] = amount + 1
+            elif m.group(1) == ">=": filters["min_amount"] = amount
+            elif m.group(1) == "<": filters["max_amount"] = amount - 1
+            else: filters["max_amount"] = amount
+        elif m := re.fullmatch(f"{AMOUNT}-{AMOUNT}", lower):
+            filters["min_amount"], filters["max_amount"] = sorted(int(g.replace(",", "")) for g in m.groups())
+        else:
+            text.append(word)
+        i += 1
+    filters["text"] = " ".join(text) or None
+    return filters
@@ -0,0 +1,440 @@
+import asyncio
+import ipaddress
+import json
+import os
+import signal
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from .controller import BankController, extract_account_number
+from .metrics import METRICS
+
+MAX_BODY = 1 << 20
+PIPELINE_DEPTH = 16  # responses a single connection may have outstanding
+CHUNK_SIZE = 64 * 1024
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 431: "Request Header Fields Too Large",
+           500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Request:
+    __slots__ = ("method", "path", "query", "headers", "body", "keep_alive")
+
+    def __init__(self, method, target, version, headers, body):
+        url = urlsplit(target)
+        self.method, self.path, self.headers, self.body = method, url.path.rstrip("/") or "/", headers, body
+        self.query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        connection = headers.get("connection", "").lower()
+        self.keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+    def json(self):
+        if not self.body: return {}
+        try:
+            data = json.loads(self.body)
+        except ValueError:
+            raise HTTPError(400, "Body must be JSON")
+        if not isinstance(data, dict): raise HTTPError(400, "Body must be a JSON object")
+        return data
+
+    @property
+    def token(self):
+        scheme, _, token = self.headers.get("authorization", "").partition(" ")
+        return token.strip() if scheme.lower() == "bearer" and token.strip() else None
+
+
+def json_response(status, payload):
+    return status, "application/json", json.dumps(payload).encode()
+
+
+def outcome(result):
+    success, message = result
+    return json_response(200 if success else 400, {"ok": success, "message": message})
+
+
+# Minimal HTTP/1.1 front end for BankController, for kiosks, scripts and load
+# tests on the same machine. The event loop only parses and writes; every
+# controller call runs on a bounded thread pool. Requests pipelined on one
+# connection are started as soon as they are read and answered in order;
+# writes run one after another in the order sent, reads concurrently with
+# each other but after the writes sent before them.
+class BankServer:
+    def __init__(self, controller, host="127.0.0.1", port=8080, max_workers=8, max_pending=256):
+        if host != "localhost" and not ipaddress.ip_address(host).is_loopback:
+            raise ValueError("The API server only listens on loopback addresses")
+        self.controller = controller
+        self.host, self.port = host, port
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="securebank-api")
+        self.slots = None
+        self.max_pending = max_pending
+        self.server = None
+        self.closing = False
+        self.connections = set()
+        self.inflight = 0
+        self.unsent = 0
+        self.routes = {
+            ("POST", "/signup"): self.sign_up,
+            ("POST", "/sessions"): self.sign_in,
+            ("DELETE", "/sessions"): self.sign_out,
+            ("GET", "/account"): self.account,
+            ("POST", "/deposit"): self.deposit,
+            ("POST", "/withdraw"): self.withdraw,
+            ("POST", "/transfer"): self.transfer,
+            ("GET", "/history"): self.history,
+            ("GET", "/analytics"): self.analytics,
+            ("GET", "/insights"): self.insights,
+            ("GET", "/export"): self.export,
+            ("GET", "/search"): self.search,
+            ("GET", "/schedules"): self.schedules,
+            ("POST", "/schedules"): self.schedule,
+            ("DELETE", "/schedules"): self.cancel_schedule,
+            ("GET", "/metrics"): self.metrics,
+        }
+
+    async def call(self, fn, *args, **kwargs):
+        # The semaphore bounds queued work so a flood of requests waits here
+        # instead of piling up inside the executor.
+        async with self.slots:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, lambda: fn(*args, **kwargs))
+
+    def session(self, request):
+        token = request.token
+        if token is None or self.controller.sessions.get(token) is None:
+            raise HTTPError(401, "Missing or expired session token")
+        return token
+
+    async def sign_up(self, request):
+        data = request.json()
+        message = await self.call(self.controller.sign_up, str(data.get("name", "")).strip(), str(data.get("pin", "")))
+        account_number = extract_account_number(message)
+        return json_response(201 if account_number else 400,
+                             {"ok": bool(account_number), "account_number": account_number, "message": message})
+
+    async def sign_in(self, request):
+        data = request.json()
+        session, message = await self.call(self.controller.open_session, str(data.get("account_number", "")),
+                                           str(data.get("pin", "")))
+        if session is None: return json_response(401, {"ok": False, "message": message})
+        return json_response(201, {"ok": True, "token": session.token, "message": message,
+                                   "expires_after_idle": self.controller.sessions.idle_timeout})
+
+    async def sign_out(self, request):
+        return json_response(200, {"ok": self.controller.logout(self.session(request))})
+
+    async def account(self, request):
+        return json_response(200, await self.call(self.controller.get_account_info, token=self.session(request)))
+
+    async def deposit(self, request):
+        token = self.session(request)
+        return outcome(await self.call(self.controller.deposit, request.json().get("amount"), token=token))
+
+    async def withdraw(self, request):
+        token = self.session(request)
+        return outcome(await self.call(self.controller.withdraw, request.json().get("amount"), token=token))
+
+    async def transfer(self, request):
+        token, data = self.session(request), request.json()
+        return outcome(await self.call(self.controller.transfer, str(data.get("to_account", "")), data.get("amount"),
+                                       token=token))
+
+    @staticmethod
+    def integers(request, *names):
+        try:
+            return [int(request.query[name]) if name in request.query else None for name in names]
+        except ValueError:
+            raise HTTPError(400, f"{', '.join(names)} must be integers")
+
+    @staticmethod
+    def page(rows, limit):
+        keys = ("id", "type", "amount", "recipient_account", "timestamp", "description")
+        return json_response(200, {"transactions": [dict(zip(keys, row)) for row in rows],
+                                   "next_before_id": rows[-1][0] if len(rows) == limit else None})
+
+    async def history(self, request):
+        token = self.session(request)
+        before_id, limit = self.integers(request, "before_id", "limit")
+        limit = min(limit or 50, 500)
+        return self.page(await self.call(self.controller.get_transaction_page, before_id, limit, token=token), limit)
+
+    async def search(self, request):
+        token = self.session(request)
+        before_id, limit, min_amount, max_amount = self.integers(request, "before_id", "limit", "min_amount", "max_amount")
+        limit = min(limit or 50, 500)
+        types = [t for t in request.query.get("types", "").upper().split(",") if t] or None
+        rows = await self.call(self.controller.search_transactions, request.query.get("q", ""), types, before_id, limit,
+                               request.query.get("partial") in ("1", "true"), token=token,
+                               min_amount=min_amount, max_amount=max_amount,
+                               start_date=request.query.get("start"), end_date=request.query.get("end"))
+        return self.page(rows, limit)
+
+    async def schedules(self, request):
+        token = self.session(request)
+        keys = ("id", "to_account", "amount", "description", "frequency", "next_run_at", "remaining", "status", "attempts")
+        rows = await self.call(self.controller.get_scheduled_transfers, token=token)
+        return json_response(200, {"schedules": [dict(zip(keys, row)) for row in rows]})
+
+    async def schedule(self, request):
+        token, data = self.session(request), request.json()
+        return outcome(await self.call(self.controller.schedule_transfer, str(data.get("to_account", "")),
+                                       data.get("amount"), data.get("first_run_at"), data.get("frequency"),
+                                       data.get("count"), data.get("description"), token=token))
+
+    async def cancel_schedule(self, request):
+        token = self.session(request)
+        schedule_id, = self.integers(request, "id")
+        if schedule_id is None: raise HTTPError(400, "id is required")
+        return outcome(await self.call(self.controller.cancel_scheduled_transfer, schedule_id, token=token))
+
+    async def analytics(self, request):
+        token = self.session(request)
+        return json_response(200, await self.call(self.controller.get_analytics_report, token=token))
+
+    async def insights(self, request):
+        token = self.session(request)
+        try:
+            months, weeks = int(request.query.get("months", 12)), int(request.query.get("weeks", 12))
+        except ValueError:
+            raise HTTPError(400, "months and weeks must be integers")
+        insights = await self.call(self.controller.get_insights, min(months, 120), min(weeks, 520), token=token)
+        if insights is None: raise HTTPError(404, "Insights need numpy installed")
+        return json_response(200, insights)
+
+    # Prometheus scrape endpoint; ?format=json returns the full snapshot
+    # including the slow call log.
+    async def metrics(self, request):
+        if request.query.get("format") == "json": return json_response(200, METRICS.snapshot())
+        return 200, "text/plain; version=0.0.4", METRICS.prometheus().encode()
+
+    # Exports go to a temporary file on a worker thread and are then streamed
+    # back in chunks, so the response never sits in memory as a whole. If the
+    # request is abandoned (client gone, shutdown) while the export runs, the
+    # file is removed by whichever of the worker and this handler is last.
+    async def export(self, request):
+        token = self.session(request)
+        compress = request.query.get("gzip") in ("1", "true")
+        types = [t for t in request.query.get("types", "").upper().split(",") if t] or None
+        fd, path = tempfile.mkstemp(suffix=".csv.gz" if compress else ".csv")
+        os.close(fd)
+        cancel, lock, state = threading.Event(), threading.Lock(), {"started": False, "finished": False}
+
+        def run():
+            with lock:
+                if cancel.is_set(): return False, "Export cancelled"
+                state["started"] = True
+            try:
+                return self.controller.export_history_csv(path, request.query.get("start"), request.query.get("end"),
+                                                          types, compress, cancel=cancel, token=token)
+            finally:
+                with lock:
+                    state["finished"] = True
+                    abandoned = cancel.is_set()
+                if abandoned and os.path.exists(path): os.remove(path)
+
+        try:
+            success, message = await self.call(run)
+        except BaseException:
+            with lock:
+                cancel.set()
+                idle = not state["started"] or state["finished"]
+            if idle and os.path.exists(path): os.remove(path)
+            raise
+        if not success:
+            os.remove(path)
+            return json_response(400, {"ok": False, "message": message})
+        return 200, "application/gzip" if compress else "text/csv", path
+
+    async def respond(self, request, after=None):
+        self.inflight += 1
+        try:
+            if after is not None: await asyncio.wait([after])
+            handler = self.routes.get((request.method, request.path))
+            if handler is None:
+                known = any(path == request.path for _, path in self.routes)
+                raise HTTPError(405 if known else 404, "Method not allowed" if known else "Not found")
+            return await handler(request)
+        except HTTPError as e:
+            return json_response(e.status, {"ok": False, "message": str(e)})
+        except Exception as e:
+            return json_response(500, {"ok": False, "message": f"Internal error: {e}"})
+        finally:
+            self.inflight -= 1
+
+    # A line longer than the stream limit (64 KiB) cannot be resynchronised
+    # with, so it ends the connection with a 431.
+    async def read_line(self, reader):
+        try:
+            return await reader.readline()
+        except (ValueError, asyncio.LimitOverrunError):
+            raise HTTPError(431, "Request line or header too long")
+
+    async def read_request(self, reader):
+        line = await self.read_line(reader)
+        if not line.strip(): return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        headers = {}
+        while True:
+            line = await self.read_line(reader)
+            if line in (b"\r\n", b"\n", b""): break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length < 0: raise HTTPError(400, "Invalid Content-Length")
+        if length > MAX_BODY: raise HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return Request(method.upper(), target, version.upper(), headers, body)
+
+    async def write_response(self, writer, response, keep_alive):
+        status, content_type, body = response
+        loop = asyncio.get_running_loop()
+        is_file = isinstance(body, str)
+        try:
+            length = os.path.getsize(body) if is_file else len(body)
+            writer.write((f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                          f"Content-Type: {content_type}\r\nContent-Length: {length}\r\n"
+                          f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode("latin-1"))
+            if not is_file:
+                writer.write(body)
+                await writer.drain()
+                return
+            with open(body, "rb") as f:
+                while True:
+                    chunk = await loop.run_in_executor(self.executor, f.read, CHUNK_SIZE)
+                    if not chunk: break
+                    writer.write(chunk)
+                    await writer.drain()
+        finally:
+            if is_file: os.remove(body)
+
+    # For a response that will never be written because the client went
+    # away: the export file behind it is removed once the handler finishes.
+    def discard(self, task):
+        self.unsent -= 1
+
+        def remove(task):
+            if task.cancelled() or task.exception() is not None: return
+            body = task.result()[2]
+            if isinstance(body, str) and os.path.exists(body): os.remove(body)
+        task.add_done_callback(remove)
+
+    # Hands a response to the sender; False if the sender has stopped
+    # (the client is gone), so a full queue cannot block the reader forever.
+    async def enqueue(self, queue, item, sender):
+        if sender.done(): return False
+        if not queue.full():
+            queue.put_nowait(item)
+            return True
+        put = asyncio.ensure_future(queue.put(item))
+        await asyncio.wait([put, sender], return_when=asyncio.FIRST_COMPLETED)
+        if put.done(): return True
+        put.cancel()
+        return False
+
+    async def send_responses(self, queue, writer):
+        while True:
+            item = await queue.get()
+            if item is None: return
+            task, keep_alive = item
+            try:
+                response = await task
+            except BaseException:
+                self.discard(task)
+                raise
+            try:
+                await self.write_response(writer, response, keep_alive and not self.closing)
+            finally:
+                self.unsent -= 1
+
+    async def handle_connection(self, reader, writer):
+        responses = asyncio.Queue(maxsize=PIPELINE_DEPTH)
+        sender = asyncio.create_task(self.send_responses(responses, writer))
+        self.connections.add(asyncio.current_task())
+        last_write = None  # pipelined writes on one connection run in the order they were sent
+        try:
+            while not self.closing:
+                try:
+                    request = await self.read_request(reader)
+                except HTTPError as e:
+                    self.unsent += 1
+                    task = asyncio.create_task(self.error(e))
+                    if not await self.enqueue(responses, (task, False), sender): self.discard(task)
+                    break
+                if request is None: break
+                self.unsent += 1
+                if request.method == "GET":
+                    # Reads run concurrently with each other, but after any
+                    # write sent before them, so a client sees its own writes.
+                    task = asyncio.create_task(self.respond(request, last_write))
+                else:
+                    task = last_write = asyncio.create_task(self.respond(request, last_write))
+                if not await self.enqueue(responses, (task, request.keep_alive), sender):
+                    self.discard(task)
+                    break
+                if not request.keep_alive: break
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.connections.discard(asyncio.current_task())
+            await self.enqueue(responses, None, sender)
+            try:
+                await sender
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+            while not responses.empty():
+                item = responses.get_nowait()
+                if item is not None: self.discard(item[0])
+            writer.close()
+
+    async def error(self, e):
+        return json_response(e.status, {"ok": False, "message": str(e)})
+
+    async def start(self):
+        self.slots = asyncio.Semaphore(self.max_pending)
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    # Stops accepting connections, lets requests already read finish and be
+    # written, then drops idle keep-alive connections and the worker pool.
+    async def shutdown(self, timeout=10):
+        self.closing = True
+        self.server.close()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while (self.inflight or self.unsent) and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        for task in list(self.connections):
+            task.cancel()
+        await asyncio.gather(*self.connections, return_exceptions=True)
+        await self.server.wait_closed()
+        self.executor.shutdown(wait=True)
+
+
+def run(db_name="bank.db", host="127.0.0.1", port=8080, max_workers=8, **db_options):
+    async def main():
+        controller = BankController(db_name, **db_options)
+        server = await BankServer(controller, host, port, max_workers).start()
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                signal.signal(sig, lambda *_: loop.call_soon_threadsafe(stop.set))
+        print(f"SecureBank API listening on http://{server.host}:{server.port}")
+        await stop.wait()
+        await server.shutdown()
+        controller.db.close()
+    asyncio.run(main())
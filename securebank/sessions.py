@@ -0,0 +1,67 @@
+import secrets
+import threading
+import time
+
+
+# One logged-in customer. __slots__ keeps each record to a few hundred bytes
+# so a process can hold many thousands of them; item access is kept for code
+# written against the old current_user dict.
+class Session:
+    __slots__ = ("token", "id", "name", "account_number", "balance", "created_at", "last_seen")
+
+    def __init__(self, token, user, now):
+        self.token = token
+        self.id, self.name, self.account_number, self.balance = user[0], user[1], user[3], user[4]
+        self.created_at = user[5] if len(user) > 5 else None
+        self.last_seen = now
+
+    def __getitem__(self, key): return getattr(self, key)
+    def __setitem__(self, key, value): setattr(self, key, value)
+    def get(self, key, default=None): return getattr(self, key, default)
+
+
+# Maps opaque tokens to sessions. A session that has not been used for
+# idle_timeout seconds is dropped on its next lookup; the rest of the table is
+# swept at most once per purge_interval so expiry stays O(1) per call.
+class SessionManager:
+    def __init__(self, idle_timeout=900, purge_interval=60, clock=time.monotonic):
+        self.idle_timeout = idle_timeout
+        self.purge_interval = purge_interval
+        self.clock = clock
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._last_purge = clock()
+
+    def __len__(self): return len(self._sessions)
+
+    def create(self, user):
+        now = self.clock()
+        session = Session(secrets.token_urlsafe(24), user, now)
+        with self._lock:
+            self._sessions[session.token] = session
+            if now - self._last_purge >= self.purge_interval: self._purge(now)
+        return session
+
+    def get(self, token):
+        session = self._sessions.get(token)
+        if session is None: return None
+        now = self.clock()
+        if now - session.last_seen > self.idle_timeout:
+            self.end(token)
+            return None
+        session.last_seen = now
+        return session
+
+    def end(self, token):
+        with self._lock:
+            return self._sessions.pop(token, None) is not None
+
+    def _purge(self, now):
+        expired = [t for t, s in self._sessions.items() if now - s.last_seen > self.idle_timeout]
+        for token in expired:
+            del self._sessions[token]
+        self._last_purge = now
+
+    def purge(self):
+        with self._lock:
+            self._purge(self.clock())
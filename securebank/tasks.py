@@ -0,0 +1,94 @@
+import queue
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Task:
+    def __init__(self, runner, busy):
+        self.runner = runner
+        self.busy = busy
+        self.future = None
+        self.timer = None
+        self.finished = False
+
+    def cancel(self):
+        # The worker may already be inside sqlite; its result is simply dropped.
+        if self.finished: return False
+        self.future.cancel()
+        self.runner._finish(self)
+        return True
+
+
+# Runs blocking controller calls on worker threads and hands results back to
+# the Tk thread. Workers only put finished tasks on a queue; the Tk thread
+# drains it with after(), so callbacks always run where widgets may be used.
+# The queue is only polled while tasks are in flight.
+class TaskRunner:
+    def __init__(self, root, max_workers=4, poll_interval=16):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="securebank-task")
+        self.results = queue.SimpleQueue()
+        self.pending = set()
+        self.polling = False
+
+    def submit(self, fn, *args, on_success=None, on_error=None, timeout=None, busy=(), **kwargs):
+        task = Task(self, busy)
+        task.on_success, task.on_error = on_success, on_error
+        for widget in busy:
+            widget.configure(state="disabled")
+        self.pending.add(task)
+        task.future = self.executor.submit(fn, *args, **kwargs)
+        task.future.add_done_callback(lambda _: self.results.put(task))
+        if timeout is not None:
+            task.timer = self.root.after(int(timeout * 1000), lambda: self._expire(task))
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.poll_interval, self._drain)
+        return task
+
+    def _expire(self, task):
+        task.timer = None
+        if task.finished: return
+        self._finish(task)
+        if task.on_error: task.on_error(TimeoutError("The operation timed out"))
+
+    def _finish(self, task):
+        task.finished = True
+        self.pending.discard(task)
+        if task.timer is not None:
+            self.root.after_cancel(task.timer)
+            task.timer = None
+        for widget in task.busy:
+            try:
+                if widget.winfo_exists(): widget.configure(state="normal")
+            except Exception:
+                pass
+
+    def _drain(self):
+        while True:
+            try:
+                task = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if task.finished or task.future.cancelled(): continue
+            self._finish(task)
+            error = task.future.exception()
+            try:
+                if error is None:
+                    if task.on_success: task.on_success(task.future.result())
+                elif task.on_error:
+                    task.on_error(error)
+            except Exception:
+                self.root.report_callback_exception(*sys.exc_info())
+        if self.pending:
+            self.root.after(self.poll_interval, self._drain)
+        else:
+            self.polling = False
+
+    # Drops every pending callback. wait=True also blocks until calls already
+    # running on workers return, so what they use can be closed afterwards.
+    def shutdown(self, wait=False):
+        for task in list(self.pending):
+            task.cancel()
+        self.executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+
+from securebank import BankController, DatabaseManager
+
+ACCOUNT, PIN = "2234567895", "1234"
+
+
+# A fresh database file per test, holding one customer (Asha, ACCOUNT/PIN).
+# db_options are passed to DatabaseManager; self.path is the file.
+class DatabaseTestCase(unittest.TestCase):
+    db_options = {}
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "bank.db")
+        self.db = self.open_database()
+        self.db.create_user("Asha", PIN, ACCOUNT)
+        self.user_id = self.db.get_user_by_account(ACCOUNT)[0]
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def open_database(self):
+        return DatabaseManager(self.path, **self.db_options)
+
+    def balance(self, account_number=ACCOUNT):
+        return self.db.get_user_by_account(account_number)[4]
+
+
+# The same, through a BankController (self.controller, self.db is its
+# database) with Asha signed in on a session token (self.token).
+class ControllerTestCase(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.token = self.controller.open_session(ACCOUNT, PIN)[0].token
+
+    def open_database(self):
+        self.controller = BankController(self.path, **self.db_options)
+        return self.controller.db
@@ -0,0 +1,34 @@
+import unittest
+
+from securebank.accounts import AccountNumberAllocator, account_number_for, luhn_valid
+from support import ControllerTestCase
+
+
+class AllocatorTest(ControllerTestCase):
+    def test_allocators_on_one_file_never_collide(self):
+        first, second = AccountNumberAllocator(self.db, block_size=10), AccountNumberAllocator(self.db, block_size=10)
+        numbers = first.allocate(5) + second.allocate(25) + first.allocate(10)
+        self.assertEqual(len(set(numbers)), 40)
+        self.assertTrue(all(len(n) == 10 and luhn_valid(n) for n in numbers))
+        self.assertFalse(luhn_valid(numbers[0][:-1] + str((int(numbers[0][-1]) + 1) % 10)))
+
+    def test_existing_numbers_are_skipped(self):
+        self.db.create_user("Ravi", "4321", account_number_for(0))
+        numbers = self.controller.allocate_account_numbers(3)
+        self.assertNotIn(account_number_for(0), numbers)
+        self.assertEqual(numbers, [account_number_for(i) for i in (1, 2, 3)])
+
+    def test_onboarding_reports_each_record(self):
+        results = self.controller.onboard_accounts([("Ravi", "4321", "500"), ("", "1111", 0), ("Meera", "12", 0),
+                                                    ("Kiran", "2222", -5), (" Dev ", 3333, None)])
+        self.assertEqual([(name, error) for name, _, error in results], [
+            ("Ravi", None), ("", "Name is required"), ("Meera", "Pin must be 4 digits"),
+            ("Kiran", "Invalid opening balance"), ("Dev", None),
+        ])
+        self.assertEqual([number is not None for _, number, _ in results], [True, False, False, False, True])
+        self.assertEqual(self.balance(results[0][1]), 500)
+        self.assertEqual(self.db.get_user_by_account(results[4][1])[1:3], ("Dev", "3333"))
+
+
+if __name__ == "__main__":
+    unittest.main()
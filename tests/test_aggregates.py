@@ -0,0 +1,30 @@
+import unittest
+
+from securebank.archive import Archiver
+from support import DatabaseTestCase
+
+TOTALS = ("user_totals", "user_daily_totals", "user_monthly_totals")
+
+
+class RebuildAggregatesTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.db.write_transaction() as cur:
+            cur.executemany("INSERT INTO transactions (user_id, type, amount, timestamp) VALUES (?, ?, ?, ?)", [
+                (self.user_id, "DEPOSIT", 500, "2020-01-15 10:00:00"),
+                (self.user_id, "WITHDRAW", 200, "2020-02-03 09:30:00"),
+                (self.user_id, "DEPOSIT", 300, "2099-01-01 00:00:00"),
+            ])
+
+    def totals(self):
+        return {table: sorted(self.db.read_cursor.execute(f"SELECT * FROM {table}").fetchall()) for table in TOTALS}
+
+    def test_rebuild_counts_archived_rows(self):
+        before = self.totals()
+        self.assertEqual(Archiver(self.db).run(older_than_days=30, vacuum=False)["archived"], 2)
+        self.db.rebuild_aggregates()
+        self.assertEqual(self.totals(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
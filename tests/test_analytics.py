@@ -0,0 +1,43 @@
+import unittest
+
+from securebank.analytics import AnalyticsEngine
+from securebank.archive import Archiver
+from support import DatabaseTestCase
+
+
+@unittest.skipUnless(AnalyticsEngine.available, "insights need numpy")
+class InsightsTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db.create_user("Ravi", "1234", "3059084420")
+        with self.db.write_transaction() as cur:
+            cur.executemany("""
+                INSERT INTO transactions (user_id, type, amount, recipient_account, timestamp) VALUES (?, ?, ?, ?, ?)
+            """, [(self.user_id, "DEPOSIT", 9000, None, "2020-01-15 10:00:00"),
+                  (self.user_id, "TRANSFER_OUT", 4000, "3059084420", "2020-02-03 09:30:00"),
+                  (self.user_id, "DEPOSIT", 300, None, "2099-01-01 00:00:00")])
+            cur.execute("UPDATE users SET balance = 5300 WHERE id = ?", (self.user_id,))
+
+    def insights(self):
+        return AnalyticsEngine(self.db).insights(self.user_id, self.balance())
+
+    def test_archived_rows_stay_in_the_insights(self):
+        before = self.insights()
+        self.assertEqual(before["transactions"], 3)
+        self.assertEqual(Archiver(self.db).run(older_than_days=30, vacuum=False)["archived"], 2)
+        after = self.insights()
+        self.assertEqual(after, before)
+        self.assertEqual(after["largest_movements"][0]["amount"], 9000)
+        self.assertEqual(after["top_counterparties"][0]["name"], "Ravi")
+
+    def test_cached_series_only_reads_new_rows(self):
+        engine = AnalyticsEngine(self.db)
+        engine.insights(self.user_id, self.balance())
+        Archiver(self.db).run(older_than_days=30, vacuum=False)
+        self.db.deposit(self.user_id, 50)
+        series = engine.series(self.user_id)
+        self.assertEqual(series.amounts.tolist(), [9000, 4000, 300, 50])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import threading
+import unittest
+
+from securebank import DatabaseManager
+from support import DatabaseTestCase
+
+
+class GroupCommitTest(DatabaseTestCase):
+    db_options = {"durability": "batched", "flush_interval": 0.1}
+
+    def run_together(self, *calls):
+        barrier, errors = threading.Barrier(len(calls)), []
+
+        def worker(fn, *args):
+            barrier.wait()
+            try:
+                fn(*args)
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=worker, args=call) for call in calls]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+
+    def test_concurrent_writes_share_commits(self):
+        before = self.db.commit_metrics.snapshot()
+        self.assertEqual(self.run_together(*[(self.db.deposit, self.user_id, 10)] * 20), [])
+        after = self.db.commit_metrics.snapshot()
+        self.assertEqual(self.balance(), 200)
+        self.assertEqual(after["operations"] - before["operations"], 20)
+        self.assertLess(after["commits"] - before["commits"], 20)
+
+    def test_failed_operation_rolls_back_alone(self):
+        def credit_then_fail(cur):
+            self.db._credit(cur, self.user_id, 1000)
+            raise ValueError("rejected")
+        errors = self.run_together((self.db._write, credit_then_fail), *[(self.db.deposit, self.user_id, 10)] * 5)
+        self.assertEqual([str(e) for e in errors], ["rejected"])
+        self.assertEqual(self.balance(), 50)
+        self.assertEqual(len(self.db.get_transaction_history(self.user_id)), 5)
+
+
+class DurabilityTest(DatabaseTestCase):
+    def test_strict_commits_every_write(self):
+        before = self.db.commit_metrics.snapshot()["commits"]
+        for _ in range(3):
+            self.db.deposit(self.user_id, 10)
+        self.assertIsNone(self.db.committer)
+        self.assertEqual(self.db.commit_metrics.snapshot()["commits"] - before, 3)
+
+    def test_unknown_profile(self):
+        with self.assertRaises(ValueError):
+            DatabaseManager(self.path, durability="eventual")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+from securebank.ledger import Reconciler
+from support import ACCOUNT, DatabaseTestCase
+
+OTHER = "3059084420"
+
+
+class JournalTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db.create_user("Ravi", "1234", OTHER, 50)
+
+    def test_postings_reconcile(self):
+        self.assertEqual(self.db.deposit(self.user_id, 500), 500)
+        self.assertEqual(self.db.withdraw(self.user_id, 120), 380)
+        self.assertIsNone(self.db.withdraw(self.user_id, 10 ** 6))
+        self.assertEqual(self.db.transfer_money(ACCOUNT, OTHER, 80)[0], True)
+        report = Reconciler(self.db).run()
+        self.assertEqual(report["drift"], [])
+        self.assertEqual(report["imbalance"], 0)
+        self.assertEqual(self.balance(), 300)
+        self.assertEqual(self.balance(OTHER), 130)
+        self.assertEqual(self.db.balance_as_of(self.user_id, "2999-12-31"), 300)
+
+    def test_direct_balance_edit_is_reported(self):
+        self.db.deposit(self.user_id, 500)
+        with self.db.write_transaction() as cur:
+            cur.execute("UPDATE users SET balance = 1 WHERE id = ?", (self.user_id,))
+        self.assertEqual([(row["user_id"], row["drift"]) for row in Reconciler(self.db).run()["drift"]], [(self.user_id, -499)])
+
+    def test_balance_as_of_reads_past_snapshots(self):
+        self.db.deposit(self.user_id, 500)
+        self.db.take_balance_snapshots()
+        self.db.withdraw(self.user_id, 200)
+        self.assertEqual(self.db.balance_as_of(self.user_id, "2000-01-01"), 0)
+        self.assertEqual(self.db.balance_as_of(self.user_id, "2999-12-31"), 300)
+
+
+if __name__ == "__main__":
+    unittest.main()
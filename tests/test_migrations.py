@@ -0,0 +1,31 @@
+import sqlite3
+import unittest
+
+from securebank.database import SCHEMA_MIGRATIONS
+from support import DatabaseTestCase
+
+
+class MigrationTest(DatabaseTestCase):
+    def indexes(self):
+        return {row[0] for row in self.db.read_cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'transactions'")}
+
+    def test_fresh_database_is_at_the_latest_version(self):
+        self.assertEqual(self.db.schema_version(), len(SCHEMA_MIGRATIONS))
+        self.assertIn("idx_transactions_user_type_ts", self.indexes())
+        self.assertNotIn("idx_transactions_user_type_amount", self.indexes())
+
+    def test_upgrade_drops_unused_index(self):
+        self.db.close()
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE INDEX idx_transactions_user_type_amount ON transactions(user_id, type, amount)")
+        conn.execute(f"PRAGMA user_version = {len(SCHEMA_MIGRATIONS) - 1}")
+        conn.commit()
+        conn.close()
+        self.db = self.open_database()
+        self.assertEqual(self.db.schema_version(), len(SCHEMA_MIGRATIONS))
+        self.assertNotIn("idx_transactions_user_type_amount", self.indexes())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from datetime import datetime
+
+from securebank.scheduler import TransferScheduler
+from support import DatabaseTestCase
+
+PAYEE = "3234567894"
+
+
+class SchedulerTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db.create_user("Ravi", "4321", PAYEE)
+
+    def run_at(self, when, **options):
+        return TransferScheduler(self.db, clock=lambda: datetime.fromisoformat(when), **options).run()
+
+    def schedule(self, first_run_at, frequency="MONTHLY", count=None):
+        return self.db.create_scheduled_transfer(self.user_id, PAYEE, 100, first_run_at, frequency, count)
+
+    def order(self, schedule_id):
+        return {row[0]: row for row in self.db.get_scheduled_transfers(self.user_id)}[schedule_id]
+
+    def runs(self, schedule_id):
+        return [row[:1] + row[2:] for row in reversed(self.db.get_schedule_runs(self.user_id, schedule_id))]
+
+    def test_retry_stops_at_next_occurrence(self):
+        schedule_id = self.schedule("2026-03-01 06:00:00", count=3)
+        self.run_at("2026-03-01 06:00", retry_delay=40 * 86400)
+        self.assertEqual(self.order(schedule_id)[5], "2026-04-01 06:00:00")
+        self.db.deposit(self.user_id, 100)
+        self.run_at("2026-04-01 06:00", retry_delay=40 * 86400)
+        self.assertEqual(self.runs(schedule_id), [
+            ("2026-03-01 06:00:00", "RETRY", "Insufficient balance"),
+            ("2026-03-01 06:00:00", "POSTED", "New balance: 0"),
+            ("2026-04-01 06:00:00", "RETRY", "Insufficient balance"),
+        ])
+        _, _, _, _, _, next_run_at, remaining, status, _ = self.order(schedule_id)
+        self.assertEqual((next_run_at, remaining, status), ("2026-05-01 06:00:00", 2, "ACTIVE"))
+        self.run_at("2026-05-01 06:00", retry_delay=40 * 86400)
+        self.assertEqual(self.runs(schedule_id)[-2:], [
+            ("2026-04-01 06:00:00", "FAILED", "Insufficient balance"),
+            ("2026-05-01 06:00:00", "RETRY", "Insufficient balance"),
+        ])
+        self.assertEqual(self.order(schedule_id)[6:8], (1, "ACTIVE"))
+        self.assertEqual(self.balance(PAYEE), 100)
+
+    def test_missed_occurrences_are_logged(self):
+        self.db.deposit(self.user_id, 1000)
+        schedule_id = self.schedule("2026-03-01 06:00:00", "DAILY", count=5)
+        summary = self.run_at("2026-03-03 12:00")
+        self.assertEqual((summary["posted"], summary["failed"]), (1, 2))
+        self.assertEqual([row[:2] for row in self.runs(schedule_id)], [
+            ("2026-03-01 06:00:00", "POSTED"),
+            ("2026-03-02 06:00:00", "FAILED"),
+            ("2026-03-03 06:00:00", "FAILED"),
+        ])
+        _, _, _, _, _, next_run_at, remaining, status, _ = self.order(schedule_id)
+        self.assertEqual((next_run_at, remaining, status), ("2026-03-04 06:00:00", 2, "ACTIVE"))
+        self.assertEqual(self.balance(), 900)
+
+    def test_failed_occurrences_count_against_remaining(self):
+        schedule_id = self.schedule("2026-03-01 06:00:00", "WEEKLY", count=2)
+        self.run_at("2026-03-01 06:00", max_attempts=1)
+        self.run_at("2026-03-08 06:00", max_attempts=1)
+        self.assertEqual([row[1] for row in self.runs(schedule_id)], ["FAILED", "FAILED"])
+        self.assertEqual(self.order(schedule_id)[6:8], (0, "FAILED"))
+
+
+if __name__ == "__main__":
+    unittest.main()
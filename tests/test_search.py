@@ -0,0 +1,45 @@
+import unittest
+
+from securebank.archive import Archiver
+from support import DatabaseTestCase
+
+
+class SearchMatchingTest(DatabaseTestCase):
+    ROWS = [
+        ("TRANSFER_OUT", 100, "1000000002", "Transfer to Ravi"),
+        ("TRANSFER_OUT", 200, "3000000004", "Ravindra rent"),
+        ("DEPOSIT", 300, None, "Café salary"),
+        ("TRANSFER_IN", 400, "1000000002", "Transfer from Ravi"),
+    ]
+    QUERIES = [("ravi", False), ("ravi 10", False), ("ravi 1000000002", False), ("ravi", True),
+               ("to rav", True), ("cafe", False), ("1000", True), ("ent", True)]
+
+    def setUp(self):
+        super().setUp()
+        with self.db.write_transaction() as cur:
+            cur.executemany("""
+                INSERT INTO transactions (user_id, type, amount, recipient_account, description, timestamp)
+                VALUES (?, ?, ?, ?, ?, '2020-01-01 00:00:00')
+            """, [(self.user_id, *row) for row in self.ROWS])
+
+    def search(self):
+        return {(text, partial): [row[2] for row in self.db.search_transactions(self.user_id, text, partial=partial)]
+                for text, partial in self.QUERIES}
+
+    def test_hot_and_archived_rows_match_alike(self):
+        hot = self.search()
+        self.assertEqual(hot[("ravi", False)], [400, 100])
+        self.assertEqual(hot[("ravi 10", False)], [])
+        self.assertEqual(hot[("ravi 1000000002", False)], [400, 100])
+        self.assertEqual(hot[("ravi", True)], [400, 200, 100])
+        self.assertEqual(hot[("cafe", False)], [300])
+        self.assertEqual(hot[("ent", True)], [])
+        self.db.full_text = False
+        self.assertEqual(self.search(), hot)
+        self.db.full_text = True
+        Archiver(self.db).run(older_than_days=30, vacuum=False)
+        self.assertEqual(self.search(), hot)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from securebank.metrics import METRICS
+from securebank.server import BankServer
+from support import ControllerTestCase
+
+
+def request(method, path, body=None, token=None):
+    data = json.dumps(body).encode() if body is not None else b""
+    head = f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(data)}\r\n"
+    if token: head += f"Authorization: Bearer {token}\r\n"
+    return (head + "\r\n").encode() + data
+
+
+async def read_response(reader):
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""): break
+        name, _, value = line.decode().partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return status, json.loads(await reader.readexactly(int(headers["content-length"])))
+
+
+class ServerTest(ControllerTestCase):
+    def exchange(self, *requests):
+        async def main():
+            server = await BankServer(self.controller, port=0).start()
+            try:
+                reader, writer = await asyncio.open_connection(server.host, server.port)
+                writer.write(b"".join(requests))
+                await writer.drain()
+                responses = [await read_response(reader) for _ in requests]
+                writer.close()
+                return responses
+            finally:
+                await server.shutdown(timeout=1)
+        return asyncio.run(main())
+
+    def test_malformed_requests_get_an_error_response(self):
+        negative = b"POST /deposit HTTP/1.1\r\nContent-Length: -1\r\n\r\n"
+        long_header = b"GET /account HTTP/1.1\r\nX-Padding: " + b"a" * 70000 + b"\r\n\r\n"
+        self.assertEqual(self.exchange(negative)[0][0], 400)
+        self.assertEqual(self.exchange(long_header)[0][0], 431)
+
+    def test_abandoned_export_leaves_no_file(self):
+        for deposit in range(1, 200):
+            self.db.deposit(self.user_id, deposit)
+        exports = os.path.join(self.tmp.name, "exports")
+        os.mkdir(exports)
+
+        async def main():
+            server = await BankServer(self.controller, port=0).start()
+            try:
+                for _ in range(5):
+                    reader, writer = await asyncio.open_connection(server.host, server.port)
+                    writer.write(request("GET", "/export", token=self.token) * 3)
+                    await writer.drain()
+                    writer.close()
+            finally:
+                await server.shutdown(timeout=5)
+
+        tempfile.tempdir = exports
+        try:
+            asyncio.run(main())
+        finally:
+            tempfile.tempdir = None
+        self.assertEqual(os.listdir(exports), [])
+
+    def test_pipelined_read_sees_earlier_write(self):
+        (status, _), (_, account), (_, history) = self.exchange(
+            request("POST", "/deposit", {"amount": 500}, self.token),
+            request("GET", "/account", token=self.token),
+            request("GET", "/history", token=self.token),
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(account["balance"], 500)
+        self.assertEqual(len(history["transactions"]), 1)
+
+    def test_non_integer_amounts_are_rejected(self):
+        bodies = [{"amount": 1.9}, {"amount": True}, {"amount": None}, {}]
+        responses = self.exchange(*[request("POST", "/deposit", body, self.token) for body in bodies])
+        self.assertEqual([status for status, _ in responses], [400] * len(bodies))
+        self.assertEqual({body["message"] for _, body in responses}, {"Invalid amount"})
+        self.assertEqual(self.balance(), 0)
+
+    def test_malformed_schedules_are_rejected(self):
+        other = self.controller.allocate_account_numbers(1)[0]
+        self.db.create_user("Ravi", "1234", other)
+        schedule = {"to_account": other, "amount": 100, "first_run_at": "2030-01-01"}
+        bodies = [{**schedule, "amount": None}, {**schedule, "amount": 2.5}, {**schedule, "frequency": 5},
+                  {**schedule, "frequency": "HOURLY"}, {**schedule, "count": "x"}, {**schedule, "first_run_at": 7},
+                  {**schedule, "description": {"a": 1}}]
+        responses = self.exchange(*[request("POST", "/schedules", body, self.token) for body in bodies])
+        self.assertEqual([status for status, _ in responses], [400] * len(bodies))
+        self.assertEqual(self.controller.get_scheduled_transfers(token=self.token), [])
+
+    def test_metrics_report_commits(self):
+        _, (status, metrics) = self.exchange(request("POST", "/deposit", {"amount": 500}, self.token),
+                                             request("GET", "/metrics?format=json"))
+        self.assertEqual(status, 200)
+        commits = metrics["commits"][self.path]
+        self.assertGreaterEqual(commits["commits"], 1)
+        self.assertIn('securebank_commits_total{db="', METRICS.prometheus())
+
+
+if __name__ == "__main__":
+    unittest.main()
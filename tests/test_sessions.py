@@ -0,0 +1,58 @@
+import unittest
+
+from securebank.sessions import SessionManager
+from support import ACCOUNT, PIN, ControllerTestCase
+
+PAYEE = "3234567894"
+
+
+class SessionTest(ControllerTestCase):
+    def test_sessions_act_on_their_own_account(self):
+        self.db.create_user("Ravi", "4321", PAYEE)
+        other = self.controller.open_session(PAYEE, "4321")[0].token
+        self.assertTrue(self.controller.deposit(500, token=self.token)[0])
+        self.assertTrue(self.controller.transfer(PAYEE, 200, token=self.token)[0])
+        self.assertEqual(self.balance(), 300)
+        self.assertEqual(self.balance(PAYEE), 200)
+        self.assertEqual([row[0] for row in self.controller.get_transaction_history(token=other)], ["TRANSFER_IN"])
+        self.assertIsNone(self.controller.current_user)
+
+    def test_logout_ends_only_that_session(self):
+        second = self.controller.open_session(ACCOUNT, PIN)[0].token
+        self.assertTrue(self.controller.logout(self.token))
+        self.assertEqual(self.controller.deposit(100, token=self.token), (False, "Not logged in"))
+        self.assertTrue(self.controller.deposit(100, token=second)[0])
+
+    def test_wrong_pin_opens_no_session(self):
+        self.assertEqual(self.controller.open_session(ACCOUNT, "9999"), (None, "Incorrect PIN"))
+        self.assertEqual(len(self.controller.sessions), 1)
+
+
+class SessionManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 0
+        self.sessions = SessionManager(idle_timeout=900, purge_interval=60, clock=lambda: self.now)
+
+    def create(self):
+        return self.sessions.create((1, "Asha", PIN, ACCOUNT, 0)).token
+
+    def test_idle_session_expires(self):
+        token = self.create()
+        self.now = 600
+        self.assertIsNotNone(self.sessions.get(token))
+        self.now = 1400
+        self.assertIsNotNone(self.sessions.get(token))
+        self.now = 2301
+        self.assertIsNone(self.sessions.get(token))
+        self.assertEqual(len(self.sessions), 0)
+
+    def test_create_purges_expired_sessions(self):
+        for _ in range(3):
+            self.create()
+        self.now = 1000
+        self.create()
+        self.assertEqual(len(self.sessions), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
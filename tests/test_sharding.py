@@ -0,0 +1,95 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from securebank.accounts import account_number_for  # noqa: E402
+from sharded_database import ShardedDatabase, ShardUnavailable  # noqa: E402
+
+
+# Two thread-backed shards on files, with SENDER and RECIPIENT on different
+# shards holding 1000 each.
+class ShardedTransferTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = self.open_database()
+        numbers = [account_number_for(i) for i in range(10)]
+        self.sender = numbers[0]
+        self.recipient = next(n for n in numbers if self.db.shard_index(n) != self.db.shard_index(self.sender))
+        self.db.create_users([("Asha", "1234", self.sender, 1000), ("Ravi", "4321", self.recipient, 1000)])
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def open_database(self):
+        return ShardedDatabase(os.path.join(self.tmp.name, "bank.db"), shards=2, processes=False)
+
+    def reopen(self):
+        self.db.close()
+        self.db = self.open_database()
+
+    def balances(self):
+        return self.db.get_user_by_account(self.sender)[4], self.db.get_user_by_account(self.recipient)[4]
+
+    def states(self):
+        return [row[0] for shard in self.db.shards for row in shard.shard.db.read_cursor.execute(
+            "SELECT state FROM shard_transfers ORDER BY side")]
+
+    # Makes `method` on the recipient's shard raise as if its worker had
+    # died, after running it when `ran` is set.
+    def kill_worker(self, method, ran=False):
+        shard = self.db.shard_for(self.recipient)
+        call = shard.call
+
+        def failing(name, *args):
+            if name != method: return call(name, *args)
+            if ran: call(name, *args)
+            raise ShardUnavailable("Shard worker exited")
+        shard.call = failing
+        return lambda: shard.__dict__.pop("call")
+
+    def test_transfer_across_shards(self):
+        self.assertEqual(self.db.transfer_money(self.sender, self.recipient, 300), (True, "Transfer successful"))
+        self.assertEqual(self.balances(), (700, 1300))
+        self.assertEqual(self.states(), ["COMMITTED", "COMMITTED"])
+        self.assertEqual(self.db.transfer_money(self.sender, self.recipient, 5000), (False, "Insufficient balance"))
+        self.assertEqual(self.db.total_balance(), 2000)
+
+    def test_recover_aborts_credit_without_debit(self):
+        self.db.shard_for(self.recipient).call("prepare_credit", "t1", self.recipient, self.sender, 300)
+        self.reopen()
+        self.assertEqual(self.balances(), (1000, 1000))
+        self.assertEqual(self.states(), ["ABORTED", "ABORTED"])
+
+    def test_recover_commits_credit_after_debit(self):
+        name = self.db.shard_for(self.recipient).call("prepare_credit", "t1", self.recipient, self.sender, 300)
+        self.db.shard_for(self.sender).call("debit", "t1", self.sender, self.recipient, name, 300)
+        self.assertEqual(self.balances(), (700, 1000))
+        self.reopen()
+        self.assertEqual(self.balances(), (700, 1300))
+        self.assertEqual(self.states(), ["COMMITTED", "COMMITTED"])
+
+    def test_worker_dying_after_prepare_aborts(self):
+        restore = self.kill_worker("prepare_credit", ran=True)
+        self.assertEqual(self.db.transfer_money(self.sender, self.recipient, 300), (False, "Shard worker exited"))
+        restore()
+        self.assertEqual(self.balances(), (1000, 1000))
+        self.assertEqual(self.states(), ["ABORTED", "ABORTED"])
+        self.assertEqual(self.db.unsettled, {})
+
+    def test_worker_dying_before_settle_is_kept_unsettled(self):
+        restore = self.kill_worker("settle_credit")
+        self.assertEqual(self.db.transfer_money(self.sender, self.recipient, 300), (True, "Transfer successful"))
+        self.assertEqual(len(self.db.unsettled), 1)
+        self.assertEqual(self.balances(), (700, 1000))
+        restore()
+        self.assertEqual(self.db.settle_pending(), 0)
+        self.assertEqual(self.balances(), (700, 1300))
+        self.assertEqual(self.db.total_balance(), 2000)
+
+
+if __name__ == "__main__":
+    unittest.main()